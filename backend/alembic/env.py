@@ -8,13 +8,18 @@ import sys
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from app.core.config import settings
 from app.database import Base
-from app.models import user, tax_deduction, investment, asset, expense, income, insurance
+from app.models import user, tax_deduction, investment, asset, expense, income, insurance, blob, report, search, sync, export
+from app.models.search import SQLITE_FTS_TABLES
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate the database the app is configured for (DATABASE_URL / .env)
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -24,6 +29,13 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # SQLite FTS5 tables and their shadow tables are created by migrations, not the models
+    if type_ == "table":
+        return not name.startswith(SQLITE_FTS_TABLES)
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -69,7 +82,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,427 @@
+"""pre-migration schema changes
+
+Everything the app's create_all added on top of the original schema before
+migrations existed: the tables of the investment, asset, expense, income
+and insurance models (the original app only created the tables its tax
+deduction and auth routers imported), the content-addressed blob store with
+a content_hash on every document table, and one income summary per user
+and month. Steps whose result is already there are skipped, so a database
+created by the create_all of any app version and stamped at 0001 upgrades
+to the same schema.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 05:02:11.418253
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+DOCUMENT_TABLES = ('asset_documents', 'document_attachments', 'insurance_documents', 'policy_documents',
+                   'maintenance_documents')
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('assets'):
+        op.create_table('assets',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('category', sa.Enum('REAL_ESTATE', 'VEHICLE', 'ELECTRONICS', 'FURNITURE', 'JEWELRY', 'ART', 'OTHER', name='assetcategory'), nullable=False),
+        sa.Column('purchase_price', sa.Integer(), nullable=False),
+        sa.Column('current_value', sa.Integer(), nullable=False),
+        sa.Column('purchase_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('warranty_end_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('serial_number', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_assets_id'), 'assets', ['id'], unique=False)
+    if not inspector.has_table('expenses'):
+        op.create_table('expenses',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('is_recurring', sa.Boolean(), nullable=True),
+        sa.Column('recurrence_interval', sa.String(), nullable=True),
+        sa.Column('next_due_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_expenses_id'), 'expenses', ['id'], unique=False)
+    if not inspector.has_table('income_sources'):
+        op.create_table('income_sources',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('type', sa.Enum('SALARY', 'FREELANCE', 'BUSINESS', 'INVESTMENT', 'RENTAL', 'PENSION', 'OTHER', name='incomesourcetype'), nullable=False),
+        sa.Column('deduction_category', sa.Enum('SECTION_80C', 'SECTION_80D', 'SECTION_24', 'HRA', 'LTA', 'OTHER', name='deductioncategory'), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_income_sources_id'), 'income_sources', ['id'], unique=False)
+    if not inspector.has_table('insurance_policies'):
+        op.create_table('insurance_policies',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('policy_number', sa.String(), nullable=False),
+        sa.Column('policy_type', sa.Enum('LIFE', 'HEALTH', 'MOTOR', 'HOME', 'TRAVEL', 'OTHER', name='insurancepolicytype'), nullable=False),
+        sa.Column('insurance_company', sa.String(), nullable=False),
+        sa.Column('premium_amount', sa.Integer(), nullable=False),
+        sa.Column('premium_frequency', sa.Enum('MONTHLY', 'QUARTERLY', 'HALF_YEARLY', 'YEARLY', name='premiumfrequency'), nullable=False),
+        sa.Column('sum_assured', sa.Integer(), nullable=True),
+        sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('next_premium_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_insurance_policies_id'), 'insurance_policies', ['id'], unique=False)
+    if not inspector.has_table('investment_assets'):
+        op.create_table('investment_assets',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('type', sa.Enum('MUTUAL_FUND', 'EMERGENCY_FUND', 'SAVINGS_BANK_DEPOSIT', 'GOLD', 'STOCKS', 'CRYPTOCURRENCY', name='investmentassettype'), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('current_price', sa.Integer(), nullable=False),
+        sa.Column('risk_level', sa.Enum('LOW', 'MODERATE', 'HIGH', 'VERY_HIGH', name='risklevel'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('symbol', sa.String(), nullable=True),
+        sa.Column('fund_house', sa.String(), nullable=True),
+        sa.Column('scheme_code', sa.String(), nullable=True),
+        sa.Column('expense_ratio', sa.Float(), nullable=True),
+        sa.Column('interest_rate', sa.Float(), nullable=True),
+        sa.Column('maturity_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('purity', sa.String(), nullable=True),
+        sa.Column('exchange', sa.String(), nullable=True),
+        sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_investment_assets_id'), 'investment_assets', ['id'], unique=False)
+    if not inspector.has_table('investment_goals'):
+        op.create_table('investment_goals',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('target_amount', sa.Integer(), nullable=False),
+        sa.Column('current_amount', sa.Integer(), nullable=True),
+        sa.Column('target_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_investment_goals_id'), 'investment_goals', ['id'], unique=False)
+    if not inspector.has_table('monthly_income_summaries'):
+        op.create_table('monthly_income_summaries',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('total_gross_income', sa.Integer(), nullable=True),
+        sa.Column('total_net_income', sa.Integer(), nullable=True),
+        sa.Column('total_deductions', sa.Integer(), nullable=True),
+        sa.Column('income_sources', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_monthly_income_summaries_id'), 'monthly_income_summaries', ['id'], unique=False)
+    if not inspector.has_table('portfolios'):
+        op.create_table('portfolios',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('target_allocation', sa.Text(), nullable=True),
+        sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_portfolios_id'), 'portfolios', ['id'], unique=False)
+    if not inspector.has_table('asset_documents'):
+        op.create_table('asset_documents',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('asset_id', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('file_url', sa.String(), nullable=True),
+        sa.Column('file_data', sa.Text(), nullable=True),
+        sa.Column('document_type', sa.String(), nullable=False),
+        sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_asset_documents_id'), 'asset_documents', ['id'], unique=False)
+    if not inspector.has_table('incomes'):
+        op.create_table('incomes',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('income_source_id', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('gross_amount', sa.Integer(), nullable=True),
+        sa.Column('net_amount', sa.Integer(), nullable=True),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['income_source_id'], ['income_sources.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_incomes_id'), 'incomes', ['id'], unique=False)
+    if not inspector.has_table('insurance_claims'):
+        op.create_table('insurance_claims',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('policy_id', sa.String(), nullable=False),
+        sa.Column('claim_number', sa.String(), nullable=False),
+        sa.Column('claim_amount', sa.Integer(), nullable=False),
+        sa.Column('approved_amount', sa.Integer(), nullable=True),
+        sa.Column('claim_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['policy_id'], ['insurance_policies.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_insurance_claims_id'), 'insurance_claims', ['id'], unique=False)
+    if not inspector.has_table('insurance_documents'):
+        op.create_table('insurance_documents',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('policy_id', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('file_url', sa.String(), nullable=True),
+        sa.Column('file_data', sa.Text(), nullable=True),
+        sa.Column('document_type', sa.String(), nullable=False),
+        sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['policy_id'], ['insurance_policies.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_insurance_documents_id'), 'insurance_documents', ['id'], unique=False)
+    if not inspector.has_table('investments'):
+        op.create_table('investments',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('asset_id', sa.String(), nullable=False),
+        sa.Column('investment_type', sa.Enum('SIP', 'LUMPSUM', 'RECURRING_DEPOSIT', 'ONE_TIME_PURCHASE', name='investmenttype'), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Float(), nullable=False),
+        sa.Column('purchase_price', sa.Integer(), nullable=False),
+        sa.Column('purchase_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sip_date', sa.Integer(), nullable=True),
+        sa.Column('maturity_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('lock_in_period', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['investment_assets.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_investments_id'), 'investments', ['id'], unique=False)
+    if not inspector.has_table('maintenance_records'):
+        op.create_table('maintenance_records',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('asset_id', sa.String(), nullable=False),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('cost', sa.Integer(), nullable=True),
+        sa.Column('service_provider', sa.String(), nullable=True),
+        sa.Column('next_maintenance_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_maintenance_records_id'), 'maintenance_records', ['id'], unique=False)
+    if not inspector.has_table('policy_documents'):
+        op.create_table('policy_documents',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('asset_id', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('file_url', sa.String(), nullable=True),
+        sa.Column('file_data', sa.Text(), nullable=True),
+        sa.Column('document_type', sa.String(), nullable=False),
+        sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['investment_assets.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_policy_documents_id'), 'policy_documents', ['id'], unique=False)
+    if not inspector.has_table('investment_transactions'):
+        op.create_table('investment_transactions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('investment_id', sa.String(), nullable=False),
+        sa.Column('transaction_type', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Float(), nullable=False),
+        sa.Column('price_per_unit', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['investment_id'], ['investments.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_investment_transactions_id'), 'investment_transactions', ['id'], unique=False)
+    if not inspector.has_table('maintenance_documents'):
+        op.create_table('maintenance_documents',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('maintenance_record_id', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('file_url', sa.String(), nullable=True),
+        sa.Column('file_data', sa.Text(), nullable=True),
+        sa.Column('document_type', sa.String(), nullable=False),
+        sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['maintenance_record_id'], ['maintenance_records.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_maintenance_documents_id'), 'maintenance_documents', ['id'], unique=False)
+    if not inspector.has_table('portfolio_investments'):
+        op.create_table('portfolio_investments',
+        sa.Column('portfolio_id', sa.String(), nullable=False),
+        sa.Column('investment_id', sa.String(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['investment_id'], ['investments.id'], ),
+        sa.ForeignKeyConstraint(['portfolio_id'], ['portfolios.id'], ),
+        sa.PrimaryKeyConstraint('portfolio_id', 'investment_id')
+        )
+    if not inspector.has_table('blobs'):
+        op.create_table('blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+        )
+    for table in DOCUMENT_TABLES:
+        if 'content_hash' in {column['name'] for column in inspector.get_columns(table)}:
+            continue
+        # Batch mode, so SQLite gets the foreign key by recreating the table
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+            batch_op.create_foreign_key(f'{table}_content_hash_fkey', 'blobs', ['content_hash'], ['sha256'])
+            batch_op.create_index(f'ix_{table}_content_hash', ['content_hash'], unique=False)
+
+    constraints = {constraint['name'] for constraint in inspector.get_unique_constraints('monthly_income_summaries')}
+    if 'uq_monthly_income_summary_user_month' not in constraints:
+        # Summaries are derived data (`python -m app.services.income_summary rebuild`); keep one per month
+        op.execute(
+            "DELETE FROM monthly_income_summaries WHERE id NOT IN ("
+            "SELECT MIN(id) FROM monthly_income_summaries GROUP BY user_id, year, month)"
+        )
+        with op.batch_alter_table('monthly_income_summaries') as batch_op:
+            batch_op.create_unique_constraint('uq_monthly_income_summary_user_month', ['user_id', 'year', 'month'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('monthly_income_summaries') as batch_op:
+        batch_op.drop_constraint('uq_monthly_income_summary_user_month', type_='unique')
+    for table in DOCUMENT_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_content_hash')
+            batch_op.drop_constraint(f'{table}_content_hash_fkey', type_='foreignkey')
+            batch_op.drop_column('content_hash')
+    op.drop_table('blobs')
+    op.drop_table('portfolio_investments')
+    op.drop_index(op.f('ix_maintenance_documents_id'), table_name='maintenance_documents')
+    op.drop_table('maintenance_documents')
+    op.drop_index(op.f('ix_investment_transactions_id'), table_name='investment_transactions')
+    op.drop_table('investment_transactions')
+    op.drop_index(op.f('ix_policy_documents_id'), table_name='policy_documents')
+    op.drop_table('policy_documents')
+    op.drop_index(op.f('ix_maintenance_records_id'), table_name='maintenance_records')
+    op.drop_table('maintenance_records')
+    op.drop_index(op.f('ix_investments_id'), table_name='investments')
+    op.drop_table('investments')
+    op.drop_index(op.f('ix_insurance_documents_id'), table_name='insurance_documents')
+    op.drop_table('insurance_documents')
+    op.drop_index(op.f('ix_insurance_claims_id'), table_name='insurance_claims')
+    op.drop_table('insurance_claims')
+    op.drop_index(op.f('ix_incomes_id'), table_name='incomes')
+    op.drop_table('incomes')
+    op.drop_index(op.f('ix_asset_documents_id'), table_name='asset_documents')
+    op.drop_table('asset_documents')
+    op.drop_index(op.f('ix_portfolios_id'), table_name='portfolios')
+    op.drop_table('portfolios')
+    op.drop_index(op.f('ix_monthly_income_summaries_id'), table_name='monthly_income_summaries')
+    op.drop_table('monthly_income_summaries')
+    op.drop_index(op.f('ix_investment_goals_id'), table_name='investment_goals')
+    op.drop_table('investment_goals')
+    op.drop_index(op.f('ix_investment_assets_id'), table_name='investment_assets')
+    op.drop_table('investment_assets')
+    op.drop_index(op.f('ix_insurance_policies_id'), table_name='insurance_policies')
+    op.drop_table('insurance_policies')
+    op.drop_index(op.f('ix_income_sources_id'), table_name='income_sources')
+    op.drop_table('income_sources')
+    op.drop_index(op.f('ix_expenses_id'), table_name='expenses')
+    op.drop_table('expenses')
+    op.drop_index(op.f('ix_assets_id'), table_name='assets')
+    op.drop_table('assets')
+
+    # Enum types outlive their tables on PostgreSQL
+    for name in ('assetcategory', 'incomesourcetype', 'deductioncategory', 'insurancepolicytype',
+                 'premiumfrequency', 'investmentassettype', 'risklevel', 'investmenttype'):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""change log autoincrement
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 04:40:12.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite reuses the largest rowid once its row is deleted, so a replaced entry could get a seq
+    # a client has already synced past; AUTOINCREMENT never hands a seq out twice. PostgreSQL's
+    # sequence already behaves that way.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('change_log', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('change_log', recreate='always'):
+        pass
@@ -0,0 +1,170 @@
+"""Per-user response cache with ETag revalidation.
+
+Read handlers look their response up by (user, namespace, method, path,
+query) and store the rendered JSON body on a miss. Every response carries
+an ETag; a matching If-None-Match gets a 304 without a body.
+
+Invalidation is by namespace generation: each (user, namespace) pair has a
+random generation token that is part of every key. Write handlers call
+`invalidate(user_id, namespace, ...)` after committing, which replaces the
+token so all older entries become unreachable and age out. Tokens are
+random rather than counters, so losing one (LRU eviction, Redis restart)
+can never resurrect a stale entry.
+
+The in-process backend is per worker, and a write only invalidates the
+worker that handled it; run several workers (or serverless instances)
+against the Redis backend so writes in one invalidate entries in all of
+them. Without Redis configured the cache is off.
+"""
+import hashlib
+import json
+import os
+import secrets
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.lru_cache import TTLLRUCache
+
+class CacheBackend:
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.entries = TTLLRUCache(max_entries, max_bytes)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self.entries.set(key, value, ttl=ttl, cost=len(key) + len(value))
+
+    def stats(self) -> Dict:
+        return self.entries.stats()
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache in Redis; `client` is any redis.asyncio-compatible client (e.g. fakeredis in tests)."""
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            import redis.asyncio as redis  # pyright: ignore[reportMissingImports]
+            client = redis.from_url(url)
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+class CachedLookup:
+    """Outcome of a cache lookup: either a ready response or a way to store one."""
+
+    def __init__(self, cache: "ResponseCache", request: Request, key: Optional[str], response: Optional[Response] = None):
+        self.cache = cache
+        self.request = request
+        self.key = key
+        self.response = response
+
+    async def store(self, data: Any, response_model: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Render `data` with `response_model`, cache it under the key from the lookup and return it."""
+        adapter = _adapter(response_model)
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        headers = dict(headers or {})
+        headers["ETag"] = _etag(body)
+        if self.key is not None:
+            await self.cache.backend.set(
+                self.key, json.dumps(headers).encode() + b"\n" + body, ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+            )
+        return _respond(self.request, body, headers)
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def _generation(self, user_id: str, namespace: str) -> str:
+        key = f"gen:{user_id}:{namespace}"
+        token = await self.backend.get(key)
+        if token is None:
+            token = secrets.token_hex(8).encode()
+            await self.backend.set(key, token)
+        return token.decode() if isinstance(token, bytes) else token
+
+    async def lookup(self, request: Request, user_id: str, namespace: str) -> CachedLookup:
+        """Find a cached response for this user and request, or prepare a key to store one."""
+        if self.backend is None:
+            return CachedLookup(self, request, None)
+
+        generation = await self._generation(user_id, namespace)
+        query = "&".join(sorted(str(request.query_params).split("&")))
+        key = f"resp:{user_id}:{namespace}:{generation}:{request.method}:{request.url.path}?{query}"
+        entry = await self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return CachedLookup(self, request, key)
+
+        self.hits += 1
+        header_line, body = entry.split(b"\n", 1)
+        return CachedLookup(self, request, key, _respond(request, body, json.loads(header_line)))
+
+    async def invalidate(self, user_id: str, *namespaces: str) -> None:
+        """Drop every cached response of a user in these namespaces; call after the write commits."""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            await self.backend.set(f"gen:{user_id}:{namespace}", secrets.token_hex(8).encode())
+
+    def stats(self) -> Dict:
+        stats = {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def _respond(request: Request, body: bytes, headers: Dict[str, str]) -> Response:
+    # Clients may keep the body but must revalidate it, which is a cheap 304 when nothing changed
+    headers = {**headers, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _create_backend() -> Optional[CacheBackend]:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        if os.getenv("VERCEL"):
+            # Every serverless instance would keep serving its own copy after writes elsewhere
+            print("RESPONSE_CACHE_BACKEND=memory is not supported on Vercel; response cache disabled")
+            return None
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+    return None
+
+response_cache = ResponseCache(_create_backend())
@@ -0,0 +1,98 @@
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+class PoolMetrics:
+    """Checkout statistics collected by the instrumented pools."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_latency = Histogram(
+            f"db_pool_{name}_checkout_seconds", f"Connection checkout latency ({name} pool)"
+        )
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+class InstrumentedPoolMixin:
+    """Times every checkout and records waits on an exhausted pool."""
+
+    metrics: PoolMetrics = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+
+        # No idle connection and no overflow headroom: this checkout has to wait for a checkin
+        exhausted = self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        elapsed = time.perf_counter() - start
+
+        self.metrics.checkout_latency.observe(elapsed)
+        if exhausted:
+            self.metrics.waits += 1
+            self.metrics.wait_seconds += elapsed
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the same metrics object
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_options(url: str, is_async: bool = False) -> Dict:
+    """Engine keyword arguments for the configured connection pool."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite keeps SQLAlchemy's default pools (single file, no server connections)
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def attach_metrics(engine: Engine, name: str) -> None:
+    """Start collecting checkout metrics on an engine's pool."""
+    if isinstance(engine.pool, InstrumentedPoolMixin):
+        engine.pool.metrics = PoolMetrics(name)
+
+def pool_stats(engine: Engine) -> Dict:
+    """Live statistics for an engine's pool."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "waits": metrics.waits,
+            "wait_seconds": round(metrics.wait_seconds, 6),
+            "timeouts": metrics.timeouts,
+            "checkout_latency": metrics.checkout_latency.snapshot(),
+        })
+    return stats
@@ -0,0 +1,169 @@
+"""Per-request performance metrics and the Prometheus exposition.
+
+InstrumentationMiddleware puts a RequestStats in a context variable for
+the duration of each request. SQL statements (engine events, see
+`attach_query_timing`) and password hashing add their time to it, and the
+middleware records latency, response size, statement count, SQL time and
+hashing time per route template once the response has been sent.
+Streaming responses are measured until their last chunk.
+
+`render_metrics()` returns everything in Prometheus text format, including
+the pool, password hasher and cache statistics collected elsewhere.
+"""
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import (
+    COUNT_BUCKETS, SIZE_BUCKETS, HistogramFamily, format_histogram, format_samples,
+)
+
+class RequestStats:
+    __slots__ = ("queries", "query_seconds", "password_hash_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.password_hash_seconds = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+REQUEST_LABELS = ("method", "route")
+
+request_duration = HistogramFamily(
+    "http_request_duration_seconds", "Time from request start to the last response byte", REQUEST_LABELS + ("status",)
+)
+response_size = HistogramFamily(
+    "http_response_size_bytes", "Response body size", REQUEST_LABELS, SIZE_BUCKETS
+)
+request_queries = HistogramFamily(
+    "http_request_db_queries", "SQL statements run per request", REQUEST_LABELS, COUNT_BUCKETS
+)
+request_query_time = HistogramFamily(
+    "http_request_db_seconds", "Time spent in SQL statements per request", REQUEST_LABELS
+)
+request_password_hash_time = HistogramFamily(
+    "http_request_password_hash_seconds", "Time spent hashing or verifying passwords per request", REQUEST_LABELS
+)
+query_duration = HistogramFamily("db_query_duration_seconds", "SQL statement latency", ("engine",))
+
+def record_password_hash(seconds: float) -> None:
+    stats = current_request.get()
+    if stats is not None:
+        stats.password_hash_seconds += seconds
+
+def attach_query_timing(engine: Engine, name: str) -> None:
+    """Time every statement on an engine and charge it to the current request."""
+    histogram = query_duration.labels(name)
+
+    # The start time lives on the statement's execution context, so a statement that fails
+    # (no after_cursor_execute) leaves nothing behind on the connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        histogram.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+def route_label(scope: Dict) -> str:
+    # Route templates keep label cardinality bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class InstrumentationMiddleware:
+    """ASGI middleware recording per-route request metrics, and profiling slow requests if enabled."""
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        profile = self.profiler.start() if self.profiler else None
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            current_request.reset(token)
+            labels = (scope["method"], route_label(scope))
+            request_duration.labels(*labels, str(status_code)).observe(elapsed)
+            response_size.labels(*labels).observe(size)
+            request_queries.labels(*labels).observe(stats.queries)
+            request_query_time.labels(*labels).observe(stats.query_seconds)
+            request_password_hash_time.labels(*labels).observe(stats.password_hash_seconds)
+            if profile is not None:
+                self.profiler.finish(profile, elapsed, *labels)
+
+def _families() -> Iterable[HistogramFamily]:
+    return (request_duration, response_size, request_queries, request_query_time,
+            request_password_hash_time, query_duration)
+
+# Statistics that only ever grow are exported as counters
+_COUNTER_KEYS = {"hits", "misses", "evictions", "completed", "waits", "timeouts", "wait_seconds"}
+
+def _stats_lines(prefix: str, description: str, series: List[Tuple[Dict[str, str], Dict]]) -> List[str]:
+    """Export the numeric fields of `stats()` dicts; nested histogram snapshots become histograms."""
+    lines = []
+    keys = sorted({key for _, stats in series for key in stats})
+    for key in keys:
+        values = [(labels, stats[key]) for labels, stats in series if key in stats]
+        if all(isinstance(value, dict) and "buckets" in value for _, value in values):
+            lines.extend(format_histogram(f"{prefix}_{key}", f"{description}: {key}", values))
+        elif all(isinstance(value, (int, float)) and not isinstance(value, bool) for _, value in values):
+            if key in _COUNTER_KEYS:
+                lines.extend(format_samples(f"{prefix}_{key}_total", f"{description}: {key}", "counter", values))
+            else:
+                lines.extend(format_samples(f"{prefix}_{key}", f"{description}: {key}", "gauge", values))
+    return lines
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format."""
+    from app.core.cache import response_cache
+    from app.core.db_pool import pool_stats
+    from app.core.security import password_hasher, principal_cache, token_cache
+    from app.database import async_engine, engine
+
+    lines = []
+    for family in _families():
+        lines.extend(format_histogram(family.name, family.description, family.collect()))
+    lines.extend(_stats_lines("db_pool", "Connection pool", [
+        ({"pool": "async"}, pool_stats(async_engine.sync_engine)),
+        ({"pool": "sync"}, pool_stats(engine)),
+    ]))
+    lines.extend(_stats_lines("password_hasher", "Password hashing pool", [({}, password_hasher.stats())]))
+    lines.extend(_stats_lines("auth_cache", "Token and principal caches", [
+        ({"cache": "token"}, token_cache.stats()),
+        ({"cache": "principal"}, principal_cache.stats()),
+    ]))
+    lines.extend(_stats_lines("response_cache", "Response cache", [({}, response_cache.stats())]))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,90 @@
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper bounds."""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict:
+        """Return cumulative bucket counts, sum and count."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"buckets": cumulative, "sum": total, "count": running}
+
+# Response sizes in bytes and per-request statement counts
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+class HistogramFamily:
+    """Histograms of one metric, one per combination of label values."""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.name, self.description, self.buckets))
+        return child
+
+    def collect(self) -> List[Tuple[Dict[str, str], Dict]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, values)), child.snapshot()) for values, child in children]
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def format_histogram(name: str, description: str, series: Iterable[Tuple[Dict[str, str], Dict]]) -> List[str]:
+    """Prometheus text-format lines for histogram snapshots, one per label set."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for labels, snapshot in series:
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+def format_samples(name: str, description: str, kind: str, series: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Prometheus text-format lines for a gauge or counter."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in series)
+    return lines
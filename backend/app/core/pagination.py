@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException, status  # pyright: ignore[reportMissingImports]
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor token."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor token produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """Encode a (rank, id) keyset position of a ranked result list."""
+    payload = json.dumps([rank, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor token produced by encode_rank_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(rank), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
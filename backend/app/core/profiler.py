@@ -0,0 +1,98 @@
+"""Opt-in sampling profiler for slow requests.
+
+While any request is in flight, a background thread samples the stacks of
+the event loop thread and of every thread running app code (sync routes,
+password hashing) every PROFILER_SAMPLE_INTERVAL_SECONDS. When a request
+takes longer than PROFILER_SLOW_REQUEST_SECONDS, the samples taken during
+it are written to PROFILER_OUTPUT_DIR in folded-stack format
+(`frame;frame;frame count` per line), which flamegraph.pl, speedscope and
+inferno read directly.
+
+Samples are per thread, not per request: concurrent requests on the event
+loop share its samples, so a profile shows everything the process did
+while the slow request was running.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+class SlowRequestProfiler:
+    def __init__(self, output_dir: str, threshold: float, interval: float, max_samples: int = 100_000):
+        self.output_dir = output_dir
+        self.threshold = threshold
+        self.interval = interval
+        self._samples = deque(maxlen=max_samples)  # (timestamp, folded stack)
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def _sample_forever(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_app = thread_id == self._loop_thread_id
+                while frame is not None:
+                    in_app = in_app or frame.f_code.co_filename.startswith(_APP_ROOT)
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                if in_app:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self._samples.append((now, ";".join(reversed(stack))))
+
+    def start(self) -> float:
+        """Mark a request as started (on the event loop thread); returns its start time."""
+        with self._lock:
+            if self._thread is None:
+                self._loop_thread_id = threading.get_ident()
+                self._thread = threading.Thread(target=self._sample_forever, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._active += 1
+            self._wake.set()
+        return time.perf_counter()
+
+    def finish(self, started_at: float, elapsed: float, method: str, route: str) -> Optional[str]:
+        """Mark a request as done; if it was slow, write its samples and return the file path."""
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._wake.clear()
+        if elapsed < self.threshold:
+            return None
+
+        folded = Counter(stack for at, stack in list(self._samples) if at >= started_at)
+        if not folded:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        path = os.path.join(
+            self.output_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{round(elapsed * 1000)}ms.folded"
+        )
+        with open(path, "w") as f:
+            for stack, count in folded.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+def create_profiler(settings) -> Optional[SlowRequestProfiler]:
+    if not settings.PROFILER_ENABLED:
+        return None
+    return SlowRequestProfiler(
+        settings.PROFILER_OUTPUT_DIR, settings.PROFILER_SLOW_REQUEST_SECONDS, settings.PROFILER_SAMPLE_INTERVAL_SECONDS
+    )
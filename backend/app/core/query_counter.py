@@ -0,0 +1,35 @@
+"""Counts the SQL statements run inside a block, to catch N+1 loading.
+
+    with count_queries() as queries:
+        client.get("/api/tax-deductions/")
+    assert queries.count <= 3, queries.statements
+
+Listens on every Engine (the async engine's sync engine included), so
+statements from any session or connection in the process are counted.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
@@ -1,13 +1,21 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt  # pyright: ignore[reportMissingModuleSource]
 from passlib.context import CryptContext  # pyright: ignore[reportMissingModuleSource]
 from fastapi import HTTPException, status, Depends  # pyright: ignore[reportMissingImports]
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials  # pyright: ignore[reportMissingImports]
 
 from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.instrumentation import record_password_hash
+from app.core.lru_cache import TTLLRUCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost than BCRYPT_ROUNDS are flagged for rehash on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,6 +26,87 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if its cost is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded thread or process pool."""
+
+    def __init__(self, executor_kind: str, workers: int, concurrency: int):
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.concurrency = concurrency
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0  # Calls waiting for a free slot
+        self.in_flight = 0  # Calls running on the pool
+        self.completed = 0
+        self.queue_wait = Histogram("password_hash_queue_wait_seconds", "Time spent waiting for a hashing slot")
+        self.duration = Histogram("password_hash_duration_seconds", "Time spent hashing or verifying a password")
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # bcrypt releases the GIL, so threads hash in parallel
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.perf_counter()
+        self.queue_wait.observe(started_at - queued_at)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            elapsed = time.perf_counter() - started_at
+            self.duration.observe(elapsed)
+            record_password_hash(elapsed)
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> Dict:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "queue_wait": self.queue_wait.snapshot(),
+            "duration": self.duration.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_CONCURRENCY,
+)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -30,16 +119,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def _token_key(token: str) -> bytes:
+    # Raw tokens are never kept in memory; entries are keyed by their digest
+    return hashlib.sha256(token.encode()).digest()
+
 def verify_token(token: str) -> Optional[str]:
-    """Verify and decode a JWT token."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    """Verify and decode a JWT token, reusing cached claims for tokens seen before."""
+    key = _token_key(token)
+    claims = token_cache.get(key)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
             return None
-        return user_id
-    except JWTError:
+        # Entries never outlive the token itself
+        ttl = claims["exp"] - time.time() if "exp" in claims else settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        token_cache.set(key, claims, ttl=ttl, cost=len(token) + len(key))
+
+    user_id: str = claims.get("sub")
+    if user_id is None:
         return None
+    return user_id
 
 async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Get the current user ID from the JWT token."""
@@ -52,3 +152,29 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user_id
+
+async def get_current_principal(current_user_id: str = Depends(get_current_user_id)):
+    """Get the current user as a cached principal, skipping the user lookup on hot paths."""
+    from app.database import AsyncSessionLocal
+    from app.models.user import User as UserModel
+    from app.schemas.auth import User
+
+    principal = principal_cache.get(current_user_id)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            user = await db.get(UserModel, current_user_id)
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            principal = User.model_validate(user)
+        principal_cache.set(current_user_id, principal, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return principal
+
+def invalidate_principal(user_id: str) -> None:
+    """Drop a cached principal after the user record changes."""
+    principal_cache.delete(user_id)
+
+token_cache = TTLLRUCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_MAX_BYTES)
+principal_cache = TTLLRUCache(settings.TOKEN_CACHE_MAX_ENTRIES)
@@ -0,0 +1,99 @@
+"""Cold-start helpers: a cheap schema version check and lazily imported routers.
+
+With STARTUP_MODE=migrations the app does not run `create_all` on boot; it
+compares the database's alembic_version with the head of the migration
+scripts, which are scanned as text so Alembic itself is never imported.
+
+With LAZY_ROUTERS=true each router is registered as a LazyRouter
+placeholder that matches its prefix. The first request under the prefix
+imports the router module, swaps the real routes in at the placeholder's
+position and dispatches the request again. Building the OpenAPI schema
+loads every router first, so /docs stays complete.
+"""
+import importlib
+import os
+import re
+import threading
+from typing import List, Optional, Set
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from starlette.routing import BaseRoute, Match
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "alembic", "versions")
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+
+def migration_heads(versions_dir: str = MIGRATIONS_DIR) -> Set[str]:
+    """Revisions no other migration script builds on."""
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name)) as f:
+            for key, value in _REVISION_LINE.findall(f.read()):
+                ids = set(_QUOTED.findall(value))
+                (revisions if key == "revision" else parents).update(ids)
+    return revisions - parents
+
+def database_revisions(connection) -> Set[str]:
+    """Revisions recorded in alembic_version; empty if the database was never migrated."""
+    try:
+        return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except Exception:
+        connection.rollback()
+        return set()
+
+def check_migrations(connection) -> Optional[str]:
+    """A description of the mismatch if the database is not at the migration head, else None."""
+    heads = migration_heads()
+    current = database_revisions(connection)
+    if current == heads:
+        return None
+    return (f"Database schema is at {', '.join(sorted(current)) or 'no revision'} but the migrations head is "
+            f"{', '.join(sorted(heads))}; run `alembic upgrade head`")
+
+class LazyRouter(BaseRoute):
+    """Stands in for a router until the first request under its prefix."""
+
+    def __init__(self, app: FastAPI, module: str, prefix: str, tags: List[str]):
+        self.app = app
+        self.module = module
+        self.prefix = prefix
+        self.tags = tags
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def matches(self, scope):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def load(self) -> None:
+        """Import the router module and put its routes where the placeholder was."""
+        with self._lock:
+            if self.loaded:
+                return
+            router = importlib.import_module(self.module).router
+            routes = self.app.router.routes
+            existing = len(routes)
+            self.app.include_router(router, prefix=self.prefix, tags=self.tags)
+            added = routes[existing:]
+            del routes[existing:]
+            position = routes.index(self)
+            routes[position:position + 1] = added
+            self.app.openapi_schema = None
+            self.loaded = True
+
+    async def handle(self, scope, receive, send):
+        self.load()
+        await self.app.router(scope, receive, send)
+
+def load_lazy_routers(app: FastAPI) -> None:
+    for route in list(app.router.routes):
+        if isinstance(route, LazyRouter):
+            route.load()
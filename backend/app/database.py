@@ -1,11 +1,34 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.db_pool import pool_options, attach_metrics
+from app.core.instrumentation import attach_query_timing
 
-engine = create_engine(settings.DATABASE_URL)
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its asyncio driver (asyncpg / aiosqlite)."""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+", 1)
+    if driver[0] in ("postgres", "postgresql") and (len(driver) == 1 or driver[1] != "asyncpg"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driver[0] == "sqlite" and (len(driver) == 1 or driver[1] != "aiosqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+# Sync engine: migrations, maintenance commands and background workers
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
+attach_metrics(engine, "sync")
+attach_query_timing(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, is_async=True))
+attach_metrics(async_engine.sync_engine, "async")
+attach_query_timing(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -15,3 +38,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,25 +1,59 @@
 from fastapi import FastAPI, HTTPException, Depends, status  # pyright: ignore[reportMissingImports]
 from fastapi.middleware.cors import CORSMiddleware  # pyright: ignore[reportMissingImports]
+from fastapi.responses import PlainTextResponse  # pyright: ignore[reportMissingImports]
 from fastapi.security import HTTPBearer  # pyright: ignore[reportMissingImports]
 from contextlib import asynccontextmanager
+import asyncio
+import importlib
 import uvicorn  # pyright: ignore[reportMissingImports]
 
-from app.database import engine, Base
-from app.routers import auth, tax_deductions, investments, assets, expenses, income, insurance
+from app.database import engine, async_engine, AsyncSessionLocal, Base
+from app.core.db_pool import pool_stats
+from app.core.security import password_hasher, token_cache, principal_cache
+from app.services.uploads import thumbnail_renderer
+from app.services.exports import export_runner
+from app.core.cache import response_cache
+from app.core.instrumentation import InstrumentationMiddleware, render_metrics
+from app.core.profiler import create_profiler
+from app.core.startup import LazyRouter, check_migrations, load_lazy_routers
 from app.core.config import settings
+from app.services import income_summary  # noqa: F401  (registers the Income flush listener)
+from app.services import reports as report_rollups  # noqa: F401  (registers the report rollup flush listener)
+from app.services import search as search_index  # noqa: F401  (registers the search index flush listener)
+from app.services import sync as change_feed  # noqa: F401  (registers the change log flush listener)
+from app.services import scheme_index, scheduler
 
 # Create database tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    problem = None
     try:
-        Base.metadata.create_all(bind=engine)
+        if settings.STARTUP_MODE == "migrations":
+            async with async_engine.connect() as conn:
+                problem = await conn.run_sync(check_migrations)
+        else:
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
     except Exception as e:
         print(f"Database connection failed: {e}")
         # Continue without database for now
+    if problem:
+        # Serving against a schema the code does not expect fails in confusing ways, so refuse to start
+        raise RuntimeError(problem)
+    background = [asyncio.create_task(scheme_index.run_refresh_loop())]
+    if settings.SCHEDULER_ENABLED:
+        background.append(asyncio.create_task(scheduler.run_forever(AsyncSessionLocal)))
+    if settings.EXPORT_WORKER_ENABLED:
+        background.append(asyncio.create_task(export_runner.run_forever(AsyncSessionLocal)))
     yield
     # Shutdown
-    pass
+    for task in background:
+        task.cancel()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+    thumbnail_renderer.shutdown()
+    export_runner.shutdown()
 
 app = FastAPI(
     title="Budget App API",
@@ -37,22 +71,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings include every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(InstrumentationMiddleware, profiler=create_profiler(settings))
+
 # Security
 security = HTTPBearer()
 
 # Include routers
+ROUTERS = [
+    ("app.routers.auth", "/api/auth", ["authentication"]),
+    ("app.routers.tax_deductions", "/api/tax-deductions", ["tax-deductions"]),
+    ("app.routers.investments", "/api/investments", ["investments"]),
+    ("app.routers.assets", "/api/assets", ["assets"]),
+    ("app.routers.expenses", "/api/expenses", ["expenses"]),
+    ("app.routers.income", "/api/income", ["income"]),
+    ("app.routers.insurance", "/api/insurance", ["insurance"]),
+    ("app.routers.reports", "/api/reports", ["reports"]),
+    ("app.routers.search", "/api/search", ["search"]),
+    ("app.routers.documents", "/api/documents", ["documents"]),
+    ("app.routers.sync", "/api/sync", ["sync"]),
+    ("app.routers.exports", "/api/exports", ["exports"]),
+]
 try:
-    app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
-    app.include_router(tax_deductions.router, prefix="/api/tax-deductions", tags=["tax-deductions"])
-    app.include_router(investments.router, prefix="/api/investments", tags=["investments"])
-    app.include_router(assets.router, prefix="/api/assets", tags=["assets"])
-    app.include_router(expenses.router, prefix="/api/expenses", tags=["expenses"])
-    app.include_router(income.router, prefix="/api/income", tags=["income"])
-    app.include_router(insurance.router, prefix="/api/insurance", tags=["insurance"])
+    for module, prefix, tags in ROUTERS:
+        if settings.LAZY_ROUTERS:
+            app.router.routes.append(LazyRouter(app, module, prefix, tags))
+        else:
+            app.include_router(importlib.import_module(module).router, prefix=prefix, tags=tags)
 except Exception as e:
     print(f"Error loading routers: {e}")
     # App will still work with basic endpoints
 
+def openapi():
+    # The schema has to see every route, so load any router that has not been hit yet
+    load_lazy_routers(app)
+    return FastAPI.openapi(app)
+
+app.openapi = openapi
+
 @app.get("/")
 async def root():
     return {"message": "Budget App API is running!"}
@@ -61,6 +118,39 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def database_health_check():
+    """Connection pool statistics for spotting exhaustion under load."""
+    return {
+        "status": "healthy",
+        "pools": {
+            "async": pool_stats(async_engine.sync_engine),
+            "sync": pool_stats(engine),
+        },
+    }
+
+@app.get("/health/auth")
+async def auth_health_check():
+    """Password hashing pool and token cache statistics."""
+    return {
+        "status": "healthy",
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+    }
+
+@app.get("/health/cache")
+async def cache_health_check():
+    """Response cache statistics."""
+    return {"status": "healthy", "response_cache": response_cache.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-route latency, size, SQL and hashing time, pools and caches."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -1 +1,3 @@
 # Database models
+# Import every model module so all mappers (and their string relationships) are registered together
+from app.models import user, tax_deduction, investment, asset, expense, income, insurance, blob, report, search, sync, export  # noqa: F401
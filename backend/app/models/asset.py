@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -15,6 +15,9 @@ class AssetCategory(str, enum.Enum):
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        Index("ix_assets_user_category", "user_id", "category"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -40,6 +43,9 @@ class Asset(Base):
 
 class AssetDocument(Base):
     __tablename__ = "asset_documents"
+    __table_args__ = (
+        Index("ix_asset_documents_asset_id", "asset_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -48,7 +54,8 @@ class AssetDocument(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(String)
-    file_data = Column(Text)  # Base64 encoded
+    file_data = Column(Text)  # Legacy base64 payload; new uploads live in the blob store
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"), index=True)  # SHA-256 of the stored blob
     document_type = Column(String, nullable=False)  # "Purchase Receipt", "Warranty", etc.
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -58,6 +65,10 @@ class AssetDocument(Base):
 
 class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
+    __table_args__ = (
+        Index("ix_maintenance_records_asset_date", "asset_id", "date"),
+        Index("ix_maintenance_records_user_next_date", "user_id", "next_maintenance_date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -77,6 +88,9 @@ class MaintenanceRecord(Base):
 
 class MaintenanceDocument(Base):
     __tablename__ = "maintenance_documents"
+    __table_args__ = (
+        Index("ix_maintenance_documents_record_id", "maintenance_record_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -85,7 +99,8 @@ class MaintenanceDocument(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(String)
-    file_data = Column(Text)  # Base64 encoded
+    file_data = Column(Text)  # Legacy base64 payload; new uploads live in the blob store
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"), index=True)  # SHA-256 of the stored blob
     document_type = Column(String, nullable=False)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
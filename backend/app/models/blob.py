@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    # Content address: hex SHA-256 of the stored bytes, shared by every row that uploads the same file
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)  # In bytes
+    content_type = Column(String)
+    # Downscaled JPEG copies of images (blobs themselves), made by app.services.uploads
+    thumbnail_sha256 = Column(String(64))
+    preview_sha256 = Column(String(64))
+    # Last stored or re-uploaded; gc keeps unreferenced blobs for a grace period after this
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class BlobOwner(Base):
+    __tablename__ = "blob_owners"
+
+    # Users who uploaded a blob; only they may attach it to a document by its content hash
+    sha256 = Column(String(64), ForeignKey("blobs.sha256", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
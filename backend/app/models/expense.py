@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,6 +6,12 @@ import enum
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_date", "user_id", "date"),
+        Index("ix_expenses_user_next_due_date", "user_id", "next_due_date"),
+        # Scheduler scan across all users; non-recurring rows have no next_due_date
+        Index("ix_expenses_next_due_date", "next_due_date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from datetime import datetime, timezone
+from app.database import Base
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    # Background columnar export of a user's data, run by app.services.exports
+    __table_args__ = (
+        Index("ix_export_jobs_user_created", "user_id", "created_at"),
+        Index("ix_export_jobs_status_created", "status", "created_at"),  # Workers claim the oldest pending job
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    format = Column(String, nullable=False)  # "parquet" or "arrow"
+    year = Column(Integer)  # Only rows of this calendar year (UTC); None exports everything
+    status = Column(String, nullable=False, default="pending")  # "pending", "running", "done", "failed"
+    error = Column(Text)
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"))  # The zip archive, once done
+    size = Column(Integer)  # Archive size in bytes
+    row_counts = Column(Text)  # JSON {table: rows}
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))  # Refreshed by the worker between tables while running
+    finished_at = Column(DateTime(timezone=True))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -23,6 +23,9 @@ class DeductionCategory(str, enum.Enum):
 
 class IncomeSource(Base):
     __tablename__ = "income_sources"
+    __table_args__ = (
+        Index("ix_income_sources_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -39,6 +42,10 @@ class IncomeSource(Base):
 
 class Income(Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        Index("ix_incomes_user_year_month", "user_id", "year", "month"),
+        Index("ix_incomes_user_date", "user_id", "date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -60,6 +67,8 @@ class Income(Base):
 
 class MonthlyIncomeSummary(Base):
     __tablename__ = "monthly_income_summaries"
+    # One row per user and month, maintained incrementally by app.services.income_summary
+    __table_args__ = (UniqueConstraint("user_id", "year", "month", name="uq_monthly_income_summary_user_month"),)
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -68,7 +77,7 @@ class MonthlyIncomeSummary(Base):
     total_gross_income = Column(Integer, default=0)  # Store as cents
     total_net_income = Column(Integer, default=0)  # Store as cents
     total_deductions = Column(Integer, default=0)  # Store as cents
-    income_sources = Column(Text)  # JSON string
+    income_sources = Column(Text)  # JSON string: {income_source_id: {"gross", "net", "count"}}
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
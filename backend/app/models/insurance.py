@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -20,6 +20,11 @@ class PremiumFrequency(str, enum.Enum):
 
 class InsurancePolicy(Base):
     __tablename__ = "insurance_policies"
+    __table_args__ = (
+        Index("ix_insurance_policies_user_next_premium_date", "user_id", "next_premium_date"),
+        # Scheduler scan across all users
+        Index("ix_insurance_policies_next_premium_date", "next_premium_date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -45,6 +50,9 @@ class InsurancePolicy(Base):
 
 class InsuranceDocument(Base):
     __tablename__ = "insurance_documents"
+    __table_args__ = (
+        Index("ix_insurance_documents_policy_id", "policy_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -53,7 +61,8 @@ class InsuranceDocument(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(String)
-    file_data = Column(Text)  # Base64 encoded
+    file_data = Column(Text)  # Legacy base64 payload; new uploads live in the blob store
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"), index=True)  # SHA-256 of the stored blob
     document_type = Column(String, nullable=False)  # "Policy Document", "Premium Receipt", etc.
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -63,6 +72,10 @@ class InsuranceDocument(Base):
 
 class InsuranceClaim(Base):
     __tablename__ = "insurance_claims"
+    __table_args__ = (
+        Index("ix_insurance_claims_user_claim_date", "user_id", "claim_date"),
+        Index("ix_insurance_claims_policy_id", "policy_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -80,3 +93,20 @@ class InsuranceClaim(Base):
     # Relationships
     user = relationship("User", back_populates="insurance_claims")
     policy = relationship("InsurancePolicy", back_populates="claims")
+
+class PremiumPayment(Base):
+    __tablename__ = "premium_payments"
+    # One row per premium posted by the scheduler; the insurance report domain sums these
+    __table_args__ = (
+        Index("ix_premium_payments_user_due_date", "user_id", "due_date"),
+        Index("ix_premium_payments_policy_id", "policy_id"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    # Payments are kept as history when their policy is deleted
+    policy_id = Column(String, ForeignKey("insurance_policies.id", ondelete="SET NULL"))
+    policy_type = Column(Enum(InsurancePolicyType), nullable=False)
+    amount = Column(Integer, nullable=False)  # Store as cents
+    due_date = Column(DateTime(timezone=True), nullable=False)  # The premium's due date, when it was posted
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -26,6 +26,10 @@ class InvestmentType(str, enum.Enum):
 
 class InvestmentAsset(Base):
     __tablename__ = "investment_assets"
+    __table_args__ = (
+        Index("ix_investment_assets_user_id", "user_id"),
+        Index("ix_investment_assets_scheme_code", "scheme_code"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -56,6 +60,10 @@ class InvestmentAsset(Base):
 
 class Investment(Base):
     __tablename__ = "investments"
+    __table_args__ = (
+        Index("ix_investments_user_purchase_date", "user_id", "purchase_date"),
+        Index("ix_investments_asset_id", "asset_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -80,6 +88,10 @@ class Investment(Base):
 
 class InvestmentTransaction(Base):
     __tablename__ = "investment_transactions"
+    __table_args__ = (
+        Index("ix_investment_transactions_user_date", "user_id", "date"),
+        Index("ix_investment_transactions_investment_date", "investment_id", "date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -98,6 +110,9 @@ class InvestmentTransaction(Base):
 
 class Portfolio(Base):
     __tablename__ = "portfolios"
+    __table_args__ = (
+        Index("ix_portfolios_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -120,6 +135,9 @@ class PortfolioInvestment(Base):
 
 class InvestmentGoal(Base):
     __tablename__ = "investment_goals"
+    __table_args__ = (
+        Index("ix_investment_goals_user_target_date", "user_id", "target_date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -136,6 +154,9 @@ class InvestmentGoal(Base):
 
 class PolicyDocument(Base):
     __tablename__ = "policy_documents"
+    __table_args__ = (
+        Index("ix_policy_documents_asset_id", "asset_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -144,7 +165,8 @@ class PolicyDocument(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(String)
-    file_data = Column(Text)  # Base64 encoded
+    file_data = Column(Text)  # Legacy base64 payload; new uploads live in the blob store
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"), index=True)  # SHA-256 of the stored blob
     document_type = Column(String, nullable=False)  # "Policy Document", "Premium Receipt", etc.
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
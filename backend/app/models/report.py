@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ReportRollup(Base):
+    __tablename__ = "report_rollups"
+    # One cell per user, domain, month and category, maintained incrementally by app.services.reports
+    __table_args__ = (
+        UniqueConstraint("user_id", "domain", "year", "month", "category", name="uq_report_rollups_cell"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    domain = Column(String, nullable=False)  # "expense", "income", "investment", "insurance"
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)  # 1-12
+    category = Column(String, nullable=False)  # Expense category, income source id, transaction type, policy type
+    total = Column(BigInteger, nullable=False, default=0)  # Store as cents
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index, UniqueConstraint, DDL, event, literal_column, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    # One row per searchable entity, maintained by app.services.search
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+        Index("ix_search_documents_user_type", "user_id", "entity_type"),
+        # PostgreSQL full-text index; the expression is the one document_vector() builds for queries
+        Index(
+            "ix_search_documents_vector",
+            text("(setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B'))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Also the rowid of the SQLite FTS5 table
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    entity_type = Column(String, nullable=False)  # "expense", "asset", "insurance_document", ...
+    entity_id = Column(String, nullable=False)
+    title = Column(Text, nullable=False)
+    body = Column(Text, nullable=False, default="")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+def document_vector(title, body):
+    """PostgreSQL tsvector of a document, title words weighted above body words.
+
+    Queries must use this expression for ix_search_documents_vector to apply.
+    """
+    simple = literal_column("'simple'")
+    return func.setweight(func.to_tsvector(simple, title), literal_column("'A'")).op("||")(
+        func.setweight(func.to_tsvector(simple, body), literal_column("'B'"))
+    )
+
+# SQLite: an external-content FTS5 table over title and body, kept in sync by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+SQLITE_FTS_TABLES = ("search_documents_fts",)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    SearchDocument.__table__, "before_drop", DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    # Latest change of every synced entity, maintained by app.services.sync
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_change_log_entity"),
+        Index("ix_change_log_user_seq", "user_id", "seq"),
+        # SQLite would otherwise hand the seq of a replaced newest row to the next insert
+        {"sqlite_autoincrement": True},
+    )
+
+    # Grows with every change; an entity's row is replaced (with a new seq) each time it changes
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    entity_type = Column(String, nullable=False)  # "expense", "income", "tax_deduction", ...
+    entity_id = Column(String, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)  # Tombstone
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
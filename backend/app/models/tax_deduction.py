@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from app.database import Base
 
 class TaxDeduction(Base):
     __tablename__ = "tax_deductions"
+    __table_args__ = (
+        Index("ix_tax_deductions_user_created", "user_id", "created_at", "id"),  # Keyset pagination
+        Index("ix_tax_deductions_user_year", "user_id", "year"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -12,7 +17,8 @@ class TaxDeduction(Base):
     deduction_type = Column(String, nullable=False)
     amount = Column(Integer, nullable=False)  # Store as cents to avoid floating point issues
     description = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python-side default keeps sub-second precision on every dialect; (created_at, id) is the keyset for pagination
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -21,6 +27,9 @@ class TaxDeduction(Base):
 
 class DocumentAttachment(Base):
     __tablename__ = "document_attachments"
+    __table_args__ = (
+        Index("ix_document_attachments_tax_deduction_id", "tax_deduction_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     tax_deduction_id = Column(String, ForeignKey("tax_deductions.id"), nullable=False)
@@ -28,9 +37,20 @@ class DocumentAttachment(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_url = Column(String)  # For cloud storage
-    file_data = Column(Text)  # Base64 encoded file data
+    file_data = Column(Text)  # Legacy base64 payload; new uploads live in the blob store
+    content_hash = Column(String(64), ForeignKey("blobs.sha256"), index=True)  # SHA-256 of the stored blob
     document_type = Column(String, nullable=False)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     tax_deduction = relationship("TaxDeduction", back_populates="attachments")
+    blob = relationship("Blob", viewonly=True)
+
+    # Whether GET /api/documents/tax-deduction/{id}/thumbnail (or /preview) has an image; needs `blob` loaded
+    @property
+    def has_thumbnail(self) -> bool:
+        return self.blob is not None and self.blob.thumbnail_sha256 is not None
+
+    @property
+    def has_preview(self) -> bool:
+        return self.blob is not None and self.blob.preview_sha256 is not None
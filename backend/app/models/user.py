@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey  # pyright: ignore[reportMissingImports]
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index  # pyright: ignore[reportMissingImports]
 from sqlalchemy.orm import relationship  # pyright: ignore[reportMissingImports]
 from sqlalchemy.sql import func  # pyright: ignore[reportMissingImports]
 from app.database import Base
@@ -35,6 +35,9 @@ class User(Base):
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
+    __table_args__ = (
+        Index("ix_user_profiles_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
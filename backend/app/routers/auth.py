@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import uuid
 
-from app.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, get_current_user_id
+from app.database import get_async_db
+from app.core.security import (
+    password_hasher, create_access_token, get_current_user_id, get_current_principal, invalidate_principal
+)
+from app.core.cache import response_cache
 from app.core.config import settings
 from app.schemas.auth import UserCreate, UserLogin, Token, User
 from app.models.user import User as UserModel
@@ -14,10 +18,11 @@ router = APIRouter()
 security = HTTPBearer()
 
 @router.post("/register", response_model=User)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
     # Check if user already exists
-    existing_user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
+    result = await db.execute(select(UserModel).where(UserModel.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,7 +30,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user = UserModel(
         id=str(uuid.uuid4()),
         email=user_data.email,
@@ -33,22 +38,34 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user and return access token."""
-    user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
-    
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    result = await db.execute(select(UserModel).where(UserModel.email == user_data.email))
+    user = result.scalars().first()
+
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(user_data.password, user.hashed_password)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Stored hash uses an outdated bcrypt cost; upgrade it now that we know the password
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_principal(user.id)
+        await response_cache.invalidate(user.id, "auth")
     
     if not user.is_active:
         raise HTTPException(
@@ -64,12 +81,9 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+async def read_users_me(request: Request, current_user_id: str = Depends(get_current_user_id)):
     """Get current user information."""
-    user = db.query(UserModel).filter(UserModel.id == current_user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    cached = await response_cache.lookup(request, current_user_id, "auth")
+    if cached.response is not None:
+        return cached.response
+    return await cached.store(await get_current_principal(current_user_id), User)
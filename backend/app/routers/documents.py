@@ -0,0 +1,170 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, defer
+import binascii
+
+from app.database import get_async_db
+from app.core.security import get_current_user_id
+from app.models.asset import AssetDocument, MaintenanceDocument
+from app.models.blob import Blob
+from app.models.insurance import InsuranceDocument
+from app.models.investment import PolicyDocument
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.schemas.document import UploadedDocument
+from app.services.blob_store import StoredBlob, get_blob_store, iter_base64_chunks, register_blob
+from app.services.downloads import download_response, payload_etag
+from app.services.uploads import IMAGE_TYPES, MultipartUpload, thumbnail_renderer
+
+router = APIRouter()
+
+# Path segment -> document model
+DOCUMENT_KINDS = {
+    "tax-deduction": DocumentAttachment,
+    "asset": AssetDocument,
+    "maintenance": MaintenanceDocument,
+    "insurance": InsuranceDocument,
+    "policy": PolicyDocument,
+}
+
+async def _get_user_document(db: AsyncSession, kind: str, document_id: str, user_id: str):
+    """Load a document of any kind owned by the user, or raise 404."""
+    model = DOCUMENT_KINDS.get(kind)
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown document kind"
+        )
+
+    query = select(model).options(defer(model.file_data, raiseload=True)).where(model.id == document_id)
+    if model is DocumentAttachment:
+        # Tax deduction attachments are owned through their deduction
+        query = query.join(TaxDeduction).where(TaxDeduction.user_id == user_id)
+    else:
+        query = query.where(model.user_id == user_id)
+    document = (await db.execute(query)).scalars().first()
+
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+    return document
+
+@router.post("/upload", response_model=UploadedDocument)
+async def upload_document(
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream a file (multipart/form-data field `file`) into the blob store.
+
+    The type is detected from the content and must be one of ALLOWED_FILE_TYPES;
+    images also get a thumbnail and a preview. Attach the file to a document by
+    passing the returned `content_hash` when creating it.
+    """
+    upload = MultipartUpload(request)
+    stored = await run_in_threadpool(get_blob_store().put, upload.chunks())
+    blob = await register_blob(db, stored, upload.content_type, current_user_id)
+
+    if upload.content_type in IMAGE_TYPES and blob.thumbnail_sha256 is None:
+        rendered = await thumbnail_renderer.render(stored.digest)
+        for digest, size in rendered.values():
+            await register_blob(db, StoredBlob(digest=digest, size=size), "image/jpeg")
+        blob.thumbnail_sha256 = rendered.get("thumbnail", (None,))[0]
+        blob.preview_sha256 = rendered.get("preview", (None,))[0]
+
+    await db.commit()
+    return UploadedDocument(
+        content_hash=stored.digest,
+        file_name=upload.file_name,
+        file_type=upload.content_type,
+        file_size=stored.size,
+        has_thumbnail=blob.thumbnail_sha256 is not None,
+        has_preview=blob.preview_sha256 is not None,
+    )
+
+@router.api_route("/{kind}/{document_id}/download", methods=["GET", "HEAD"])
+async def download_document(
+    kind: str,
+    document_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Raw bytes of a document.
+
+    Send `Range: bytes=<start>-` to resume an interrupted download (206), and
+    If-None-Match / If-Modified-Since with the ETag / Last-Modified of an
+    earlier response to get a 304 when the file has not changed.
+    """
+    document = await _get_user_document(db, kind, document_id, current_user_id)
+    blob = await db.get(Blob, document.content_hash) if document.content_hash else None
+    if blob is not None:
+        return download_response(
+            request, blob.size, document.file_type, f'"{blob.sha256}"', document.upload_date,
+            digest=blob.sha256, file_name=document.file_name,
+        )
+
+    # Legacy rows keep the file as base64 in file_data
+    model = DOCUMENT_KINDS[kind]
+    file_data = (await db.execute(select(model.file_data).where(model.id == document.id))).scalar()
+    if not file_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="This document has no content"
+        )
+    try:
+        data = b"".join(iter_base64_chunks(file_data))
+    except binascii.Error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="This document's content is not valid base64"
+        )
+    return download_response(
+        request, len(data), document.file_type, payload_etag(data), document.upload_date,
+        data=data, file_name=document.file_name,
+    )
+
+async def _image_response(request: Request, db: AsyncSession, kind: str, document_id: str, user_id: str,
+                          variant: str):
+    document = await _get_user_document(db, kind, document_id, user_id)
+    source = aliased(Blob)
+    image = (await db.execute(
+        select(Blob).join(source, getattr(source, f"{variant}_sha256") == Blob.sha256)
+        .where(source.sha256 == document.content_hash)
+    )).scalars().first() if document.content_hash else None
+    if image is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"This document has no {variant}"
+        )
+
+    # Content-addressed, so the image behind a digest never changes
+    return download_response(
+        request, image.size, "image/jpeg", f'"{image.sha256}"', image.created_at,
+        digest=image.sha256, cache_control="private, max-age=31536000, immutable",
+    )
+@router.get("/{kind}/{document_id}/thumbnail")
+async def get_document_thumbnail(
+    kind: str,
+    document_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Small JPEG rendition of an image document."""
+    return await _image_response(request, db, kind, document_id, current_user_id, "thumbnail")
+
+@router.get("/{kind}/{document_id}/preview")
+async def get_document_preview(
+    kind: str,
+    document_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Screen-sized JPEG rendition of an image document."""
+    return await _image_response(request, db, kind, document_id, current_user_id, "preview")
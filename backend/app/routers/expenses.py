@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_async_db
 from app.core.security import get_current_user_id
+from app.core.cache import response_cache
+from app.schemas.expense import ExpenseImportResult
+from app.services.expense_import import import_expenses
 
 router = APIRouter()
 
 @router.get("/")
 async def get_expenses(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all expenses for the current user."""
     # TODO: Implement expense retrieval
@@ -17,8 +21,38 @@ async def get_expenses(
 @router.post("/")
 async def create_expense(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new expense."""
     # TODO: Implement expense creation
     return {"message": "Create expense endpoint - TODO"}
+
+@router.post("/bulk", response_model=ExpenseImportResult)
+async def bulk_import_expenses(
+    request: Request,
+    format: Optional[str] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Import expenses from a streamed CSV or NDJSON request body.
+
+    The format comes from `?format=csv|ndjson` or the Content-Type header.
+    Valid rows are inserted in one transaction; invalid rows are reported by line.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonlines" in content_type:
+            format = "ndjson"
+
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+
+    result = await import_expenses(db, current_user_id, request.stream(), format)
+    if result.inserted:
+        await response_cache.invalidate(current_user_id, "expenses", "reports")
+    return result
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import uuid
+
+from app.database import get_async_db
+from app.core.security import get_current_user_id
+from app.models.export import ExportJob as ExportJobModel
+from app.schemas.export import ExportCreate, ExportJob
+from app.services.downloads import download_response
+from app.services.exports import ARCHIVE_TYPE, export_file_name, export_runner, pyarrow_available
+
+router = APIRouter()
+
+async def _get_user_job(db: AsyncSession, job_id: str, user_id: str) -> ExportJobModel:
+    job = (await db.execute(
+        select(ExportJobModel).where(ExportJobModel.id == job_id, ExportJobModel.user_id == user_id)
+    )).scalars().first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    return job
+
+@router.post("/", response_model=ExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export: ExportCreate,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a Parquet or Arrow IPC export of the user's data; poll the job until it is done."""
+    if not pyarrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Exports are not available on this server"
+        )
+    active = (await db.execute(
+        select(ExportJobModel.id).where(
+            ExportJobModel.user_id == current_user_id, ExportJobModel.status.in_(("pending", "running"))
+        ).limit(1)
+    )).first()
+    if active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An export is already in progress"
+        )
+
+    job = ExportJobModel(id=str(uuid.uuid4()), user_id=current_user_id, format=export.format, year=export.year,
+                         status="pending")
+    db.add(job)
+    await db.commit()
+    export_runner.wake()
+    return job
+
+@router.get("/", response_model=List[ExportJob])
+async def list_exports(
+    limit: int = Query(20, ge=1, le=100),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(
+        select(ExportJobModel).where(ExportJobModel.user_id == current_user_id)
+        .order_by(ExportJobModel.created_at.desc()).limit(limit)
+    )
+    return result.scalars().all()
+
+@router.get("/{job_id}", response_model=ExportJob)
+async def get_export(
+    job_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await _get_user_job(db, job_id, current_user_id)
+
+@router.api_route("/{job_id}/download", methods=["GET", "HEAD"])
+async def download_export(
+    job_id: str,
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The export's zip archive: one file per table plus manifest.json. Supports Range requests."""
+    job = await _get_user_job(db, job_id, current_user_id)
+    if job.status != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status}"
+        )
+    return download_response(
+        request, job.size, ARCHIVE_TYPE, f'"{job.content_hash}"', last_modified=job.finished_at,
+        digest=job.content_hash, file_name=export_file_name(job)
+    )
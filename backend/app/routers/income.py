@@ -1,24 +1,165 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import uuid
+
+from app.database import get_async_db
 from app.core.security import get_current_user_id
+from app.core.cache import response_cache
+from app.schemas.income import (
+    Income, IncomeCreate, IncomeUpdate, IncomeSource, IncomeSourceCreate, MonthlyIncomeSummary
+)
+from app.models.income import (
+    Income as IncomeModel, IncomeSource as IncomeSourceModel, MonthlyIncomeSummary as MonthlyIncomeSummaryModel
+)
 
 router = APIRouter()
 
-@router.get("/")
+CACHE_NAMESPACE = "income"
+
+async def _check_income_source(db: AsyncSession, source_id: str, user_id: str) -> None:
+    source = await db.get(IncomeSourceModel, source_id)
+    if not source or source.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Income source not found"
+        )
+
+async def _get_user_income(db: AsyncSession, income_id: str, user_id: str) -> IncomeModel:
+    income = await db.get(IncomeModel, income_id)
+    if not income or income.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Income record not found"
+        )
+    return income
+
+@router.get("/", response_model=List[Income])
 async def get_income(
+    request: Request,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get income records for the current user, optionally for one year or month."""
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
+
+    query = select(IncomeModel).where(IncomeModel.user_id == current_user_id)
+    if year is not None:
+        query = query.where(IncomeModel.year == year)
+    if month is not None:
+        query = query.where(IncomeModel.month == month)
+    result = await db.execute(query.order_by(IncomeModel.date.desc()))
+    return await cached.store(result.scalars().all(), List[Income])
+
+@router.get("/sources", response_model=List[IncomeSource])
+async def get_income_sources(
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all income sources for the current user."""
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
+
+    result = await db.execute(select(IncomeSourceModel).where(IncomeSourceModel.user_id == current_user_id))
+    return await cached.store(result.scalars().all(), List[IncomeSource])
+
+@router.post("/sources", response_model=IncomeSource)
+async def create_income_source(
+    source_data: IncomeSourceCreate,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new income source."""
+    source = IncomeSourceModel(id=str(uuid.uuid4()), user_id=current_user_id, **source_data.dict())
+    db.add(source)
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE)
+    await db.refresh(source)
+    return source
+
+@router.get("/summary", response_model=List[MonthlyIncomeSummary])
+async def get_income_summary(
+    request: Request,
+    year: Optional[int] = None,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all income records for the current user."""
-    # TODO: Implement income retrieval
-    return {"message": "Income endpoint - TODO"}
+    """Get materialized monthly income summaries (one row per month)."""
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
 
-@router.post("/")
+    query = select(MonthlyIncomeSummaryModel).where(MonthlyIncomeSummaryModel.user_id == current_user_id)
+    if year is not None:
+        query = query.where(MonthlyIncomeSummaryModel.year == year)
+    result = await db.execute(query.order_by(MonthlyIncomeSummaryModel.year, MonthlyIncomeSummaryModel.month))
+    return await cached.store(result.scalars().all(), List[MonthlyIncomeSummary])
+
+@router.post("/", response_model=Income)
 async def create_income(
+    income_data: IncomeCreate,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new income record."""
-    # TODO: Implement income creation
-    return {"message": "Create income endpoint - TODO"}
+    await _check_income_source(db, income_data.income_source_id, current_user_id)
+    income = IncomeModel(
+        id=str(uuid.uuid4()),
+        user_id=current_user_id,
+        month=income_data.date.month,
+        year=income_data.date.year,
+        **income_data.dict()
+    )
+    db.add(income)
+    await db.commit()
+    # Income also feeds the reporting cube
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE, "reports")
+    await db.refresh(income)
+    return income
+
+@router.put("/{income_id}", response_model=Income)
+async def update_income(
+    income_id: str,
+    income_data: IncomeUpdate,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an income record."""
+    income = await _get_user_income(db, income_id, current_user_id)
+
+    # Update fields if provided
+    update_data = income_data.dict(exclude_unset=True)
+    if "income_source_id" in update_data:
+        await _check_income_source(db, update_data["income_source_id"], current_user_id)
+    if update_data.get("date"):
+        update_data["month"] = update_data["date"].month
+        update_data["year"] = update_data["date"].year
+    for field, value in update_data.items():
+        setattr(income, field, value)
+
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE, "reports")
+    await db.refresh(income)
+    return income
+
+@router.delete("/{income_id}")
+async def delete_income(
+    income_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an income record."""
+    income = await _get_user_income(db, income_id, current_user_id)
+
+    await db.delete(income)
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE, "reports")
+
+    return {"message": "Income record deleted successfully"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.core.security import get_current_user_id
 
 router = APIRouter()
@@ -8,7 +8,7 @@ router = APIRouter()
 @router.get("/")
 async def get_insurance_policies(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all insurance policies for the current user."""
     # TODO: Implement insurance policy retrieval
@@ -17,7 +17,7 @@ async def get_insurance_policies(
 @router.post("/")
 async def create_insurance_policy(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new insurance policy."""
     # TODO: Implement insurance policy creation
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from typing import List, Optional
+from app.database import get_async_db
 from app.core.security import get_current_user_id
+from app.schemas.investment import (
+    PortfolioValuation, SchemeSearchResult, NavHistory, ProjectionRequest, ProjectionResponse
+)
+from app.services import scheme_index
+from app.services.nav_store import NAV_SCALE, from_day, get_nav_store, sync_scheme
+from app.services.portfolio import load_cash_flows, value_portfolio
+from app.services.projections import project
 
 router = APIRouter()
 
 @router.get("/")
 async def get_investments(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all investments for the current user."""
     # TODO: Implement investment retrieval
@@ -17,8 +27,91 @@ async def get_investments(
 @router.post("/")
 async def create_investment(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new investment."""
     # TODO: Implement investment creation
     return {"message": "Create investment endpoint - TODO"}
+
+@router.get("/valuation", response_model=PortfolioValuation)
+async def get_portfolio_valuation(
+    as_of: Optional[datetime] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Value every investment of the current user: holdings, gains, CAGR and XIRR."""
+    flows = await load_cash_flows(db, current_user_id)
+    return value_portfolio(flows, as_of)
+
+@router.get("/schemes/search", response_model=List[SchemeSearchResult])
+async def search_schemes(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Ranked prefix/fuzzy search over mutual fund scheme names."""
+    index = scheme_index.current
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scheme index is not loaded yet"
+        )
+    return index.search(q, limit)
+
+@router.get("/schemes/{scheme_code}/nav", response_model=NavHistory)
+async def get_scheme_nav(
+    scheme_code: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Daily NAV history of a scheme, optionally limited to [start, end]."""
+    if not scheme_code.isalnum():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid scheme code"
+        )
+
+    store = get_nav_store()
+    series = await run_in_threadpool(store.read, scheme_code)
+    if not len(series):
+        # First request for this scheme: pull its history into the store
+        try:
+            await run_in_threadpool(sync_scheme, scheme_code, store)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="NAV feed unavailable"
+            )
+        series = await run_in_threadpool(store.read, scheme_code)
+    if not len(series):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="NAV history not found"
+        )
+
+    window = series.range(start, end)
+    latest_day, latest_nav = series.latest()
+    navs = (window.navs / NAV_SCALE).tolist()
+    return {
+        "scheme_code": scheme_code,
+        "latest": {"date": latest_day, "nav": latest_nav / NAV_SCALE},
+        "points": [{"date": from_day(day), "nav": nav} for day, nav in zip(window.days.tolist(), navs)],
+    }
+
+@router.post("/projections", response_model=ProjectionResponse)
+async def create_projections(
+    request: ProjectionRequest,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Project SIP/SWP outcomes for every rate x tenure x step-up scenario in one pass."""
+    params = request.model_dump(exclude={"monte_carlo"})
+    params["monte_carlo"] = request.monte_carlo.model_dump() if request.monte_carlo else None
+    try:
+        # CPU-bound; keep it off the event loop
+        return await run_in_threadpool(project, **params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
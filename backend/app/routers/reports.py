@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database import get_async_db
+from app.core.security import get_current_user_id
+from app.core.cache import response_cache
+from app.schemas.report import Report
+from app.models.report import ReportRollup
+from app.services.reports import DIMENSIONS, DOMAINS
+
+router = APIRouter()
+
+CACHE_NAMESPACE = "reports"
+
+def _period(value: str) -> int:
+    year, month = value.split("-")
+    return int(year) * 100 + int(month)
+
+@router.get("/", response_model=Report)
+async def get_report(
+    request: Request,
+    group_by: List[str] = Query(["domain", "year", "month"]),
+    domain: Optional[List[str]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    year: Optional[int] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Slice the reporting cube for the current user.
+
+    Cells are summed over every dimension not listed in `group_by`
+    (domain, year, month, category). Filter with `domain`, `category`,
+    `year`/`month`, or an inclusive `start`/`end` range of YYYY-MM months;
+    drilling down is the same query with one more group_by dimension.
+    """
+    invalid = [name for name in group_by if name not in DIMENSIONS]
+    invalid += [name for name in domain or [] if name not in DOMAINS]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown dimension or domain: {', '.join(invalid)}"
+        )
+
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
+
+    dimensions = [name for name in DIMENSIONS if name in group_by]
+    columns = [getattr(ReportRollup, name) for name in dimensions]
+    query = select(
+        *columns, func.sum(ReportRollup.total), func.sum(ReportRollup.count)
+    ).where(ReportRollup.user_id == current_user_id)
+
+    if domain:
+        query = query.where(ReportRollup.domain.in_(domain))
+    if category:
+        query = query.where(ReportRollup.category.in_(category))
+    if year is not None:
+        query = query.where(ReportRollup.year == year)
+    if month is not None:
+        query = query.where(ReportRollup.month == month)
+    period = ReportRollup.year * 100 + ReportRollup.month
+    if start:
+        query = query.where(period >= _period(start))
+    if end:
+        query = query.where(period <= _period(end))
+
+    result = await db.execute(query.group_by(*columns).order_by(*columns))
+    cells = []
+    for row in result:
+        cell = dict(zip(dimensions, row[:len(dimensions)]))
+        cell.update(total=int(row[-2] or 0), count=int(row[-1] or 0))
+        cells.append(cell)
+
+    return await cached.store({
+        "group_by": dimensions,
+        "cells": cells,
+        "total": sum(cell["total"] for cell in cells),
+        "count": sum(cell["count"] for cell in cells),
+    }, Report)
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database import get_async_db
+from app.core.security import get_current_user_id
+from app.core.pagination import encode_rank_cursor, decode_rank_cursor
+from app.schemas.search import SearchResult
+from app.services.search import ENTITY_TYPES, query_terms, search_statement
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search the current user's expenses, insurance policies, assets and document names.
+
+    Results are ranked by relevance; every word of `q` must match, as a
+    prefix. Restrict to entity types with repeated `type` parameters. Pass
+    the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    invalid = [name for name in type or [] if name not in ENTITY_TYPES]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown entity type: {', '.join(invalid)}"
+        )
+
+    terms = query_terms(q)
+    if not terms:
+        return []
+
+    after = decode_rank_cursor(cursor) if cursor else None
+    dialect = (await db.connection()).dialect.name
+    result = await db.execute(search_statement(dialect, current_user_id, terms, type, limit, after))
+    rows = result.all()
+
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(rows[-1].rank, rows[-1].id)
+    return rows
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.core.security import get_current_user_id
+from app.schemas.sync import SyncBatch
+from app.services.sync import change_batch
+
+router = APIRouter()
+
+@router.get("/", response_model=SyncBatch)
+async def sync_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Rows changed and deleted since the last sync, oldest changes first.
+
+    Start without `since` to get every row, then pass the returned `token`
+    back as `since`; repeat while `has_more` is true. A 410 means the token
+    is too old to know what was deleted since, and the client must start
+    over without `since`.
+    """
+    return await change_batch(db, current_user_id, since, limit)
@@ -1,53 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, raiseload, selectinload
+from typing import List, Optional
 import uuid
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.security import get_current_user_id
-from app.schemas.tax_deduction import TaxDeduction, TaxDeductionCreate, TaxDeductionUpdate, DocumentAttachment
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.cache import response_cache
+from app.services.blob_store import get_owned_blob, store_base64
+from app.schemas.tax_deduction import TaxDeduction, TaxDeductionCreate, TaxDeductionUpdate
 from app.models.tax_deduction import TaxDeduction as TaxDeductionModel, DocumentAttachment as DocumentAttachmentModel
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = 500
+CACHE_NAMESPACE = "tax-deductions"
+
+# Default loader options; endpoints that need other relationships pass their own `load`.
+# Attachments (and their blobs, for thumbnail flags) come in one IN query each per page
+# without the legacy base64 payload, and any relationship not listed raises instead of
+# lazy-loading row by row, so a new field on the response schema cannot quietly add an N+1.
+DEDUCTION_LOAD = (
+    selectinload(TaxDeductionModel.attachments).options(
+        defer(DocumentAttachmentModel.file_data, raiseload=True),
+        selectinload(DocumentAttachmentModel.blob),
+    ),
+    raiseload("*"),
+)
+
+async def _deductions_page(db: AsyncSession, user_id: str, limit: int, cursor: Optional[str] = None,
+                           load=DEDUCTION_LOAD):
+    """Fetch one keyset page of deductions, newest first, ordered by (created_at, id)."""
+    query = select(TaxDeductionModel).options(*load).where(TaxDeductionModel.user_id == user_id)
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(TaxDeductionModel.created_at, TaxDeductionModel.id) < tuple_(created_at, row_id)
+        )
+
+    result = await db.execute(query.order_by(
+        TaxDeductionModel.created_at.desc(), TaxDeductionModel.id.desc()
+    ).limit(limit))
+    deductions = result.scalars().all()
+
+    next_cursor = None
+    if len(deductions) == limit:
+        last = deductions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return deductions, next_cursor
+
+async def _get_user_deduction(db: AsyncSession, deduction_id: str, user_id: str,
+                             load=DEDUCTION_LOAD) -> TaxDeductionModel:
+    """Load a deduction owned by the user, with attachments, or raise 404."""
+    result = await db.execute(
+        select(TaxDeductionModel).options(*load).where(
+            TaxDeductionModel.id == deduction_id,
+            TaxDeductionModel.user_id == user_id
+        )
+    )
+    deduction = result.scalars().first()
+
+    if not deduction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tax deduction not found"
+        )
+
+    return deduction
+
 @router.get("/", response_model=List[TaxDeduction])
 async def get_tax_deductions(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of tax deductions for the current user.
+
+    Pages are keyset-paginated on (created_at, id); pass the X-Next-Cursor
+    response header back as `cursor` to fetch the next page.
+    """
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
+
+    deductions, next_cursor = await _deductions_page(db, current_user_id, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return await cached.store(deductions, List[TaxDeduction], headers)
+
+@router.get("/export")
+async def export_tax_deductions(
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all tax deductions for the current user."""
-    deductions = db.query(TaxDeductionModel).filter(
-        TaxDeductionModel.user_id == current_user_id
-    ).offset(skip).limit(limit).all()
-    return deductions
+    """Stream every tax deduction for the current user as NDJSON."""
+    async def generate():
+        cursor = None
+        while True:
+            deductions, cursor = await _deductions_page(db, current_user_id, EXPORT_BATCH_SIZE, cursor)
+            for deduction in deductions:
+                yield TaxDeduction.model_validate(deduction).model_dump_json() + "\n"
+            # Drop the batch from the identity map so memory stays bounded
+            db.expunge_all()
+            if cursor is None:
+                break
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @router.get("/{deduction_id}", response_model=TaxDeduction)
 async def get_tax_deduction(
     deduction_id: str,
+    request: Request,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific tax deduction."""
-    deduction = db.query(TaxDeductionModel).filter(
-        TaxDeductionModel.id == deduction_id,
-        TaxDeductionModel.user_id == current_user_id
-    ).first()
-    
-    if not deduction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tax deduction not found"
-        )
-    
-    return deduction
+    cached = await response_cache.lookup(request, current_user_id, CACHE_NAMESPACE)
+    if cached.response is not None:
+        return cached.response
+
+    deduction = await _get_user_deduction(db, deduction_id, current_user_id)
+    return await cached.store(deduction, TaxDeduction)
 
 @router.post("/", response_model=TaxDeduction)
 async def create_tax_deduction(
     deduction_data: TaxDeductionCreate,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new tax deduction."""
     deduction = TaxDeductionModel(
@@ -56,28 +140,44 @@ async def create_tax_deduction(
         year=deduction_data.year,
         deduction_type=deduction_data.deduction_type,
         amount=deduction_data.amount,
-        description=deduction_data.description
+        description=deduction_data.description,
+        attachments=[]
     )
-    
+
     db.add(deduction)
-    
-    # Add attachments if any
+
+    # Add attachments if any; file contents go to the blob store, rows keep only the hash
     if deduction_data.attachments:
         for attachment_data in deduction_data.attachments:
-            attachment = DocumentAttachmentModel(
+            content_hash = attachment_data.content_hash
+            file_size = attachment_data.file_size
+            blob = None
+            if attachment_data.file_data:
+                blob = await store_base64(db, attachment_data.file_data, attachment_data.file_type, current_user_id)
+                content_hash, file_size = blob.sha256, blob.size
+            elif content_hash:
+                # Only content this user uploaded; the same 400 whether or not someone else has it
+                blob = await get_owned_blob(db, content_hash, current_user_id)
+                if blob is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Unknown content hash for {attachment_data.file_name}"
+                    )
+                file_size = blob.size
+
+            deduction.attachments.append(DocumentAttachmentModel(
                 id=str(uuid.uuid4()),
-                tax_deduction_id=deduction.id,
                 file_name=attachment_data.file_name,
                 file_type=attachment_data.file_type,
-                file_size=attachment_data.file_size,
+                file_size=file_size,
                 file_url=attachment_data.file_url,
-                file_data=attachment_data.file_data,
-                document_type=attachment_data.document_type
-            )
-            db.add(attachment)
-    
-    db.commit()
-    db.refresh(deduction)
+                content_hash=content_hash,
+                document_type=attachment_data.document_type,
+                blob=blob  # Already at hand, so the response needs no lazy load
+            ))
+
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE)
     return deduction
 
 @router.put("/{deduction_id}", response_model=TaxDeduction)
@@ -85,48 +185,31 @@ async def update_tax_deduction(
     deduction_id: str,
     deduction_data: TaxDeductionUpdate,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a tax deduction."""
-    deduction = db.query(TaxDeductionModel).filter(
-        TaxDeductionModel.id == deduction_id,
-        TaxDeductionModel.user_id == current_user_id
-    ).first()
-    
-    if not deduction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tax deduction not found"
-        )
-    
+    deduction = await _get_user_deduction(db, deduction_id, current_user_id)
+
     # Update fields if provided
     update_data = deduction_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(deduction, field, value)
-    
-    db.commit()
-    db.refresh(deduction)
+
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE)
     return deduction
 
 @router.delete("/{deduction_id}")
 async def delete_tax_deduction(
     deduction_id: str,
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a tax deduction."""
-    deduction = db.query(TaxDeductionModel).filter(
-        TaxDeductionModel.id == deduction_id,
-        TaxDeductionModel.user_id == current_user_id
-    ).first()
-    
-    if not deduction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tax deduction not found"
-        )
-    
-    db.delete(deduction)
-    db.commit()
-    
+    deduction = await _get_user_deduction(db, deduction_id, current_user_id)
+
+    await db.delete(deduction)
+    await db.commit()
+    await response_cache.invalidate(current_user_id, CACHE_NAMESPACE)
+
     return {"message": "Tax deduction deleted successfully"}
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+class UploadedDocument(BaseModel):
+    content_hash: str  # Pass as `content_hash` when creating the document that holds the file
+    file_name: str
+    file_type: str  # Detected from the content, not the declared type
+    file_size: int
+    has_thumbnail: bool
+    has_preview: bool
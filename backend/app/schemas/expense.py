@@ -0,0 +1,43 @@
+import json
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, Any
+from datetime import datetime
+
+class ExpenseImportRow(BaseModel):
+    amount: int  # In cents
+    description: str
+    category: str
+    date: datetime
+    is_recurring: bool = False
+    recurrence_interval: Optional[str] = None
+    next_due_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    tags: Optional[str] = None  # Stored as a JSON array string
+    notes: Optional[str] = None
+
+    @field_validator("date", "next_due_date", "end_date", mode="before")
+    @classmethod
+    def accept_plain_dates(cls, value: Any) -> Any:
+        # Bank exports usually carry dates without a time component
+        if isinstance(value, str) and len(value) == 10:
+            return value + "T00:00:00"
+        return value
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def normalize_tags(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return json.dumps([str(tag) for tag in value])
+        if isinstance(value, str) and value and not value.startswith("["):
+            return json.dumps([tag.strip() for tag in value.split(",") if tag.strip()])
+        return value
+
+class ExpenseImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+class ExpenseImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ExpenseImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,30 @@
+import json
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, Literal, Optional
+from datetime import datetime
+
+class ExportCreate(BaseModel):
+    format: Literal["parquet", "arrow"] = "parquet"  # "arrow" is the Arrow IPC file format
+    year: Optional[int] = Field(None, ge=1900, le=2100)  # Only this calendar year; omit for everything
+
+class ExportJob(BaseModel):
+    id: str
+    format: str
+    year: Optional[int] = None
+    status: str  # "pending", "running", "done" (download ready) or "failed"
+    error: Optional[str] = None
+    size: Optional[int] = None  # Archive size in bytes
+    row_counts: Dict[str, int] = {}  # Table -> rows exported
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator("row_counts", mode="before")
+    @classmethod
+    def parse_row_counts(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return json.loads(value)
+        return value or {}
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,67 @@
+import json
+from pydantic import BaseModel, field_validator
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+from app.models.income import IncomeSourceType, DeductionCategory
+
+class IncomeSourceCreate(BaseModel):
+    name: str
+    type: IncomeSourceType
+    deduction_category: Optional[DeductionCategory] = None
+
+class IncomeSource(IncomeSourceCreate):
+    id: str
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class IncomeBase(BaseModel):
+    income_source_id: str
+    amount: int  # In cents
+    gross_amount: Optional[int] = None  # In cents
+    net_amount: Optional[int] = None  # In cents
+    date: datetime
+    description: Optional[str] = None
+    notes: Optional[str] = None
+
+class IncomeCreate(IncomeBase):
+    pass
+
+class IncomeUpdate(BaseModel):
+    income_source_id: Optional[str] = None
+    amount: Optional[int] = None
+    gross_amount: Optional[int] = None
+    net_amount: Optional[int] = None
+    date: Optional[datetime] = None
+    description: Optional[str] = None
+    notes: Optional[str] = None
+
+class Income(IncomeBase):
+    id: str
+    month: int
+    year: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class MonthlyIncomeSummary(BaseModel):
+    year: int
+    month: int
+    total_gross_income: int  # In cents
+    total_net_income: int  # In cents
+    total_deductions: int  # In cents
+    income_sources: Dict[str, Dict[str, int]] = {}  # income_source_id -> {"gross", "net", "count"}
+
+    @field_validator("income_sources", mode="before")
+    @classmethod
+    def parse_income_sources(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return json.loads(value)
+        return value or {}
+
+    class Config:
+        from_attributes = True
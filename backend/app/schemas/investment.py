@@ -0,0 +1,84 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, Literal, Optional, List
+from datetime import date, datetime
+
+class InvestmentValuation(BaseModel):
+    investment_id: str
+    asset_name: str
+    units: float
+    invested: int  # In cents
+    current_value: int  # In cents
+    unrealized_gain: int  # In cents
+    realized_gain: int  # In cents, includes dividends/interest
+    cagr: Optional[float] = None  # Annualized, 0.12 == 12%
+    xirr: Optional[float] = None  # Annualized, 0.12 == 12%
+
+class PortfolioValuation(BaseModel):
+    as_of: datetime
+    investments: List[InvestmentValuation]
+    total_invested: int  # In cents
+    total_current_value: int  # In cents
+    total_unrealized_gain: int  # In cents
+    total_realized_gain: int  # In cents
+    cagr: Optional[float] = None
+    xirr: Optional[float] = None
+
+class SchemeSearchResult(BaseModel):
+    scheme_code: str
+    scheme_name: str
+    score: float
+
+class NavPoint(BaseModel):
+    date: date
+    nav: float  # In rupees
+
+class NavHistory(BaseModel):
+    scheme_code: str
+    latest: Optional[NavPoint] = None
+    points: List[NavPoint]
+
+class MonteCarloOptions(BaseModel):
+    paths: int = Field(1000, ge=10, le=10000)
+    volatility: float = Field(15.0, ge=0, le=100)  # Annualized, in percent
+    seed: Optional[int] = None
+
+class ProjectionRequest(BaseModel):
+    mode: Literal["sip", "swp"] = "sip"
+    monthly_amount: int = Field(..., ge=0)  # In cents; contribution (SIP) or withdrawal (SWP)
+    initial_amount: int = Field(0, ge=0)  # In cents; lumpsum at the start, the corpus for SWP
+    # Expected returns in percent
+    annual_rates: List[Annotated[float, Field(gt=-100, le=100)]] = Field(..., min_length=1, max_length=200)
+    tenures_years: List[Annotated[int, Field(ge=1, le=100)]] = Field(..., min_length=1, max_length=50)
+    # Yearly increase of monthly_amount in percent
+    step_ups: List[Annotated[float, Field(ge=0, le=100)]] = Field([0.0], min_length=1, max_length=50)
+    target_amount: Optional[int] = Field(None, ge=0)  # In cents, for goal planning
+    start_date: Optional[date] = None
+    include_curves: bool = True
+    monte_carlo: Optional[MonteCarloOptions] = None
+
+class MonteCarloSummary(BaseModel):
+    p10: int  # In cents
+    p50: int
+    p90: int
+    target_probability: Optional[float] = None
+    depletion_probability: Optional[float] = None  # SWP only
+    median_curve: Optional[List[int]] = None
+
+class ProjectionScenario(BaseModel):
+    annual_rate: float
+    tenure_years: int
+    step_up: float
+    total_flow: int  # In cents; total contributed (SIP) or withdrawn (SWP)
+    final_value: int  # In cents
+    gain: int  # In cents
+    cagr: Optional[float] = None
+    meets_target: Optional[bool] = None
+    depletion_month: Optional[int] = None  # SWP only; month the corpus runs out
+    depletion_date: Optional[date] = None
+    curve: Optional[List[int]] = None  # Month-end values in cents
+    monte_carlo: Optional[MonteCarloSummary] = None
+
+class ProjectionResponse(BaseModel):
+    mode: str
+    count: int
+    scenarios: List[ProjectionScenario]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class ReportCell(BaseModel):
+    # Dimensions not in group_by are None
+    domain: Optional[str] = None
+    year: Optional[int] = None
+    month: Optional[int] = None
+    category: Optional[str] = None
+    total: int  # In cents
+    count: int
+
+class Report(BaseModel):
+    group_by: List[str]
+    cells: List[ReportCell]
+    total: int  # In cents
+    count: int
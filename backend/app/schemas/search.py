@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class SearchResult(BaseModel):
+    entity_type: str  # "expense", "insurance_policy", "asset", "tax_document", ...
+    entity_id: str
+    title: str
+    snippet: str  # Matching text with the query words wrapped in <mark></mark>; everything else is unescaped
+    rank: float  # Higher is more relevant; only comparable within one query
+
+    class Config:
+        from_attributes = True
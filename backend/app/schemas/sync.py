@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+class SyncBatch(BaseModel):
+    # Entity type ("expense", "income", "investment", "tax_deduction", "insurance_policy", "asset") ->
+    # full rows changed since the token; null fields are left out, tax deductions include attachments
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: Dict[str, List[str]]  # Entity type -> ids deleted since the token
+    token: str  # Pass as `since` on the next sync
+    has_more: bool  # More changes are waiting; sync again right away
@@ -8,14 +8,16 @@ class DocumentAttachmentBase(BaseModel):
     file_size: int
     document_type: str
     file_url: Optional[str] = None
-    file_data: Optional[str] = None
+    content_hash: Optional[str] = None  # SHA-256 of a blob that is already stored, e.g. from POST /api/documents/upload
 
 class DocumentAttachmentCreate(DocumentAttachmentBase):
-    pass
+    file_data: Optional[str] = None  # Base64 upload; stored in the blob store, never echoed back
 
 class DocumentAttachment(DocumentAttachmentBase):
     id: str
     upload_date: datetime
+    has_thumbnail: bool = False  # Served by GET /api/documents/tax-deduction/{id}/thumbnail
+    has_preview: bool = False  # Served by GET /api/documents/tax-deduction/{id}/preview
 
     class Config:
         from_attributes = True
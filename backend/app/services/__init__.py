@@ -0,0 +1 @@
+# Business services
@@ -0,0 +1,404 @@
+"""Content-addressed blob storage for document contents.
+
+Blobs are keyed by the hex SHA-256 of their bytes, so identical uploads from
+any user are stored once. Uploads and downloads are streamed in chunks; the
+database rows only keep metadata and the content hash.
+
+Every upload also records its uploader in `blob_owners`: a content hash is
+only accepted on a new document from a user who uploaded that content, so
+knowing (or guessing) another user's hash neither reveals whether the file
+exists nor gives access to it.
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
+
+from fastapi import HTTPException, status  # pyright: ignore[reportMissingImports]
+from fastapi.concurrency import run_in_threadpool  # pyright: ignore[reportMissingImports]
+from sqlalchemy import delete, func, insert, select, update
+
+from app.core.config import settings
+
+@dataclass
+class StoredBlob:
+    digest: str
+    size: int
+
+class BlobNotFound(Exception):
+    pass
+
+class BlobStore(ABC):
+    """Interface shared by every blob store backend."""
+
+    chunk_size: int = settings.BLOB_CHUNK_SIZE
+
+    @abstractmethod
+    def put(self, chunks: Iterable[bytes]) -> StoredBlob:
+        """Stream chunks into the store and return their content address."""
+
+    @abstractmethod
+    def open(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the bytes of a blob in chunks, optionally limited to [start, end)."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        pass
+
+    @abstractmethod
+    def size(self, digest: str) -> int:
+        pass
+
+    @abstractmethod
+    def delete(self, digest: str) -> None:
+        pass
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Filesystem path of a blob, for backends that keep blobs on local disk."""
+        return None
+
+class LocalBlobStore(BlobStore):
+    """Blob store backed by a sharded directory tree on the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, ".tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, chunks: Iterable[bytes]) -> StoredBlob:
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            digest = hasher.hexdigest()
+            path = self._path(digest)
+            if os.path.exists(path):
+                # Same content already stored (possibly by another user)
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return StoredBlob(digest=digest, size=size)
+
+    def open(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        try:
+            f = open(self._path(digest), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+
+        def reader():
+            with f:
+                f.seek(start)
+                remaining = None if end is None else end - start
+                while remaining is None or remaining > 0:
+                    size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                    chunk = f.read(size)
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+
+        return reader()
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def size(self, digest: str) -> int:
+        try:
+            return os.path.getsize(self._path(digest))
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.unlink(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self._path(digest)
+
+class S3BlobStore(BlobStore):
+    """Blob store backed by any S3-compatible service (AWS S3, MinIO, moto_server...)."""
+
+    # Uploads are spooled to memory up to this size before spilling to disk
+    SPOOL_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 access_key_id: Optional[str] = None, secret_access_key: Optional[str] = None):
+        try:
+            import boto3  # pyright: ignore[reportMissingImports]
+        except ImportError:
+            raise RuntimeError("boto3 is required for the s3 blob store backend (pip install boto3)")
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+
+    def put(self, chunks: Iterable[bytes]) -> StoredBlob:
+        # The key is the content hash, so the payload is spooled while hashing and uploaded afterwards
+        hasher = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE) as spool:
+            for chunk in chunks:
+                hasher.update(chunk)
+                size += len(chunk)
+                spool.write(chunk)
+            digest = hasher.hexdigest()
+            if not self.exists(digest):
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, digest)
+        return StoredBlob(digest=digest, size=size)
+
+    def open(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        kwargs = {"Bucket": self.bucket, "Key": digest}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        try:
+            body = self.client.get_object(**kwargs)["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFound(digest)
+        return body.iter_chunks(self.chunk_size)
+
+    def exists(self, digest: str) -> bool:
+        try:
+            self.size(digest)
+            return True
+        except BlobNotFound:
+            return False
+
+    def size(self, digest: str) -> int:
+        from botocore.exceptions import ClientError  # pyright: ignore[reportMissingImports]
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=digest)["ContentLength"]
+        except ClientError:
+            raise BlobNotFound(digest)
+
+    def delete(self, digest: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=digest)
+
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    """Return the configured blob store backend."""
+    if settings.BLOB_STORE_BACKEND == "s3":
+        return S3BlobStore(
+            settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    return LocalBlobStore(settings.BLOB_STORE_DIR)
+
+def iter_base64_chunks(data: str, chunk_size: int = settings.BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+    """Decode a base64 string incrementally, yielding roughly chunk_size bytes at a time.
+
+    Raises binascii.Error on characters outside the base64 alphabet or bad padding.
+    """
+    if data.startswith("data:") and "," in data:
+        # Strip data URL prefixes such as "data:application/pdf;base64,"
+        data = data.split(",", 1)[1]
+    # Any whitespace (line wrapping, tabs) would shift the 4-character alignment of each slice
+    data = "".join(data.split())
+    step = (chunk_size // 3) * 4
+    for offset in range(0, len(data), step):
+        # Validated, since a dropped stray character would shift every later slice as well
+        yield base64.b64decode(data[offset:offset + step], validate=True)
+
+def _register_statements(dialect: str, stored: StoredBlob, content_type: Optional[str], owner_id: Optional[str]):
+    """Idempotent statements recording a stored blob and its uploader, or None to do it by hand."""
+    from app.models.blob import Blob, BlobOwner
+
+    if dialect not in ("postgresql", "sqlite"):
+        return None
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    # A re-upload counts as new for gc's grace period, so content that was just deduplicated
+    # is not collected before the document that references it is created
+    statements = [upsert(Blob).values(sha256=stored.digest, size=stored.size, content_type=content_type)
+                  .on_conflict_do_update(index_elements=[Blob.sha256], set_={"created_at": func.now()})]
+    if owner_id is not None:
+        statements.append(upsert(BlobOwner).values(sha256=stored.digest, user_id=owner_id).on_conflict_do_nothing())
+    return statements
+
+def _register_by_hand(connection, stored: StoredBlob, content_type: Optional[str], owner_id: Optional[str]) -> None:
+    from app.models.blob import Blob, BlobOwner
+
+    touched = connection.execute(update(Blob).where(Blob.sha256 == stored.digest).values(created_at=func.now()))
+    if touched.rowcount == 0:
+        connection.execute(insert(Blob).values(sha256=stored.digest, size=stored.size, content_type=content_type))
+    if owner_id is not None and connection.execute(select(BlobOwner.sha256).where(
+        BlobOwner.sha256 == stored.digest, BlobOwner.user_id == owner_id
+    )).first() is None:
+        connection.execute(insert(BlobOwner).values(sha256=stored.digest, user_id=owner_id))
+
+async def register_blob(db, stored: StoredBlob, content_type: Optional[str] = None, owner_id: Optional[str] = None):
+    """Ensure a Blob row exists for stored content, owned by `owner_id` if given, and return it (async session)."""
+    from app.models.blob import Blob
+
+    connection = await db.connection()
+    statements = _register_statements(connection.dialect.name, stored, content_type, owner_id)
+    if statements is None:
+        await connection.run_sync(_register_by_hand, stored, content_type, owner_id)
+    for statement in statements or []:
+        await db.execute(statement)
+    return await db.get(Blob, stored.digest)
+
+async def store_base64(db, data: str, content_type: Optional[str] = None, owner_id: Optional[str] = None):
+    """Move a base64 payload into the blob store and return its Blob row (async session).
+
+    Raises 400 if the payload is not valid base64.
+    """
+    try:
+        stored = await run_in_threadpool(get_blob_store().put, iter_base64_chunks(data))
+    except binascii.Error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File data is not valid base64"
+        )
+    return await register_blob(db, stored, content_type, owner_id)
+
+async def get_owned_blob(db, digest: str, user_id: str):
+    """The Blob with this content hash if the user uploaded it, else None (async session)."""
+    from app.models.blob import Blob, BlobOwner
+
+    return (await db.execute(
+        select(Blob).join(BlobOwner, BlobOwner.sha256 == Blob.sha256)
+        .where(Blob.sha256 == digest, BlobOwner.user_id == user_id)
+    )).scalars().first()
+
+def register_blob_sync(db, stored: StoredBlob, content_type: Optional[str] = None, owner_id: Optional[str] = None):
+    """Ensure a Blob row exists for stored content, owned by `owner_id` if given, and return it (sync session)."""
+    from app.models.blob import Blob
+
+    connection = db.connection()
+    statements = _register_statements(connection.dialect.name, stored, content_type, owner_id)
+    if statements is None:
+        _register_by_hand(connection, stored, content_type, owner_id)
+    for statement in statements or []:
+        db.execute(statement)
+    return db.get(Blob, stored.digest)
+
+def _store_base64_sync(db, data: str, content_type: Optional[str] = None, owner_id: Optional[str] = None):
+    stored = get_blob_store().put(iter_base64_chunks(data))
+    return register_blob_sync(db, stored, content_type, owner_id)
+
+def _document_models():
+    from app.models.tax_deduction import DocumentAttachment
+    from app.models.asset import AssetDocument, MaintenanceDocument
+    from app.models.insurance import InsuranceDocument
+    from app.models.investment import PolicyDocument
+    return [DocumentAttachment, AssetDocument, MaintenanceDocument, InsuranceDocument, PolicyDocument]
+
+def migrate_legacy_documents(db, batch_size: int = 100) -> int:
+    """Move base64 file_data payloads of every document model into the blob store."""
+    from app.models.tax_deduction import DocumentAttachment
+
+    migrated = 0
+    for model in _document_models():
+        invalid: List[str] = []
+        while True:
+            documents = db.query(model).filter(
+                model.file_data.isnot(None), model.content_hash.is_(None), model.id.notin_(invalid)
+            ).limit(batch_size).all()
+            if not documents:
+                break
+            skipped = len(invalid)
+            for document in documents:
+                owner_id = document.tax_deduction.user_id if model is DocumentAttachment else document.user_id
+                try:
+                    blob = _store_base64_sync(db, document.file_data, document.file_type, owner_id)
+                except binascii.Error as e:
+                    # Left in file_data, where downloads keep refusing it
+                    print(f"Skipping {model.__tablename__} {document.id}: file data is not valid base64 ({e})")
+                    invalid.append(document.id)
+                    continue
+                document.content_hash = blob.sha256
+                document.file_size = blob.size
+                document.file_data = None
+            db.commit()
+            db.expunge_all()
+            migrated += len(documents) - (len(invalid) - skipped)
+    return migrated
+
+def collect_garbage(db, grace: timedelta = timedelta(hours=24)) -> int:
+    """Delete blobs that no document row or export job references any more.
+
+    Blobs younger than `grace` are kept, since uploads are stored before the
+    document that references them is created.
+    """
+    from app.models.blob import Blob, BlobOwner
+    from app.models.export import ExportJob
+
+    referenced = set()
+    for model in [*_document_models(), ExportJob]:
+        referenced.update(
+            digest for (digest,) in db.query(model.content_hash).filter(model.content_hash.isnot(None)).distinct()
+        )
+    # Thumbnails and previews live as long as the blob they were made from
+    for digest, thumbnail, preview in db.query(Blob.sha256, Blob.thumbnail_sha256, Blob.preview_sha256).filter(
+        Blob.thumbnail_sha256.isnot(None)
+    ):
+        if digest in referenced:
+            referenced.update(derived for derived in (thumbnail, preview) if derived)
+
+    store = get_blob_store()
+    removed = 0
+    cutoff = datetime.now(timezone.utc) - grace
+    candidates = [digest for (digest,) in db.query(Blob.sha256).filter(Blob.created_at < cutoff)]
+    for digest in candidates:
+        if digest in referenced:
+            continue
+        # Conditional on the age again: a blob re-uploaded since the scan above has a fresh created_at
+        result = db.execute(delete(Blob).where(Blob.sha256 == digest, Blob.created_at < cutoff))
+        if result.rowcount == 1:
+            db.execute(delete(BlobOwner).where(BlobOwner.sha256 == digest))
+            db.commit()
+            store.delete(digest)
+            removed += 1
+    db.commit()
+    return removed
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Blob store maintenance")
+    parser.add_argument("command", choices=["migrate-legacy", "gc"])
+    parser.add_argument("--grace-hours", type=float, default=24, help="gc: keep unreferenced blobs younger than this")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "migrate-legacy":
+            print(f"Migrated {migrate_legacy_documents(db)} documents into the blob store")
+        else:
+            print(f"Removed {collect_garbage(db, timedelta(hours=args.grace_hours))} unreferenced blobs")
+    finally:
+        db.close()
@@ -0,0 +1,182 @@
+"""Ranged and conditional responses for document downloads.
+
+`download_response` serves a blob (or a legacy in-memory payload) with
+ETag and Last-Modified validators. A client whose copy is current gets a
+304 (If-None-Match, else If-Modified-Since); a single `Range: bytes=...`
+gets a 206 with just those bytes, so interrupted downloads can resume
+(If-Range makes sure the file has not changed in between), and a range
+past the end gets a 416. Multi-range requests get the whole file, which
+RFC 9110 allows.
+
+Blobs on local disk are handed to the server with the ASGI zero-copy send
+extension (sendfile) when it offers it; otherwise, and for remote stores,
+the bytes are streamed in chunks from a worker thread.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, Request, Response, status  # pyright: ignore[reportMissingImports]
+from fastapi.responses import JSONResponse  # pyright: ignore[reportMissingImports]
+from starlette.concurrency import iterate_in_threadpool  # pyright: ignore[reportMissingImports]
+
+from app.services.blob_store import BlobNotFound, get_blob_store
+
+ZERO_COPY_EXTENSION = "http.response.zerocopysend"
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate of a timestamp; naive values are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{file_name}"'
+
+def parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """The [start, end) byte range a Range header asks for, or None to send the whole file.
+
+    Raises 416 when the range starts past the end of the file.
+    """
+    unit, _, spec = value.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not dash or not (first + last).isdigit():
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes ("bytes=-0" asks for none and is unsatisfiable)
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+        if last and int(last) < start:
+            return None
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in (c.removeprefix("W/") for c in candidates)
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether the client's cached copy is current; If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    since = _parse_http_date(request.headers.get("if-modified-since", ""))
+    if since is None or last_modified is None:
+        return False
+    # HTTP dates have whole-second precision
+    return _parse_http_date(http_date(last_modified)) <= since
+
+def _range_applies(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    # If-Range: only resume when the validator still matches, otherwise send the whole (new) file
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag and not etag.startswith("W/")
+    return last_modified is not None and if_range == http_date(last_modified)
+
+class BlobResponse(Response):
+    """Sends bytes [start, end) of a stored blob."""
+
+    def __init__(self, digest: str, start: int, end: int, status_code: int, headers: dict,
+                 media_type: str, send_body: bool = True):
+        self.digest = digest
+        self.start = start
+        self.end = end
+        self.status_code = status_code
+        self.media_type = media_type
+        self.send_body = send_body
+        self.background = None
+        self.init_headers({**headers, "Content-Length": str(end - start)})
+
+    def _open_local(self):
+        path = get_blob_store().local_path(self.digest)
+        try:
+            return open(path, "rb") if path else None
+        except FileNotFoundError:
+            raise BlobNotFound(self.digest)
+
+    async def __call__(self, scope, receive, send) -> None:
+        file = chunks = None
+        try:
+            if self.send_body and self.end > self.start:
+                if ZERO_COPY_EXTENSION in scope.get("extensions", {}):
+                    file = await anyio.to_thread.run_sync(self._open_local)
+                if file is None:
+                    chunks = await anyio.to_thread.run_sync(get_blob_store().open, self.digest, self.start, self.end)
+        except BlobNotFound:
+            print(f"Blob {self.digest} is referenced but missing from the store")
+            response = JSONResponse({"detail": "Document content is missing"}, status_code=status.HTTP_404_NOT_FOUND)
+            await response(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if file is not None:
+            with file:
+                await send({
+                    "type": ZERO_COPY_EXTENSION, "file": file,
+                    "offset": self.start, "count": self.end - self.start, "more_body": False,
+                })
+            return
+        if chunks is not None:
+            async for chunk in iterate_in_threadpool(chunks):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def download_response(request: Request, size: int, media_type: str, etag: str,
+                      last_modified: Optional[datetime] = None, digest: Optional[str] = None,
+                      data: Optional[bytes] = None, file_name: Optional[str] = None,
+                      cache_control: str = "private, no-cache") -> Response:
+    """Response for a GET or HEAD of a blob (`digest`) or of in-memory bytes (`data`).
+
+    `etag` is a quoted entity tag, e.g. the content hash in double quotes.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if file_name:
+        headers["Content-Disposition"] = content_disposition(file_name)
+
+    start, end, status_code = 0, size, status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if range_header and _range_applies(request, etag, last_modified):
+        requested = parse_range(range_header, size)
+        if requested is not None:
+            start, end = requested
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    send_body = request.method != "HEAD"
+    if digest is not None:
+        return BlobResponse(digest, start, end, status_code, headers, media_type, send_body)
+    headers["Content-Length"] = str(end - start)
+    return Response(data[start:end] if send_body else b"", status_code=status_code, headers=headers,
+                    media_type=media_type)
+
+def payload_etag(data: bytes) -> str:
+    """Entity tag of an in-memory payload: its SHA-256, like blob digests."""
+    return f'"{hashlib.sha256(data).hexdigest()}"'
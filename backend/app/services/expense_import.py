@@ -0,0 +1,119 @@
+"""Streaming CSV / NDJSON import of expenses with batched multi-row inserts."""
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense
+from app.services import reports, search, sync
+from app.schemas.expense import ExpenseImportRow, ExpenseImportError, ExpenseImportResult
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+async def insert_expenses(db: AsyncSession, rows: List[Dict]) -> None:
+    """Insert expense rows with a single multi-row INSERT; the bulk write path for expenses.
+
+    Core inserts skip ORM flush listeners, so derived data is updated here.
+    """
+    if rows:
+        await db.execute(insert(Expense), rows)
+        deltas = reports.expense_row_deltas(rows)
+
+        def update_derived(session):
+            reports.apply_deltas(session.connection(), deltas)
+            search.index_rows(session.connection(), Expense, rows)
+            sync.record_changes(session.connection(), [(row["user_id"], "expense", row["id"], False) for row in rows])
+
+        await db.run_sync(update_derived)
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into (line number, text) pairs without buffering the whole body."""
+    pending = b""
+    line_number = 0
+    first = True
+    async for chunk in chunks:
+        if first:
+            chunk = chunk[3:] if chunk.startswith(b"\xef\xbb\xbf") else chunk
+            first = False
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            yield line_number, raw.rstrip(b"\r").decode("utf-8", errors="replace")
+    if pending:
+        yield line_number + 1, pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+async def iter_csv_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, Dict]]:
+    """Yield (line number, row dict) from CSV lines; the first record is the header."""
+    header = None
+    record, start = "", 0
+    async for line_number, line in lines:
+        if not record:
+            start = line_number
+            if not line.strip():
+                continue
+        record = f"{record}\n{line}" if record else line
+        # A quoted field spans several lines until its quotes balance
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # Empty cells fall back to the field defaults
+        yield start, {name: value for name, value in zip(header, values) if value != ""}
+    if record:
+        yield start, {"__error__": "Unterminated quoted field"}
+
+async def iter_ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, Dict]]:
+    """Yield (line number, object) from NDJSON lines."""
+    async for line_number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            value = {"__error__": f"Invalid JSON: {e}"}
+        if not isinstance(value, dict):
+            value = {"__error__": "Expected a JSON object"}
+        yield line_number, value
+
+async def import_expenses(db: AsyncSession, user_id: str, chunks: AsyncIterator[bytes], fmt: str) -> ExpenseImportResult:
+    """Validate streamed rows incrementally and insert the valid ones in one transaction."""
+    records = iter_csv_records(iter_lines(chunks)) if fmt == "csv" else iter_ndjson_records(iter_lines(chunks))
+    result = ExpenseImportResult(inserted=0, failed=0)
+    batch: List[Dict] = []
+
+    async for line_number, record in records:
+        if "__error__" in record:
+            messages = [record["__error__"]]
+        else:
+            try:
+                row = ExpenseImportRow.model_validate(record)
+                batch.append({"id": str(uuid.uuid4()), "user_id": user_id, **row.model_dump()})
+                messages = None
+            except ValidationError as e:
+                messages = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+
+        if messages:
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(ExpenseImportError(line=line_number, errors=messages))
+            else:
+                result.errors_truncated = True
+
+        if len(batch) >= BATCH_SIZE:
+            await insert_expenses(db, batch)
+            result.inserted += len(batch)
+            batch = []
+
+    await insert_expenses(db, batch)
+    result.inserted += len(batch)
+    await db.commit()
+    return result
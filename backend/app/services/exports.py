@@ -0,0 +1,351 @@
+"""Columnar export of a user's financial data to Parquet or Arrow IPC.
+
+An ExportJob is created by the API and run in the background: a poll loop
+(in the API process with EXPORT_WORKER_ENABLED, or in `python -m
+app.worker`) claims pending jobs and runs each on a process pool, so the
+work never competes with request handlers for the event loop or the GIL.
+
+A job streams every exported table through a server-side cursor in
+batches of EXPORT_BATCH_ROWS, converts each batch to an Arrow record batch
+and appends it to the table's file (one Parquet row group, or one IPC
+record batch, per cursor batch), so memory stays bounded by one batch
+whatever the table size. The files and a manifest.json are zipped into
+the blob store, where the archive is kept for EXPORT_RETENTION_HOURS.
+
+A running job's worker records a heartbeat between tables; a job whose
+heartbeat is older than EXPORT_JOB_TIMEOUT_MINUTES is taken to have lost
+its worker and is claimed again, however long it has been running.
+
+Amounts are in cents, as in the database, and timestamps are UTC.
+pyarrow is pinned in requirements.txt but imported lazily: without it the
+API still starts and exports answer 503.
+"""
+import argparse
+import asyncio
+import enum
+import json
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, and_, delete, or_, select, update
+
+from app.core.config import settings
+from app.models.asset import Asset, AssetDocument, MaintenanceDocument, MaintenanceRecord
+from app.models.expense import Expense
+from app.models.export import ExportJob
+from app.models.income import Income, IncomeSource
+from app.models.insurance import InsuranceClaim, InsuranceDocument, InsurancePolicy, PremiumPayment
+from app.models.investment import (
+    Investment, InvestmentAsset, InvestmentGoal, InvestmentTransaction, PolicyDocument, Portfolio
+)
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.services.blob_store import get_blob_store, register_blob_sync
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}  # Format -> file extension
+ARCHIVE_TYPE = "application/zip"
+
+# Implied by the export (user_id) or not tabular data (legacy base64 payloads)
+OMITTED_COLUMNS = ("user_id", "file_data")
+
+def _year_range(year: int):
+    return datetime(year, 1, 1, tzinfo=timezone.utc), datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+
+def _in_year(column):
+    def where(year: int):
+        start, end = _year_range(year)
+        return and_(column >= start, column < end)
+    return where
+
+@dataclass
+class ExportTable:
+    model: type
+    # Condition for rows of one year; None exports every row (reference data such as assets,
+    # and document metadata: the files themselves are downloaded from /api/documents)
+    in_year: Optional[Callable] = None
+
+EXPORT_TABLES: Dict[str, ExportTable] = {
+    "expenses": ExportTable(Expense, _in_year(Expense.date)),
+    "incomes": ExportTable(Income, lambda year: Income.year == year),
+    "income_sources": ExportTable(IncomeSource),
+    "investments": ExportTable(Investment),
+    "investment_transactions": ExportTable(InvestmentTransaction, _in_year(InvestmentTransaction.date)),
+    "investment_assets": ExportTable(InvestmentAsset),
+    "policy_documents": ExportTable(PolicyDocument),
+    "portfolios": ExportTable(Portfolio),
+    "investment_goals": ExportTable(InvestmentGoal),
+    "tax_deductions": ExportTable(TaxDeduction, lambda year: TaxDeduction.year == year),
+    "tax_deduction_attachments": ExportTable(DocumentAttachment, lambda year: TaxDeduction.year == year),
+    "insurance_policies": ExportTable(InsurancePolicy),
+    "insurance_documents": ExportTable(InsuranceDocument),
+    "insurance_claims": ExportTable(InsuranceClaim, _in_year(InsuranceClaim.claim_date)),
+    "premium_payments": ExportTable(PremiumPayment, _in_year(PremiumPayment.due_date)),
+    "assets": ExportTable(Asset),
+    "asset_documents": ExportTable(AssetDocument),
+    "maintenance_records": ExportTable(MaintenanceRecord, _in_year(MaintenanceRecord.date)),
+    "maintenance_documents": ExportTable(MaintenanceDocument),
+}
+
+def _pyarrow():
+    try:
+        import pyarrow  # pyright: ignore[reportMissingImports]
+        import pyarrow.ipc  # pyright: ignore[reportMissingImports]  # noqa: F401
+        import pyarrow.parquet  # pyright: ignore[reportMissingImports]  # noqa: F401
+    except ImportError:
+        raise RuntimeError("pyarrow is required for exports (pip install pyarrow)")
+    return pyarrow
+
+def pyarrow_available() -> bool:
+    try:
+        _pyarrow()
+        return True
+    except RuntimeError:
+        return False
+
+def export_columns(model) -> List:
+    return [column for column in model.__table__.columns if column.key not in OMITTED_COLUMNS]
+
+def table_query(name: str, user_id: str, year: Optional[int] = None):
+    """Rows of one exported table for a user, in primary key order."""
+    table = EXPORT_TABLES[name]
+    model = table.model
+    query = select(*export_columns(model))
+    if model is DocumentAttachment:
+        # Attachments are owned through their deduction
+        query = query.join(TaxDeduction).where(TaxDeduction.user_id == user_id)
+    else:
+        query = query.where(model.user_id == user_id)
+    if year is not None and table.in_year is not None:
+        query = query.where(table.in_year(year))
+    return query.order_by(model.id)
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        # SQLite hands back naive datetimes; like the rest of the app, they are taken as UTC
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()  # String, Text, Enum (as its value)
+
+def _to_utc(value):
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+def _enum_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+def _converter(column) -> Optional[Callable]:
+    if isinstance(column.type, DateTime):
+        return _to_utc
+    if isinstance(column.type, (Boolean, Integer, Float)):
+        return None
+    return _enum_value
+
+def write_table(connection, name: str, user_id: str, year: Optional[int], fmt: str, path: str,
+                batch_rows: int = settings.EXPORT_BATCH_ROWS) -> int:
+    """Stream one table into a Parquet or Arrow IPC file; returns the number of rows."""
+    pa = _pyarrow()
+    columns = export_columns(EXPORT_TABLES[name].model)
+    schema = pa.schema([pa.field(column.key, _arrow_type(pa, column), nullable=column.nullable) for column in columns])
+    converters = [_converter(column) for column in columns]
+
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    rows_written = 0
+    result = connection.execute(table_query(name, user_id, year).execution_options(yield_per=batch_rows))
+    with writer:
+        for rows in result.partitions():
+            arrays = []
+            for field, convert, values in zip(schema, converters, zip(*rows)):
+                arrays.append(pa.array(values if convert is None else [convert(v) for v in values], type=field.type))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    return rows_written
+
+def export_file_name(job: ExportJob) -> str:
+    return f"budget-export-{job.year or 'all'}-{job.format}.zip"
+
+def heartbeat(db, job: ExportJob) -> None:
+    """Record that a running job's worker is alive, so the job is not claimed again."""
+    job.heartbeat_at = datetime.now(timezone.utc)
+    db.commit()
+
+def build_archive(db, job: ExportJob) -> None:
+    """Export every table of a job into a zip archive in the blob store and record it on the job."""
+    extension = FORMATS[job.format]
+    store = get_blob_store()
+    row_counts = {}
+    with tempfile.TemporaryDirectory(prefix="export-") as workdir:
+        archive_path = os.path.join(workdir, "export.zip")
+        # Parquet and IPC files are compressed already
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_STORED) as archive:
+            for name in EXPORT_TABLES:
+                heartbeat(db, job)
+                path = os.path.join(workdir, f"{name}.{extension}")
+                row_counts[name] = write_table(db.connection(), name, job.user_id, job.year, job.format, path)
+                archive.write(path, f"{name}.{extension}")
+                os.unlink(path)
+            archive.writestr("manifest.json", json.dumps({
+                "format": job.format,
+                "year": job.year,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "tables": row_counts,
+                "notes": "Amounts are in cents; timestamps are UTC.",
+            }, indent=2))
+
+        with open(archive_path, "rb") as archive:
+            stored = store.put(iter(lambda: archive.read(store.chunk_size), b""))
+    register_blob_sync(db, stored, ARCHIVE_TYPE)
+    job.content_hash = stored.digest
+    job.size = stored.size
+    job.row_counts = json.dumps(row_counts)
+
+def _claimable(now: datetime):
+    stale = now - timedelta(minutes=settings.EXPORT_JOB_TIMEOUT_MINUTES)
+    return or_(ExportJob.status == "pending", and_(ExportJob.status == "running", ExportJob.heartbeat_at < stale))
+
+def claim_job(db) -> Optional[ExportJob]:
+    """Mark the oldest pending (or abandoned running) job as running and return it, or None."""
+    now = datetime.now(timezone.utc)
+    candidates = db.execute(
+        select(ExportJob.id, ExportJob.status, ExportJob.heartbeat_at).where(_claimable(now))
+        .order_by(ExportJob.created_at).limit(10)
+    ).all()
+    for job_id, status, heartbeat_at in candidates:
+        # Conditional on the state just read, so two workers never run the same job
+        result = db.execute(
+            update(ExportJob).where(
+                ExportJob.id == job_id, ExportJob.status == status,
+                ExportJob.heartbeat_at.is_(None) if heartbeat_at is None else ExportJob.heartbeat_at == heartbeat_at,
+            ).values(status="running", started_at=now, heartbeat_at=now, error=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(ExportJob, job_id)
+    return None
+
+def run_next_job() -> Optional[str]:
+    """Claim and run one export job; returns its id, or None if none is waiting. Runs in a worker process."""
+    import app.models  # noqa: F401
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        job = claim_job(db)
+        if job is None:
+            return None
+        try:
+            build_archive(db, job)
+            job.status = "done"
+        except Exception as e:
+            print(f"Export {job.id} failed: {e}")
+            db.rollback()
+            job = db.get(ExportJob, job.id)
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+def prune_jobs(db, retention: Optional[timedelta] = None) -> int:
+    """Delete finished jobs older than the retention; `blob_store gc` then removes their archives."""
+    retention = retention or timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    result = db.execute(delete(ExportJob).where(
+        ExportJob.status.in_(("done", "failed")), ExportJob.created_at < datetime.now(timezone.utc) - retention
+    ))
+    db.commit()
+    return result.rowcount
+
+class ExportRunner:
+    """Polls for export jobs and runs them on a lazily started process pool."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the parent runs threads and holds database connections
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def wake(self) -> None:
+        """Look for jobs now instead of at the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run_pending(self, session_factory) -> int:
+        """Run jobs until none is waiting, `workers` at a time; returns how many ran."""
+        # Checked here so that the pool is only started once there is work for it
+        async with session_factory() as db:
+            waiting = (await db.execute(
+                select(ExportJob.id).where(_claimable(datetime.now(timezone.utc))).limit(1)
+            )).first()
+        if not waiting:
+            return 0
+        loop = asyncio.get_running_loop()
+
+        async def drain() -> int:
+            ran = 0
+            while await loop.run_in_executor(self._get_executor(), run_next_job) is not None:
+                ran += 1
+            return ran
+
+        return sum(await asyncio.gather(*(drain() for _ in range(self.workers))))
+
+    async def run_forever(self, session_factory, interval: float = settings.EXPORT_POLL_SECONDS) -> None:
+        """Poll for jobs until cancelled."""
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.run_pending(session_factory)
+            except BrokenProcessPool as e:
+                print(f"Export run failed: {e}")
+                self.shutdown()  # Start a fresh pool next time
+            except Exception as e:
+                print(f"Export run failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+export_runner = ExportRunner(settings.EXPORT_WORKERS)
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Export job maintenance")
+    parser.add_argument("command", choices=["prune"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Deleted {prune_jobs(db)} expired export jobs")
+    finally:
+        db.close()
@@ -0,0 +1,170 @@
+"""Materialized monthly income summaries.
+
+MonthlyIncomeSummary rows are kept in step with Income rows by a flush
+listener: every insert, update or delete of an Income applies its delta to
+the affected (user, year, month) summary in the same transaction. Use
+`python -m app.services.income_summary rebuild` to backfill from scratch.
+"""
+import argparse
+import json
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.income import Income, MonthlyIncomeSummary
+
+SummaryKey = Tuple[str, int, int]  # (user_id, year, month)
+
+def attribute_values(obj, names: Iterable[str], old: bool = False) -> Dict:
+    """Attribute values of a mapped object, either current or as they were before this flush.
+
+    Shared by the flush listeners that fold row deltas into derived tables (see app.services.reports).
+    """
+    state = inspect(obj)
+    values = {}
+    for name in names:
+        history = state.attrs[name].history
+        if old and history.deleted:
+            values[name] = history.deleted[0]
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+def _income_values(income: Income, old: bool = False) -> Dict:
+    """Column values of an Income, either current or as they were before this flush."""
+    return attribute_values(
+        income, ("user_id", "income_source_id", "year", "month", "amount", "gross_amount", "net_amount"), old
+    )
+
+def _add_contribution(deltas: Dict, values: Dict, sign: int) -> None:
+    gross = values["gross_amount"] if values["gross_amount"] is not None else values["amount"]
+    net = values["net_amount"] if values["net_amount"] is not None else values["amount"]
+    delta = deltas[(values["user_id"], values["year"], values["month"])]
+    source = delta[values["income_source_id"]]
+    source["gross"] += sign * (gross or 0)
+    source["net"] += sign * (net or 0)
+    source["count"] += sign
+
+def _new_deltas() -> Dict:
+    return defaultdict(lambda: defaultdict(lambda: {"gross": 0, "net": 0, "count": 0}))
+
+def _ensure_summary(connection, user_id: str, year: int, month: int) -> None:
+    """Create an empty summary row unless there is one; an existing row is locked by the upsert."""
+    table = MonthlyIncomeSummary.__table__
+    dialect = connection.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    statement = upsert(table).values(
+        id=str(uuid.uuid4()), user_id=user_id, year=year, month=month,
+        total_gross_income=0, total_net_income=0, total_deductions=0, income_sources="{}",
+    )
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year, table.c.month], set_={"updated_at": func.now()}
+    ))
+
+def apply_deltas(connection, deltas: Dict) -> None:
+    """Fold per-source deltas into the summary rows, locking each row while it is updated."""
+    # Sorted so concurrent transactions lock rows in the same order
+    for (user_id, year, month), sources in sorted(deltas.items()):
+        # FOR UPDATE cannot lock a row that does not exist yet, so two first incomes of a month
+        # would both insert; the upsert makes sure there is a row to lock
+        _ensure_summary(connection, user_id, year, month)
+        row = connection.execute(
+            select(MonthlyIncomeSummary.id, MonthlyIncomeSummary.income_sources).where(
+                MonthlyIncomeSummary.user_id == user_id,
+                MonthlyIncomeSummary.year == year,
+                MonthlyIncomeSummary.month == month,
+            ).with_for_update()
+        ).first()
+
+        breakdown = json.loads(row.income_sources) if row and row.income_sources else {}
+        for source_id, delta in sources.items():
+            current = breakdown.get(source_id, {"gross": 0, "net": 0, "count": 0})
+            current = {key: current[key] + delta[key] for key in ("gross", "net", "count")}
+            if current["count"] > 0:
+                breakdown[source_id] = current
+            else:
+                breakdown.pop(source_id, None)
+
+        gross = sum(source["gross"] for source in breakdown.values())
+        net = sum(source["net"] for source in breakdown.values())
+        values = {
+            "total_gross_income": gross,
+            "total_net_income": net,
+            "total_deductions": gross - net,
+            "income_sources": json.dumps(breakdown),
+        }
+
+        if row is None:
+            if breakdown:
+                connection.execute(insert(MonthlyIncomeSummary).values(
+                    id=str(uuid.uuid4()), user_id=user_id, year=year, month=month, **values
+                ))
+        elif breakdown:
+            connection.execute(update(MonthlyIncomeSummary).where(MonthlyIncomeSummary.id == row.id).values(**values))
+        else:
+            # No income left in this month
+            connection.execute(delete(MonthlyIncomeSummary).where(MonthlyIncomeSummary.id == row.id))
+
+@event.listens_for(Session, "after_flush")
+def _track_income_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still show the pre-flush state here
+    deltas = _new_deltas()
+    for obj in session.new:
+        if isinstance(obj, Income):
+            _add_contribution(deltas, _income_values(obj), 1)
+    for obj in session.dirty:
+        if isinstance(obj, Income) and session.is_modified(obj):
+            _add_contribution(deltas, _income_values(obj, old=True), -1)
+            _add_contribution(deltas, _income_values(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Income):
+            _add_contribution(deltas, _income_values(obj, old=True), -1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def rebuild_summaries(db: Session, user_id: Optional[str] = None) -> int:
+    """Recompute summaries from Income rows, for one user or everyone."""
+    gross = func.coalesce(Income.gross_amount, Income.amount)
+    net = func.coalesce(Income.net_amount, Income.amount)
+    query = select(
+        Income.user_id, Income.year, Income.month, Income.income_source_id,
+        func.sum(gross), func.sum(net), func.count(),
+    ).group_by(Income.user_id, Income.year, Income.month, Income.income_source_id)
+    clear = delete(MonthlyIncomeSummary)
+    if user_id:
+        query = query.where(Income.user_id == user_id)
+        clear = clear.where(MonthlyIncomeSummary.user_id == user_id)
+
+    deltas = _new_deltas()
+    for row_user, year, month, source_id, total_gross, total_net, count in db.execute(query):
+        deltas[(row_user, year, month)][source_id] = {"gross": total_gross, "net": total_net, "count": count}
+
+    connection = db.connection()
+    connection.execute(clear)
+    apply_deltas(connection, deltas)
+    db.commit()
+    return len(deltas)
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Monthly income summary maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Only rebuild this user's summaries")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_summaries(db, args.user)} monthly summaries")
+    finally:
+        db.close()
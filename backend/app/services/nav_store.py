@@ -0,0 +1,315 @@
+"""Daily NAV history per mutual fund scheme, stored as memory-mapped columns.
+
+Each scheme has two append-only files under NAV_STORE_DIR:
+
+    <scheme_code>.dates  int32, days since 1970-01-01, strictly increasing
+    <scheme_code>.nav    int64, NAV in 1/NAV_SCALE rupee (mfapi publishes 4 decimals)
+
+Reads memory-map both files and slice them with a binary search, so a range
+query never parses or copies the whole history. Appends only write rows newer
+than the last stored date; the NAV column is written before the date column
+and readers trust the shorter of the two, so a reader never sees a date
+without its NAV. Appends to a scheme hold its writer lock (a thread lock plus
+an flock on `<scheme_code>.lock`), so the refresh job and API processes
+pulling a scheme on first request never interleave their writes.
+"""
+import argparse
+import json
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, select, update
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+NAV_SCALE = 10_000
+DATE_DTYPE = np.int32
+NAV_DTYPE = np.int64
+UPDATE_CHUNK_SIZE = 500
+MAX_OPEN_SCHEMES = 256  # Memory-mapped schemes kept open per process
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+def to_day(value: date) -> int:
+    return value.toordinal() - _EPOCH
+
+def from_day(day: int) -> date:
+    return date.fromordinal(int(day) + _EPOCH)
+
+class NavSeries:
+    """Read-only view of one scheme's history; arrays may be memory-mapped."""
+
+    def __init__(self, scheme_code: str, days: np.ndarray, navs: np.ndarray):
+        self.scheme_code = scheme_code
+        self.days = days
+        self.navs = navs
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def latest(self) -> Optional[Tuple[date, int]]:
+        if not len(self):
+            return None
+        return from_day(self.days[-1]), int(self.navs[-1])
+
+    def range(self, start: Optional[date] = None, end: Optional[date] = None) -> "NavSeries":
+        lo = 0 if start is None else int(np.searchsorted(self.days, to_day(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.days, to_day(end), side="right"))
+        return NavSeries(self.scheme_code, self.days[lo:hi], self.navs[lo:hi])
+
+class NavStore:
+    def __init__(self, root: str, max_open: int = MAX_OPEN_SCHEMES):
+        self.root = root
+        self.max_open = max_open
+        # scheme_code -> (file sizes, series, mappings), least recently read first
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], NavSeries, List[mmap.mmap]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, scheme_code: str) -> Tuple[str, str]:
+        if not scheme_code.isalnum():
+            raise ValueError(f"Invalid scheme code: {scheme_code!r}")
+        base = os.path.join(self.root, scheme_code)
+        return base + ".dates", base + ".nav"
+
+    @staticmethod
+    def _map(path: str, dtype, rows: int, mappings: List[mmap.mmap]) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), rows * np.dtype(dtype).itemsize, access=mmap.ACCESS_READ)
+        mappings.append(mapping)
+        return np.frombuffer(mapping, dtype=dtype, count=rows)
+
+    @staticmethod
+    def _close(mappings: List[mmap.mmap]) -> None:
+        for mapping in mappings:
+            try:
+                mapping.close()
+            except BufferError:
+                # A reader still holds arrays over it; it is unmapped when the last one is dropped
+                pass
+
+    def read(self, scheme_code: str) -> NavSeries:
+        """Memory-map a scheme's history; the mapping is reused until the files grow."""
+        dates_path, nav_path = self._paths(scheme_code)
+        try:
+            sizes = (os.path.getsize(dates_path), os.path.getsize(nav_path))
+        except FileNotFoundError:
+            return NavSeries(scheme_code, np.empty(0, DATE_DTYPE), np.empty(0, NAV_DTYPE))
+
+        with self._lock:
+            cached = self._cache.get(scheme_code)
+            if cached and cached[0] == sizes:
+                self._cache.move_to_end(scheme_code)
+                return cached[1]
+            rows = min(sizes[0] // np.dtype(DATE_DTYPE).itemsize, sizes[1] // np.dtype(NAV_DTYPE).itemsize)
+            mappings: List[mmap.mmap] = []
+            series = NavSeries(
+                scheme_code,
+                self._map(dates_path, DATE_DTYPE, rows, mappings),
+                self._map(nav_path, NAV_DTYPE, rows, mappings),
+            )
+            # Keep only the mappings of replaced and evicted entries, so their arrays can be freed
+            stale = [self._cache.pop(scheme_code)[2]] if cached else []
+            cached = None
+            self._cache[scheme_code] = (sizes, series, mappings)
+            while len(self._cache) > self.max_open:
+                stale.append(self._cache.popitem(last=False)[1][2])
+        for old_mappings in stale:
+            self._close(old_mappings)
+        return series
+
+    @contextmanager
+    def _writer(self, scheme_code: str):
+        """Hold the scheme's writer lock, across threads and (where flock exists) processes."""
+        lock_path = os.path.splitext(self._paths(scheme_code)[0])[0] + ".lock"
+        with self._lock:
+            lock = self._writer_locks.setdefault(scheme_code, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, scheme_code: str, points: Iterable[Tuple[date, int]]) -> int:
+        """Append (date, scaled NAV) points newer than the stored history; returns rows written."""
+        with self._writer(scheme_code):
+            return self._append(scheme_code, points)
+
+    def _append(self, scheme_code: str, points: Iterable[Tuple[date, int]]) -> int:
+        existing = self.read(scheme_code)
+        last_day = int(existing.days[-1]) if len(existing) else None
+
+        rows = sorted({to_day(d): nav for d, nav in points}.items())
+        if last_day is not None:
+            rows = [row for row in rows if row[0] > last_day]
+        if not rows:
+            return 0
+
+        days = np.array([day for day, _ in rows], dtype=DATE_DTYPE)
+        navs = np.array([nav for _, nav in rows], dtype=NAV_DTYPE)
+        dates_path, nav_path = self._paths(scheme_code)
+        # Trim a torn tail left by an interrupted append before extending the columns
+        for path, dtype in ((dates_path, DATE_DTYPE), (nav_path, NAV_DTYPE)):
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(len(existing) * np.dtype(dtype).itemsize)
+        with open(nav_path, "ab") as f:
+            f.write(navs.tobytes())
+        with open(dates_path, "ab") as f:
+            f.write(days.tobytes())
+        return len(rows)
+
+@lru_cache()
+def get_nav_store() -> NavStore:
+    return NavStore(settings.NAV_STORE_DIR)
+
+def parse_mfapi_history(payload: Dict) -> List[Tuple[date, int]]:
+    """Convert an mfapi `/mf/<code>` response into (date, scaled NAV) points."""
+    points = []
+    for item in payload.get("data", []):
+        try:
+            day = datetime.strptime(item["date"], "%d-%m-%Y").date()
+            nav = int((Decimal(item["nav"]) * NAV_SCALE).to_integral_value())
+        except (KeyError, ValueError, ArithmeticError):
+            continue
+        if nav > 0:
+            points.append((day, nav))
+    return points
+
+class NavFeed(ABC):
+    """Source of NAV history for a scheme."""
+
+    @abstractmethod
+    def fetch(self, scheme_code: str) -> List[Tuple[date, int]]:
+        """(date, scaled NAV) points of a scheme's history."""
+
+class MfapiFeed(NavFeed):
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def fetch(self, scheme_code: str) -> List[Tuple[date, int]]:
+        import httpx  # pyright: ignore[reportMissingImports]
+
+        response = httpx.get(f"{self.base_url}/mf/{scheme_code}", timeout=30)
+        response.raise_for_status()
+        return parse_mfapi_history(response.json())
+
+class FixtureFeed(NavFeed):
+    """Reads saved mfapi responses from `<directory>/<scheme_code>.json`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, scheme_code: str) -> List[Tuple[date, int]]:
+        path = os.path.join(self.directory, f"{scheme_code}.json")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return parse_mfapi_history(json.load(f))
+
+@lru_cache()
+def get_nav_feed() -> NavFeed:
+    """Return the configured NAV feed."""
+    if settings.NAV_FEED_BACKEND == "fixture":
+        return FixtureFeed(settings.NAV_FIXTURE_DIR)
+    return MfapiFeed(settings.MFAPI_BASE_URL)
+
+def sync_scheme(scheme_code: str, store: Optional[NavStore] = None, feed: Optional[NavFeed] = None) -> int:
+    """Fetch a scheme's history from the feed and append what is new."""
+    store = store or get_nav_store()
+    feed = feed or get_nav_feed()
+    return store.append(scheme_code, feed.fetch(scheme_code))
+
+def update_current_prices(db, prices: Dict[str, int]) -> int:
+    """Set current_price (cents) on every user's assets for these schemes, one UPDATE per chunk."""
+    from app.models.investment import InvestmentAsset
+
+    updated = 0
+    codes = list(prices)
+    now = datetime.now(timezone.utc)
+    for offset in range(0, len(codes), UPDATE_CHUNK_SIZE):
+        chunk = {code: prices[code] for code in codes[offset:offset + UPDATE_CHUNK_SIZE]}
+        result = db.execute(
+            update(InvestmentAsset)
+            .where(InvestmentAsset.scheme_code.in_(chunk))
+            .values(
+                current_price=case(chunk, value=InvestmentAsset.scheme_code),
+                last_updated=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+    db.commit()
+    return updated
+
+def refresh_navs(db, scheme_codes: Optional[List[str]] = None, workers: int = 8) -> Dict[str, int]:
+    """Sync every tracked scheme from the feed, then reprice all assets in one pass."""
+    from app.models.investment import InvestmentAsset
+
+    if scheme_codes is None:
+        scheme_codes = [
+            code for (code,) in db.execute(
+                select(InvestmentAsset.scheme_code).where(InvestmentAsset.scheme_code.isnot(None)).distinct()
+            )
+        ]
+    scheme_codes = [code for code in scheme_codes if code and code.isalnum()]
+
+    store = get_nav_store()
+    appended = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for code, result in zip(scheme_codes, pool.map(lambda c: _safe_sync(c, store), scheme_codes)):
+            appended += result
+
+    prices = {}
+    for code in scheme_codes:
+        latest = store.read(code).latest()
+        if latest is not None:
+            prices[code] = round(latest[1] * 100 / NAV_SCALE)
+    return {"schemes": len(scheme_codes), "appended": appended, "repriced": update_current_prices(db, prices)}
+
+def _safe_sync(scheme_code: str, store: NavStore) -> int:
+    try:
+        return sync_scheme(scheme_code, store)
+    except Exception as e:
+        print(f"NAV sync failed for {scheme_code}: {e}")
+        return 0
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="NAV history maintenance")
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("--scheme", action="append", help="Only refresh these scheme codes")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = refresh_navs(db, args.scheme)
+        print(f"Appended {result['appended']} NAV points across {result['schemes']} schemes, "
+              f"repriced {result['repriced']} assets")
+    finally:
+        db.close()
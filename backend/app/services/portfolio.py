@@ -0,0 +1,197 @@
+"""Vectorized portfolio valuation.
+
+A user's cash flows are loaded into flat NumPy arrays tagged with the index
+of the investment they belong to. Holdings, cost basis and gains are
+segment sums (np.bincount), and XIRR for every investment plus the whole
+portfolio is solved in one batched Newton iteration instead of a Python
+loop per investment.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.investment import Investment, InvestmentAsset, InvestmentTransaction
+
+BUY_TYPES = {"buy", "purchase", "sip", "lumpsum", "switch_in"}
+SELL_TYPES = {"sell", "redeem", "redemption", "withdrawal", "swp", "switch_out"}
+INCOME_TYPES = {"dividend", "interest", "payout"}
+
+@dataclass
+class CashFlows:
+    """Columnar cash flows of one user; `group` is the investment index of each flow."""
+    investment_ids: List[str]
+    asset_names: List[str]
+    prices: np.ndarray  # Current price per unit in cents, per investment
+    group: np.ndarray  # int64, investment index per flow
+    day: np.ndarray  # int64, date ordinal per flow
+    amount: np.ndarray  # float64, cents, always positive
+    units: np.ndarray  # float64, always positive
+    kind: np.ndarray  # int8: 1 buy, -1 sell, 2 income, 0 ignored
+
+def _kind(transaction_type: str) -> int:
+    transaction_type = (transaction_type or "").lower()
+    if transaction_type in BUY_TYPES:
+        return 1
+    if transaction_type in SELL_TYPES:
+        return -1
+    if transaction_type in INCOME_TYPES:
+        return 2
+    return 0
+
+async def load_cash_flows(db: AsyncSession, user_id: str) -> CashFlows:
+    """Load every investment and transaction of a user into columnar arrays."""
+    investments = (await db.execute(
+        select(
+            Investment.id, Investment.amount, Investment.units, Investment.purchase_date,
+            InvestmentAsset.name, InvestmentAsset.current_price,
+        ).join(InvestmentAsset, Investment.asset_id == InvestmentAsset.id).where(
+            Investment.user_id == user_id
+        ).order_by(Investment.purchase_date)
+    )).all()
+    transactions = (await db.execute(
+        select(
+            InvestmentTransaction.investment_id, InvestmentTransaction.transaction_type,
+            InvestmentTransaction.amount, InvestmentTransaction.units, InvestmentTransaction.date,
+        ).where(InvestmentTransaction.user_id == user_id)
+    )).all()
+
+    index = {row.id: i for i, row in enumerate(investments)}
+    flows = [
+        (index[t.investment_id], t.date.toordinal(), t.amount, t.units, _kind(t.transaction_type))
+        for t in transactions if t.investment_id in index
+    ]
+    # An investment without transactions is a single purchase described by the row itself
+    with_transactions = {group for group, *_ in flows}
+    flows.extend(
+        (i, row.purchase_date.toordinal(), row.amount, row.units, 1)
+        for i, row in enumerate(investments) if i not in with_transactions
+    )
+
+    columns = list(zip(*flows)) if flows else [(), (), (), (), ()]
+    return CashFlows(
+        investment_ids=[row.id for row in investments],
+        asset_names=[row.name for row in investments],
+        prices=np.array([row.current_price for row in investments], dtype=np.float64),
+        group=np.array(columns[0], dtype=np.int64),
+        day=np.array(columns[1], dtype=np.int64),
+        amount=np.abs(np.array(columns[2], dtype=np.float64)),
+        units=np.abs(np.array(columns[3], dtype=np.float64)),
+        kind=np.array(columns[4], dtype=np.int8),
+    )
+
+def batch_xirr(group: np.ndarray, day: np.ndarray, cash: np.ndarray, n_groups: int,
+               guess: float = 0.1, tol: float = 1e-7, max_iter: int = 100) -> np.ndarray:
+    """Solve XIRR for many cash-flow series at once with a vectorized Newton iteration.
+
+    `cash` is signed (outflows negative). Returns NaN for series without a sign change
+    or that fail to converge.
+    """
+    rate = np.full(n_groups, guess)
+    if len(cash) == 0:
+        return np.full(n_groups, np.nan)
+
+    first_day = np.full(n_groups, np.iinfo(np.int64).max)
+    np.minimum.at(first_day, group, day)
+    years = (day - first_day[group]) / 365.0
+
+    has_inflow = np.bincount(group, weights=cash > 0, minlength=n_groups) > 0
+    has_outflow = np.bincount(group, weights=cash < 0, minlength=n_groups) > 0
+    active = has_inflow & has_outflow
+
+    for _ in range(max_iter):
+        base = 1.0 + rate[group]
+        discount = base ** -years
+        npv = np.bincount(group, weights=cash * discount, minlength=n_groups)
+        slope = np.bincount(group, weights=-years * cash * discount / base, minlength=n_groups)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = np.where(active & (slope != 0), npv / slope, 0.0)
+        # Keep rates above -100% so (1 + rate) stays positive
+        rate = np.maximum(rate - step, -0.9999)
+        if np.all(np.abs(step[active]) < tol):
+            break
+    else:
+        active &= np.abs(step) < tol * 1e3
+
+    return np.where(active & np.isfinite(rate), rate, np.nan)
+
+def value_portfolio(flows: CashFlows, as_of: Optional[datetime] = None) -> Dict:
+    """Holdings, gains, CAGR and XIRR per investment and for the whole portfolio, as of a date.
+
+    Flows dated after `as_of` are left out.
+    """
+    as_of = as_of or datetime.now(timezone.utc)
+    as_of_day = as_of.toordinal()
+    n = len(flows.investment_ids)
+    settled = flows.day <= as_of_day
+    group, day, kind = flows.group[settled], flows.day[settled], flows.kind[settled]
+    amount, units = flows.amount[settled], flows.units[settled]
+
+    is_buy, is_sell, is_income = kind == 1, kind == -1, kind == 2
+    bought_units = np.bincount(group, weights=units * is_buy, minlength=n)
+    sold_units = np.bincount(group, weights=units * is_sell, minlength=n)
+    invested = np.bincount(group, weights=amount * is_buy, minlength=n)
+    proceeds = np.bincount(group, weights=amount * is_sell, minlength=n)
+    income = np.bincount(group, weights=amount * is_income, minlength=n)
+
+    held_units = np.maximum(bought_units - sold_units, 0.0)
+    current_value = held_units * flows.prices
+    # Average-cost basis of the units still held
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_cost = np.where(bought_units > 0, invested / bought_units, 0.0)
+    cost_basis = held_units * average_cost
+    unrealized = current_value - cost_basis
+    realized = proceeds - sold_units * average_cost + income
+
+    first_day = np.full(n, as_of_day, dtype=np.int64)
+    if len(group):
+        np.minimum.at(first_day, group, day)
+    years = np.maximum((as_of_day - first_day) / 365.0, 1 / 365.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(invested > 0, ((current_value + proceeds + income) / invested) ** (1 / years) - 1, np.nan)
+
+    # XIRR series: every investment plus the portfolio as group n, each closed by its market value today
+    signed = np.where(is_buy, -amount, np.where(is_sell | is_income, amount, 0.0))
+    terminal_groups = np.arange(n + 1)
+    terminal_cash = np.append(current_value, current_value.sum())
+    xirr = batch_xirr(
+        np.concatenate([group, np.full(len(group), n), terminal_groups]),
+        np.concatenate([day, day, np.full(n + 1, as_of_day)]),
+        np.concatenate([signed, signed, terminal_cash]),
+        n + 1,
+    )
+
+    total_invested = invested.sum()
+    total_value = current_value.sum()
+    portfolio_years = max((as_of_day - first_day.min()) / 365.0, 1 / 365.0) if n else 0.0
+
+    def _num(value) -> Optional[float]:
+        return None if not np.isfinite(value) else round(float(value), 6)
+
+    return {
+        "as_of": as_of,
+        "investments": [
+            {
+                "investment_id": flows.investment_ids[i],
+                "asset_name": flows.asset_names[i],
+                "units": round(float(held_units[i]), 6),
+                "invested": int(round(invested[i])),
+                "current_value": int(round(current_value[i])),
+                "unrealized_gain": int(round(unrealized[i])),
+                "realized_gain": int(round(realized[i])),
+                "cagr": _num(cagr[i]),
+                "xirr": _num(xirr[i]),
+            }
+            for i in range(n)
+        ],
+        "total_invested": int(round(total_invested)),
+        "total_current_value": int(round(total_value)),
+        "total_unrealized_gain": int(round(unrealized.sum())),
+        "total_realized_gain": int(round(realized.sum())),
+        "cagr": _num(((total_value + proceeds.sum() + income.sum()) / total_invested) ** (1 / portfolio_years) - 1)
+        if total_invested > 0 else None,
+        "xirr": _num(xirr[n]),
+    }
@@ -0,0 +1,186 @@
+"""Vectorized SIP / SWP / step-up projections over a grid of scenarios.
+
+Every (rate, step-up) pair is simulated once up to the longest tenure; shorter
+tenures are prefixes of the same curve. With G_k the growth factor after k
+months (cumulative product of monthly return factors), the month-end values
+have closed forms that NumPy evaluates for all scenarios and Monte Carlo
+paths at once:
+
+    SIP (contribution at the start of the month):  V_k = G_k * (V_0 + sum_j c_j / G_{j-1})
+    SWP (withdrawal at the end of the month):      V_k = G_k * (V_0 - sum_j w_j / G_j)
+
+This matches the month-by-month loops of the frontend calculators.
+"""
+import calendar
+from datetime import date
+from itertools import product
+from typing import Dict, Optional
+
+import numpy as np
+
+# Upper bounds on simulated cells (scenarios x months [x paths]) per request
+MAX_CELLS = 5_000_000
+MAX_MONTE_CARLO_CELLS = 5_000_000
+# Upper bounds on the response: scenarios, and month-end points over all returned curves
+MAX_SCENARIOS = 10_000
+MAX_CURVE_POINTS = 1_000_000
+# Annual rates in percent; at -100% or below the monthly growth factor is no longer positive
+MIN_RATE, MAX_RATE = -100.0, 100.0
+MAX_TENURE_YEARS = 100
+MIN_STEP_UP, MAX_STEP_UP = 0.0, 100.0  # Yearly, in percent
+# Curve amounts in cents are returned as int64
+MAX_CURVE_AMOUNT = 2.0 ** 63
+
+def add_months(start: date, months: int) -> date:
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+def _monthly_flows(amount: float, step_ups: np.ndarray, months: int) -> np.ndarray:
+    """Contribution or withdrawal per month, raised by the step-up every 12 months; shape (steps, months)."""
+    years_elapsed = np.arange(months) // 12
+    return amount * (1 + step_ups[:, None] / 100) ** years_elapsed[None, :]
+
+def _simulate(mode: str, initial: float, flows: np.ndarray, factors: np.ndarray) -> np.ndarray:
+    """Unclamped month-end values for monthly return factors of shape (..., months)."""
+    growth = np.cumprod(factors, axis=-1)
+    if mode == "sip":
+        previous = growth / factors
+        return growth * (initial + np.cumsum(flows / previous, axis=-1))
+    return growth * (initial - np.cumsum(flows / growth, axis=-1))
+
+def _check_amounts(values: np.ndarray, limit: float) -> None:
+    # Infinity and NaN always fail the comparison
+    if not np.all(np.abs(values) < limit):
+        raise ValueError("Projected amounts are too large; reduce rates, step-ups or tenures")
+
+def _first_depletion(values: np.ndarray) -> np.ndarray:
+    """Index of the first negative month-end value, or the number of months if none."""
+    depleted = values < 0
+    return np.where(depleted.any(axis=-1), depleted.argmax(axis=-1), values.shape[-1])
+
+def project(
+    mode: str,
+    monthly_amount: int,
+    annual_rates,
+    tenures_years,
+    step_ups,
+    initial_amount: int = 0,
+    target_amount: Optional[int] = None,
+    start_date: Optional[date] = None,
+    include_curves: bool = True,
+    monte_carlo: Optional[Dict] = None,
+) -> Dict:
+    """Evaluate every rate x tenure x step-up scenario; raises ValueError if the grid is too large or out of range."""
+    start_date = start_date or date.today()
+    rates = np.asarray(annual_rates, dtype=np.float64)
+    steps = np.asarray(step_ups, dtype=np.float64)
+    tenures = [int(t) for t in tenures_years]
+    months = max(tenures) * 12
+    if min(tenures) < 1 or months > MAX_TENURE_YEARS * 12:
+        raise ValueError(f"Tenures must be between 1 and {MAX_TENURE_YEARS} years")
+    if not np.all((steps >= MIN_STEP_UP) & (steps <= MAX_STEP_UP)):
+        raise ValueError(f"Step-ups must be between {MIN_STEP_UP:g}% and {MAX_STEP_UP:g}%")
+    if not np.all((rates > MIN_RATE) & (rates <= MAX_RATE)):
+        raise ValueError(f"Annual rates must be above {MIN_RATE:g}% and at most {MAX_RATE:g}%")
+
+    # Pair axis: rate-major over (rate, step-up)
+    n_pairs = len(rates) * len(steps)
+    if n_pairs * months > MAX_CELLS:
+        raise ValueError("Too many scenarios; reduce rates, step-ups or tenure")
+    if n_pairs * len(tenures) > MAX_SCENARIOS:
+        raise ValueError("Too many scenarios; reduce rates, step-ups or tenures")
+    if include_curves and n_pairs * sum(tenures) * 12 * (2 if monte_carlo else 1) > MAX_CURVE_POINTS:
+        raise ValueError("Too many curve points; set include_curves to false or reduce scenarios")
+    pair_rates = np.repeat(rates, len(steps))
+    monthly_rate = pair_rates / 100 / 12
+    factors = np.broadcast_to((1 + monthly_rate)[:, None], (n_pairs, months))
+    # Overflow is reported by _check_amounts
+    with np.errstate(over="ignore", invalid="ignore"):
+        flows = np.tile(_monthly_flows(float(monthly_amount), steps, months), (len(rates), 1))
+        values = _simulate(mode, float(initial_amount), flows, factors)
+        cumulative_flow = np.cumsum(flows, axis=-1)
+    limit = MAX_CURVE_AMOUNT if include_curves else np.inf
+    _check_amounts(values, limit)
+    _check_amounts(cumulative_flow, limit)
+    depletion = _first_depletion(values) if mode == "swp" else None
+
+    simulated = None
+    if monte_carlo:
+        paths = monte_carlo["paths"]
+        if n_pairs * paths * months > MAX_MONTE_CARLO_CELLS:
+            raise ValueError("Too many Monte Carlo cells; reduce paths or scenarios")
+        sigma = monte_carlo["volatility"] / 100 / np.sqrt(12)
+        # Lognormal monthly factors whose mean equals the deterministic 1 + r/12
+        mu = np.log1p(monthly_rate)[:, None, None] - sigma ** 2 / 2
+        rng = np.random.default_rng(monte_carlo.get("seed"))
+        random_factors = np.exp(mu + sigma * rng.standard_normal((n_pairs, paths, months)))
+        with np.errstate(over="ignore", invalid="ignore"):
+            simulated = _simulate(mode, float(initial_amount), flows[:, None, :], random_factors)
+        _check_amounts(simulated, limit)
+        simulated_depletion = _first_depletion(simulated) if mode == "swp" else None
+        if mode == "swp":
+            simulated = np.maximum(simulated, 0)
+
+    scenarios = []
+    for rate_i, step_i, tenure in product(range(len(rates)), range(len(steps)), tenures):
+        pair = rate_i * len(steps) + step_i
+        end = tenure * 12
+        final = float(values[pair, end - 1])
+        scenario = {
+            "annual_rate": float(rates[rate_i]),
+            "tenure_years": tenure,
+            "step_up": float(steps[step_i]),
+            "cagr": None,
+            "depletion_month": None,
+            "depletion_date": None,
+        }
+
+        if mode == "sip":
+            total_flow = float(cumulative_flow[pair, end - 1])
+            invested = initial_amount + total_flow
+            gain = final - invested
+            if invested > 0 and final > 0:
+                scenario["cagr"] = round((final / invested) ** (1 / tenure) - 1, 6)
+            curve = values[pair, :end]
+        else:
+            depleted_at = int(depletion[pair])
+            if depleted_at < end:
+                # The month it runs out only the remaining balance is withdrawn
+                total_flow = float(cumulative_flow[pair, depleted_at] + values[pair, depleted_at])
+                final = 0.0
+                scenario["depletion_month"] = depleted_at + 1
+                scenario["depletion_date"] = add_months(start_date, depleted_at + 1)
+            else:
+                total_flow = float(cumulative_flow[pair, end - 1])
+            gain = final + total_flow - initial_amount
+            curve = np.maximum(values[pair, :end], 0)
+
+        scenario.update({
+            "total_flow": round(total_flow),
+            "final_value": round(final),
+            "gain": round(gain),
+            "meets_target": None if target_amount is None else final >= target_amount,
+            "curve": np.rint(curve).astype(np.int64).tolist() if include_curves else None,
+            "monte_carlo": None,
+        })
+
+        if simulated is not None:
+            finals = simulated[pair, :, end - 1]
+            p10, p50, p90 = np.percentile(finals, [10, 50, 90])
+            summary = {
+                "p10": round(float(p10)),
+                "p50": round(float(p50)),
+                "p90": round(float(p90)),
+                "target_probability": None if target_amount is None
+                else round(float(np.mean(finals >= target_amount)), 4),
+                "depletion_probability": None if mode == "sip"
+                else round(float(np.mean(simulated_depletion[pair] < end)), 4),
+                "median_curve": np.rint(np.median(simulated[pair, :, :end], axis=0)).astype(np.int64).tolist()
+                if include_curves else None,
+            }
+            scenario["monte_carlo"] = summary
+
+        scenarios.append(scenario)
+
+    return {"mode": mode, "count": len(scenarios), "scenarios": scenarios}
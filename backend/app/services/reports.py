@@ -0,0 +1,225 @@
+"""Reporting cube: per-user totals by (domain, year, month, category).
+
+ReportRollup cells are kept in step with Expense, Income,
+InvestmentTransaction and PremiumPayment rows by a flush listener, the
+same way MonthlyIncomeSummary is: every insert, update or delete applies
+its delta to the affected cells in the same transaction. Bulk expense
+inserts and the scheduler's premium payments bypass ORM events and call
+`apply_deltas` themselves (see app.services.expense_import and
+app.services.scheduler). Months are taken in UTC.
+
+Insurance premiums count in the month they fell due, once the scheduler
+has posted them as PremiumPayment rows; upcoming premiums are not counted.
+
+Use `python -m app.services.reports rebuild` to backfill from scratch.
+"""
+import argparse
+import enum
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.expense import Expense
+from app.models.income import Income
+from app.models.insurance import PremiumPayment
+from app.models.investment import InvestmentTransaction
+from app.models.report import ReportRollup
+from app.services.income_summary import attribute_values
+
+DOMAINS = ("expense", "income", "investment", "insurance")
+DIMENSIONS = ("domain", "year", "month", "category")
+
+Cell = Tuple[str, str, int, int, str]  # (user_id, domain, year, month, category)
+
+def _category(value) -> str:
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    return "" if value is None else str(value)
+
+def _month_of(value: datetime) -> Tuple[int, int]:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.year, value.month
+
+def _contribution(obj, old: bool = False) -> Optional[Tuple[Cell, int]]:
+    """The cell an object counts towards and the amount it adds, or None."""
+    if isinstance(obj, Expense):
+        v = attribute_values(obj, ("user_id", "date", "category", "amount"), old)
+        return (v["user_id"], "expense", *_month_of(v["date"]), _category(v["category"])), v["amount"] or 0
+    if isinstance(obj, Income):
+        v = attribute_values(obj, ("user_id", "year", "month", "income_source_id", "amount", "gross_amount"), old)
+        amount = v["gross_amount"] if v["gross_amount"] is not None else v["amount"]
+        return (v["user_id"], "income", v["year"], v["month"], _category(v["income_source_id"])), amount or 0
+    if isinstance(obj, InvestmentTransaction):
+        v = attribute_values(obj, ("user_id", "date", "transaction_type", "amount"), old)
+        return (
+            (v["user_id"], "investment", *_month_of(v["date"]), _category((v["transaction_type"] or "").lower())),
+            v["amount"] or 0,
+        )
+    if isinstance(obj, PremiumPayment):
+        v = attribute_values(obj, ("user_id", "due_date", "policy_type", "amount"), old)
+        return (v["user_id"], "insurance", *_month_of(v["due_date"]), _category(v["policy_type"])), v["amount"] or 0
+    return None
+
+def _new_deltas() -> Dict:
+    return defaultdict(lambda: [0, 0])  # cell -> [total, count]
+
+def _add(deltas: Dict, contribution: Optional[Tuple[Cell, int]], sign: int) -> None:
+    if contribution is not None:
+        cell, amount = contribution
+        deltas[cell][0] += sign * amount
+        deltas[cell][1] += sign
+
+def expense_row_deltas(rows: List[Dict]) -> Dict:
+    """Deltas for expense rows inserted without the ORM (bulk import, scheduler)."""
+    deltas = _new_deltas()
+    for row in rows:
+        cell = (row["user_id"], "expense", *_month_of(row["date"]), _category(row["category"]))
+        _add(deltas, (cell, row["amount"]), 1)
+    return deltas
+
+def premium_payment_deltas(rows: List[Dict]) -> Dict:
+    """Deltas for premium payment rows inserted without the ORM (scheduler)."""
+    deltas = _new_deltas()
+    for row in rows:
+        cell = (row["user_id"], "insurance", *_month_of(row["due_date"]), _category(row["policy_type"]))
+        _add(deltas, (cell, row["amount"]), 1)
+    return deltas
+
+def apply_deltas(connection, deltas: Dict) -> None:
+    """Fold deltas into the rollup cells and drop cells that no longer count anything."""
+    changes = [
+        {
+            "id": str(uuid.uuid4()), "user_id": cell[0], "domain": cell[1], "year": cell[2],
+            "month": cell[3], "category": cell[4], "total": total, "count": count,
+        }
+        # Sorted so concurrent transactions lock cells in the same order
+        for cell, (total, count) in sorted(deltas.items()) if total or count
+    ]
+    if not changes:
+        return
+
+    table = ReportRollup.__table__
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        statement = upsert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.domain, table.c.year, table.c.month, table.c.category],
+            set_={
+                "total": table.c.total + statement.excluded.total,
+                "count": table.c.count + statement.excluded.count,
+                "updated_at": func.now(),
+            },
+        )
+        connection.execute(statement, changes)
+    else:
+        for change in changes:
+            cell = (
+                table.c.user_id == change["user_id"], table.c.domain == change["domain"],
+                table.c.year == change["year"], table.c.month == change["month"],
+                table.c.category == change["category"],
+            )
+            row = connection.execute(select(table.c.id).where(*cell).with_for_update()).first()
+            if row is None:
+                connection.execute(insert(table).values(**change))
+            else:
+                connection.execute(update(table).where(table.c.id == row.id).values(
+                    total=table.c.total + change["total"], count=table.c.count + change["count"]
+                ))
+
+    connection.execute(delete(table).where(
+        table.c.user_id.in_({change["user_id"] for change in changes}), table.c.count <= 0
+    ))
+
+@event.listens_for(Session, "after_flush")
+def _track_rollup_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still show the pre-flush state here
+    deltas = _new_deltas()
+    for obj in session.new:
+        _add(deltas, _contribution(obj), 1)
+    for obj in session.dirty:
+        if isinstance(obj, (Expense, Income, InvestmentTransaction, PremiumPayment)) and session.is_modified(obj):
+            _add(deltas, _contribution(obj, old=True), -1)
+            _add(deltas, _contribution(obj), 1)
+    for obj in session.deleted:
+        _add(deltas, _contribution(obj, old=True), -1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def _utc_month(column, dialect: str):
+    """(year, month) of a timestamp in UTC, as _month_of takes them."""
+    if dialect == "postgresql":
+        # extract() on a timestamptz would use the session time zone
+        column = func.timezone("UTC", column)
+    return extract("year", column), extract("month", column)
+
+def _aggregates(user_id: Optional[str], dialect: str):
+    """(domain, statement) pairs computing every cell from the source tables."""
+    expense_year, expense_month = _utc_month(Expense.date, dialect)
+    transaction_year, transaction_month = _utc_month(InvestmentTransaction.date, dialect)
+    premium_year, premium_month = _utc_month(PremiumPayment.due_date, dialect)
+    statements = [
+        ("expense", Expense, select(
+            Expense.user_id, expense_year, expense_month, Expense.category, func.sum(Expense.amount), func.count(),
+        ).group_by(Expense.user_id, expense_year, expense_month, Expense.category)),
+        ("income", Income, select(
+            Income.user_id, Income.year, Income.month, Income.income_source_id,
+            func.sum(func.coalesce(Income.gross_amount, Income.amount)), func.count(),
+        ).group_by(Income.user_id, Income.year, Income.month, Income.income_source_id)),
+        ("investment", InvestmentTransaction, select(
+            InvestmentTransaction.user_id, transaction_year, transaction_month,
+            func.lower(InvestmentTransaction.transaction_type), func.sum(InvestmentTransaction.amount), func.count(),
+        ).group_by(
+            InvestmentTransaction.user_id, transaction_year, transaction_month,
+            func.lower(InvestmentTransaction.transaction_type),
+        )),
+        ("insurance", PremiumPayment, select(
+            PremiumPayment.user_id, premium_year, premium_month, PremiumPayment.policy_type,
+            func.sum(PremiumPayment.amount), func.count(),
+        ).group_by(PremiumPayment.user_id, premium_year, premium_month, PremiumPayment.policy_type)),
+    ]
+    if user_id:
+        statements = [(domain, statement.where(model.user_id == user_id)) for domain, model, statement in statements]
+    else:
+        statements = [(domain, statement) for domain, _, statement in statements]
+    return statements
+
+def rebuild_rollups(db: Session, user_id: str = None) -> int:
+    """Recompute rollup cells from the source tables, for one user or everyone."""
+    deltas = _new_deltas()
+    for domain, statement in _aggregates(user_id, db.get_bind().dialect.name):
+        for row_user, year, month, category, total, count in db.execute(statement):
+            deltas[(row_user, domain, int(year), int(month), _category(category))] = [int(total or 0), count]
+
+    clear = delete(ReportRollup)
+    if user_id:
+        clear = clear.where(ReportRollup.user_id == user_id)
+    connection = db.connection()
+    connection.execute(clear)
+    apply_deltas(connection, deltas)
+    db.commit()
+    return len(deltas)
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Reporting cube maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Only rebuild this user's cells")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_rollups(db, args.user)} report cells")
+    finally:
+        db.close()
@@ -0,0 +1,230 @@
+"""Materializes due recurring expenses and insurance premiums.
+
+A recurring Expense is a template: each time its next_due_date passes, an
+ordinary (non-recurring) copy dated on the due date is inserted and
+next_due_date moves one interval ahead, or is cleared after end_date. An
+active InsurancePolicy posts each premium as an "Insurance" expense plus a
+PremiumPayment (the dated fact the insurance reports count) and advances
+next_premium_date by its premium frequency. Missed periods are caught up
+in one go.
+
+Due rows are found with a range scan on the next-due indexes and locked
+with FOR UPDATE SKIP LOCKED, so concurrent workers take disjoint batches.
+Each item is then claimed with a conditional UPDATE on its old due date;
+only a claim that changed the row posts occurrences, so an item is never
+posted twice even where SKIP LOCKED is unavailable (SQLite). Occurrences
+go through the bulk expense insert path.
+"""
+import asyncio
+import calendar
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.insurance import InsurancePolicy, PremiumFrequency, PremiumPayment
+from app.services import reports, sync
+from app.services.expense_import import insert_expenses
+
+# Upper bound on occurrences posted for one item per run (a daily expense a year behind)
+MAX_CATCH_UP = 366
+PREMIUM_CATEGORY = "Insurance"
+
+INTERVAL_MONTHS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "half yearly": 6,
+    "half-yearly": 6,
+    "yearly": 12,
+    "annually": 12,
+}
+INTERVAL_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "biweekly": 14,
+    "fortnightly": 14,
+}
+
+def advance(value: datetime, interval: str, anchor_day: Optional[int] = None) -> Optional[datetime]:
+    """The next due date one interval after `value`, or None for an unknown interval.
+
+    Monthly intervals land on `anchor_day` (default: the day of `value`), clamped
+    to the month's length, so a schedule on the 31st does not drift to the 28th.
+    """
+    interval = (interval or "").strip().lower()
+    if interval in INTERVAL_DAYS:
+        return value + timedelta(days=INTERVAL_DAYS[interval])
+    if interval in INTERVAL_MONTHS:
+        month_index = value.month - 1 + INTERVAL_MONTHS[interval]
+        year, month = value.year + month_index // 12, month_index % 12 + 1
+        day = min(anchor_day or value.day, calendar.monthrange(year, month)[1])
+        return value.replace(year=year, month=month, day=day)
+    return None
+
+def anchor_day(due: datetime, reference: Optional[datetime]) -> int:
+    """Day of month a schedule repeats on: the reference's day if `due` is its clamped form."""
+    if reference is not None and due.day == min(reference.day, calendar.monthrange(due.year, due.month)[1]):
+        return reference.day
+    return due.day
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; treat them as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def due_dates(next_due: datetime, interval: str, now: datetime, end: Optional[datetime] = None,
+              reference: Optional[datetime] = None) -> Tuple[List[datetime], Optional[datetime]]:
+    """Occurrence dates due by `now` and the following due date (None once past `end`)."""
+    occurrences = []
+    day = anchor_day(next_due, reference)
+    due = next_due
+    while due is not None and _as_utc(due) <= now and len(occurrences) < MAX_CATCH_UP:
+        if end is not None and _as_utc(due) > _as_utc(end):
+            due = None
+            break
+        occurrences.append(due)
+        due = advance(due, interval, day)
+    if due is not None and end is not None and _as_utc(due) > _as_utc(end):
+        due = None
+    return occurrences, due
+
+async def _claim(db: AsyncSession, column, row_id: str, old: datetime, new: Optional[datetime]) -> bool:
+    """Move a due date forward only if nobody else has; True if this worker owns the occurrences."""
+    model = column.class_
+    result = await db.execute(
+        update(model).where(model.id == row_id, column == old).values({column.key: new})
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+async def post_due_expenses(db: AsyncSession, now: datetime, batch_size: int) -> Tuple[int, List[Dict]]:
+    """Post one batch of due recurring expenses; returns (templates claimed, occurrence rows)."""
+    templates = (await db.execute(
+        select(
+            Expense.id, Expense.user_id, Expense.amount, Expense.description, Expense.category, Expense.date,
+            Expense.recurrence_interval, Expense.next_due_date, Expense.end_date, Expense.tags, Expense.notes,
+        ).where(
+            Expense.next_due_date <= now, Expense.is_recurring.is_(True)
+        ).order_by(Expense.next_due_date).limit(batch_size).with_for_update(skip_locked=True)
+    )).all()
+
+    claimed, rows, moved = 0, [], []
+    for template in templates:
+        if advance(template.next_due_date, template.recurrence_interval) is None:
+            # Unknown interval: stop scheduling the template instead of leaving it due forever
+            print(f"Expense {template.id} has unknown recurrence interval {template.recurrence_interval!r}")
+            if await _claim(db, Expense.next_due_date, template.id, template.next_due_date, None):
+                claimed += 1
+                moved.append((template.user_id, "expense", template.id, False))
+            continue
+        occurrences, following = due_dates(
+            template.next_due_date, template.recurrence_interval, now, template.end_date, template.date
+        )
+        if not occurrences and following == template.next_due_date:
+            continue
+        if not await _claim(db, Expense.next_due_date, template.id, template.next_due_date, following):
+            continue
+        claimed += 1
+        moved.append((template.user_id, "expense", template.id, False))
+        rows.extend({
+            "id": str(uuid.uuid4()),
+            "user_id": template.user_id,
+            "amount": template.amount,
+            "description": template.description,
+            "category": template.category,
+            "date": due,
+            "is_recurring": False,
+            "tags": template.tags,
+            "notes": template.notes,
+        } for due in occurrences)
+
+    await insert_expenses(db, rows)
+    # The claims moved next_due_date with a Core UPDATE, so the templates' changes are logged here
+    await db.run_sync(lambda session: sync.record_changes(session.connection(), moved))
+    return claimed, rows
+
+async def post_due_premiums(db: AsyncSession, now: datetime, batch_size: int) -> Tuple[int, List[Dict]]:
+    """Post one batch of due insurance premiums as expenses; returns (policies claimed, premium rows)."""
+    policies = (await db.execute(
+        select(
+            InsurancePolicy.id, InsurancePolicy.user_id, InsurancePolicy.policy_number,
+            InsurancePolicy.policy_type, InsurancePolicy.insurance_company, InsurancePolicy.premium_amount,
+            InsurancePolicy.premium_frequency, InsurancePolicy.next_premium_date, InsurancePolicy.start_date,
+            InsurancePolicy.end_date,
+            InsurancePolicy.is_active,
+        ).where(
+            InsurancePolicy.next_premium_date <= now, InsurancePolicy.is_active.isnot(False)
+        ).order_by(InsurancePolicy.next_premium_date).limit(batch_size).with_for_update(skip_locked=True)
+    )).all()
+
+    claimed, rows, payments, changes = 0, [], [], []
+    for policy in policies:
+        frequency = policy.premium_frequency
+        interval = frequency.value if isinstance(frequency, PremiumFrequency) else frequency
+        occurrences, following = due_dates(policy.next_premium_date, interval, now, policy.end_date, policy.start_date)
+        if not occurrences and following == policy.next_premium_date:
+            continue
+        if not await _claim(db, InsurancePolicy.next_premium_date, policy.id, policy.next_premium_date, following):
+            continue
+        claimed += 1
+        changes.append((policy.user_id, "insurance_policy", policy.id, False))
+        payments.extend({
+            "id": str(uuid.uuid4()),
+            "user_id": policy.user_id,
+            "policy_id": policy.id,
+            "policy_type": policy.policy_type,
+            "amount": policy.premium_amount,
+            "due_date": due,
+        } for due in occurrences)
+        rows.extend({
+            "id": str(uuid.uuid4()),
+            "user_id": policy.user_id,
+            "amount": policy.premium_amount,
+            "description": f"{policy.insurance_company} premium ({policy.policy_number})",
+            "category": PREMIUM_CATEGORY,
+            "date": due,
+            "is_recurring": False,
+        } for due in occurrences)
+
+    await insert_expenses(db, rows)
+    if payments:
+        await db.execute(insert(PremiumPayment), payments)
+    # Core writes skip the flush listeners, so count the payments and log the policies' changes here
+    deltas = reports.premium_payment_deltas(payments)
+
+    def update_derived(session):
+        reports.apply_deltas(session.connection(), deltas)
+        sync.record_changes(session.connection(), changes)
+
+    await db.run_sync(update_derived)
+    return claimed, rows
+
+async def run_once(session_factory, now: Optional[datetime] = None,
+                   batch_size: int = settings.SCHEDULER_BATCH_SIZE) -> Dict[str, int]:
+    """Drain everything due by `now`, one committed batch at a time."""
+    now = now or datetime.now(timezone.utc)
+    totals = {"expenses": 0, "premiums": 0}
+    for key, post in (("expenses", post_due_expenses), ("premiums", post_due_premiums)):
+        while True:
+            async with session_factory() as db:
+                claimed, rows = await post(db, now, batch_size)
+                await db.commit()
+            for user_id in {row["user_id"] for row in rows}:
+                await response_cache.invalidate(user_id, "expenses", "reports")
+            totals[key] += len(rows)
+            if claimed == 0:
+                break
+    return totals
+
+async def run_forever(session_factory, interval: float = settings.SCHEDULER_INTERVAL_SECONDS) -> None:
+    """Poll for due items until cancelled."""
+    while True:
+        try:
+            await run_once(session_factory)
+        except Exception as e:
+            print(f"Scheduler run failed: {e}")
+        await asyncio.sleep(interval)
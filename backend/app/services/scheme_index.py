@@ -0,0 +1,173 @@
+"""In-memory search index over mutual fund scheme names.
+
+Scheme names are split into padded word trigrams with a posting list per
+trigram. A query scores every scheme at once by counting shared trigrams
+(np.bincount over the query's postings), which tolerates typos and partial
+words; the best candidates are then re-ranked with word-prefix and substring
+bonuses. Indexes are immutable, so a refresh builds a new one off the event
+loop and swaps the module-level reference.
+"""
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool  # pyright: ignore[reportMissingImports]
+
+from app.core.config import settings
+
+# Candidates re-ranked in Python after the vectorized trigram pass
+SHORTLIST_SIZE = 200
+# Fraction of the query's trigrams a scheme must share to be a match
+MIN_TRIGRAM_OVERLAP = 0.3
+
+_non_alnum = re.compile(r"[^a-z0-9]+")
+
+def normalize(text: str) -> str:
+    return _non_alnum.sub(" ", text.lower()).strip()
+
+def _trigrams(words: Iterable[str]) -> set:
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class SchemeIndex:
+    """Immutable trigram index over (scheme_code, scheme_name) pairs."""
+
+    def __init__(self, schemes: List[Tuple[str, str]]):
+        self.codes = [code for code, _ in schemes]
+        self.names = [name for _, name in schemes]
+        self.normalized = [normalize(name) for name in self.names]
+        self.built_at = time.time()
+
+        postings: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(schemes), dtype=np.int32)
+        for i, text in enumerate(self.normalized):
+            grams = _trigrams(text.split())
+            sizes[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.trigram_counts = sizes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        text = normalize(query)
+        if not text or not len(self):
+            return []
+        words = text.split()
+        grams = _trigrams(words)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+
+        shared = np.bincount(np.concatenate(lists), minlength=len(self))
+        # Share of the query found in the name, nudged towards shorter names
+        score = shared / len(grams) - 0.002 * self.trigram_counts
+        score[shared < max(1, int(MIN_TRIGRAM_OVERLAP * len(grams)))] = -np.inf
+
+        shortlist = min(SHORTLIST_SIZE, len(self))
+        candidates = np.argpartition(-score, shortlist - 1)[:shortlist]
+        ranked = []
+        for i in candidates:
+            base = score[i]
+            if not np.isfinite(base):
+                continue
+            name_words = self.normalized[i].split()
+            if all(any(w.startswith(q) for w in name_words) for q in words):
+                base += 1.0
+                if all(q in name_words for q in words):
+                    base += 0.5
+            if text in self.normalized[i]:
+                base += 0.5
+            if self.normalized[i].startswith(text):
+                base += 0.25
+            ranked.append((base, int(i)))
+
+        ranked.sort(key=lambda item: (-item[0], self.names[item[1]]))
+        return [
+            {"scheme_code": self.codes[i], "scheme_name": self.names[i], "score": round(float(s), 4)}
+            for s, i in ranked[:limit]
+        ]
+
+# The live index; replaced wholesale on refresh, never mutated
+current: Optional[SchemeIndex] = None
+
+def _parse_schemes(payload: List[Dict]) -> List[Tuple[str, str]]:
+    return [
+        (str(item["schemeCode"]), item["schemeName"])
+        for item in payload if item.get("schemeCode") is not None and item.get("schemeName")
+    ]
+
+def load_snapshot(path: str = settings.SCHEME_SNAPSHOT_PATH) -> Optional[SchemeIndex]:
+    """Build an index from a snapshot of the mfapi `/mf` list, if one exists."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return SchemeIndex(_parse_schemes(json.load(f)))
+
+def write_snapshot(payload: List[Dict], path: str = settings.SCHEME_SNAPSHOT_PATH) -> None:
+    """Atomically replace the snapshot file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".schemes-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+async def fetch_schemes() -> List[Dict]:
+    import httpx  # pyright: ignore[reportMissingImports]
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        response = await client.get(f"{settings.MFAPI_BASE_URL}/mf")
+        response.raise_for_status()
+        return response.json()
+
+def _snapshot_age(path: str) -> float:
+    return time.time() - os.path.getmtime(path) if os.path.exists(path) else float("inf")
+
+def _rebuild(payload: List[Dict]) -> SchemeIndex:
+    index = SchemeIndex(_parse_schemes(payload))
+    write_snapshot(payload)
+    return index
+
+async def refresh_index() -> SchemeIndex:
+    """Download the scheme list, rebuild the index off the event loop and swap it in."""
+    global current
+    payload = await fetch_schemes()
+    current = await run_in_threadpool(_rebuild, payload)
+    return current
+
+async def run_refresh_loop() -> None:
+    """Load the snapshot, then keep the index fresh; runs as a background task."""
+    global current
+    try:
+        current = await run_in_threadpool(load_snapshot)
+    except Exception as e:
+        print(f"Failed to load scheme snapshot: {e}")
+
+    interval = settings.SCHEME_INDEX_REFRESH_SECONDS
+    if interval <= 0:
+        # Refresh disabled: never download; without a snapshot the index stays unloaded
+        return
+    delay = max(interval - _snapshot_age(settings.SCHEME_SNAPSHOT_PATH), 0) if current is not None else 0
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await refresh_index()
+            delay = interval
+        except Exception as e:
+            print(f"Scheme index refresh failed: {e}")
+            delay = 300 if current is None else interval
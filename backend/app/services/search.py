@@ -0,0 +1,253 @@
+"""Full-text search across expenses, insurance policies, assets and document names.
+
+Every searchable entity has one SearchDocument row (a title and a body of
+its other text fields) owned by its user. A flush listener keeps the rows
+in step with ORM writes in the same transaction; bulk expense inserts
+bypass ORM events and call `index_rows` themselves (see
+app.services.expense_import). The text index on top depends on the
+database:
+
+- PostgreSQL: a GIN index on the weighted tsvector of title and body
+  (app.models.search.document_vector), ranked with ts_rank.
+- SQLite: an external-content FTS5 table kept in sync by triggers,
+  ranked with bm25.
+
+Every query word is matched as a prefix and all of them must match.
+Use `python -m app.services.search rebuild` to backfill the index.
+"""
+import argparse
+import enum
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, delete, event, func, inspect, insert, literal_column, or_, select, table, update
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset, AssetDocument, MaintenanceDocument
+from app.models.expense import Expense
+from app.models.insurance import InsuranceDocument, InsurancePolicy
+from app.models.investment import PolicyDocument
+from app.models.search import SearchDocument, document_vector
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+
+# Model -> (entity type, title field, body fields)
+SOURCES = {
+    Expense: ("expense", "description", ("category", "tags", "notes")),
+    InsurancePolicy: ("insurance_policy", "insurance_company",
+                      ("policy_number", "policy_type", "description", "notes")),
+    Asset: ("asset", "name", ("category", "brand", "model", "location", "description")),
+    DocumentAttachment: ("tax_document", "file_name", ("file_name", "document_type")),
+    AssetDocument: ("asset_document", "file_name", ("file_name", "document_type")),
+    MaintenanceDocument: ("maintenance_document", "file_name", ("file_name", "document_type")),
+    InsuranceDocument: ("insurance_document", "file_name", ("file_name", "document_type")),
+    PolicyDocument: ("policy_document", "file_name", ("file_name", "document_type")),
+}
+ENTITY_TYPES = tuple(entity_type for entity_type, _, _ in SOURCES.values())
+
+MAX_TERMS = 10
+SNIPPET_START, SNIPPET_STOP = "<mark>", "</mark>"
+
+_WORD = re.compile(r"[^\W_]+")
+
+def _text(name: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if name == "tags":
+        try:
+            tags = json.loads(value)
+        except ValueError:
+            return str(value)
+        return " ".join(str(tag) for tag in tags) if isinstance(tags, list) else str(value)
+    if name == "file_name":
+        # "form16_2024-25.pdf" -> "form16 2024 25 pdf", so parts of a file name match on every dialect
+        return " ".join(_WORD.findall(str(value)))
+    return str(value)
+
+def document_values(model, values: Dict) -> Dict:
+    """SearchDocument column values for an entity, from a dict of its columns plus user_id."""
+    entity_type, title, body = SOURCES[model]
+    return {
+        "user_id": values["user_id"],
+        "entity_type": entity_type,
+        "entity_id": values["id"],
+        "title": str(values.get(title) or ""),
+        "body": "\n".join(text for text in (_text(name, values.get(name)) for name in body) if text),
+    }
+
+def upsert_documents(connection, documents: List[Dict]) -> None:
+    """Insert or replace documents, keyed by (entity_type, entity_id)."""
+    if not documents:
+        return
+    table_ = SearchDocument.__table__
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        statement = upsert(table_)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table_.c.entity_type, table_.c.entity_id],
+            set_={
+                "user_id": statement.excluded.user_id,
+                "title": statement.excluded.title,
+                "body": statement.excluded.body,
+                "updated_at": func.now(),
+            },
+        )
+        connection.execute(statement, documents)
+    else:
+        for document in documents:
+            result = connection.execute(update(table_).where(
+                table_.c.entity_type == document["entity_type"], table_.c.entity_id == document["entity_id"],
+            ).values(user_id=document["user_id"], title=document["title"], body=document["body"]))
+            if result.rowcount == 0:
+                connection.execute(insert(table_).values(**document))
+
+def remove_documents(connection, entities: Iterable[Tuple[str, str]]) -> None:
+    """Delete the documents of (entity_type, entity_id) pairs."""
+    by_type: Dict[str, List[str]] = {}
+    for entity_type, entity_id in entities:
+        by_type.setdefault(entity_type, []).append(entity_id)
+    for entity_type, entity_ids in by_type.items():
+        connection.execute(delete(SearchDocument).where(
+            SearchDocument.entity_type == entity_type, SearchDocument.entity_id.in_(entity_ids)
+        ))
+
+def index_rows(connection, model, rows: List[Dict]) -> None:
+    """Index rows written with Core inserts, which skip the flush listener."""
+    upsert_documents(connection, [document_values(model, row) for row in rows])
+
+def _deduction_owners(connection, deduction_ids) -> Dict[str, str]:
+    # Tax deduction attachments have no user_id of their own
+    if not deduction_ids:
+        return {}
+    return dict(connection.execute(
+        select(TaxDeduction.id, TaxDeduction.user_id).where(TaxDeduction.id.in_(deduction_ids))
+    ).all())
+
+@event.listens_for(Session, "after_flush")
+def _track_search_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still show the pre-flush state here
+    changed = [obj for obj in session.new if type(obj) in SOURCES]
+    for obj in session.dirty:
+        if type(obj) in SOURCES:
+            state = inspect(obj)
+            _, title, body = SOURCES[type(obj)]
+            if any(state.attrs[name].history.has_changes() for name in (title, *body)):
+                changed.append(obj)
+    removed = [(SOURCES[type(obj)][0], obj.id) for obj in session.deleted if type(obj) in SOURCES]
+    if not changed and not removed:
+        return
+
+    connection = session.connection()
+    owners = _deduction_owners(connection, {
+        obj.tax_deduction_id for obj in changed if isinstance(obj, DocumentAttachment)
+    })
+    documents = []
+    for obj in changed:
+        _, title, body = SOURCES[type(obj)]
+        values = {name: getattr(obj, name) for name in (title, *body, "id")}
+        values["user_id"] = owners.get(obj.tax_deduction_id) if isinstance(obj, DocumentAttachment) else obj.user_id
+        if values["user_id"] is not None:
+            documents.append(document_values(type(obj), values))
+    remove_documents(connection, removed)
+    upsert_documents(connection, documents)
+
+def query_terms(q: str) -> List[str]:
+    """Lower-cased words of a search query, in order, without duplicates."""
+    return list(dict.fromkeys(word.lower() for word in _WORD.findall(q)))[:MAX_TERMS]
+
+def search_statement(dialect: str, user_id: str, terms: Sequence[str], entity_types: Optional[Sequence[str]] = None,
+                     limit: int = 20, after: Optional[Tuple[float, int]] = None):
+    """One page of a user's documents matching every term, most relevant first.
+
+    Rows have (id, entity_type, entity_id, title, snippet, rank); a higher
+    rank is more relevant. `after` is the (rank, id) of the last row of the
+    previous page.
+    """
+    if dialect == "sqlite":
+        fts = table("search_documents_fts", column("rowid"))
+        fts_name = literal_column("search_documents_fts")
+        match = fts_name.op("MATCH")(" ".join(f'"{term}"*' for term in terms))
+        ranked = select(
+            SearchDocument.id, SearchDocument.entity_type, SearchDocument.entity_id, SearchDocument.title,
+            # bm25 is lower for better matches; title hits count double
+            (-func.bm25(fts_name, 2.0, 1.0)).label("rank"),
+        ).select_from(fts.join(SearchDocument, SearchDocument.id == fts.c.rowid)).where(
+            match, SearchDocument.user_id == user_id,
+        )
+    else:
+        tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+        vector = document_vector(SearchDocument.title, SearchDocument.body)
+        ranked = select(
+            SearchDocument.id, SearchDocument.entity_type, SearchDocument.entity_id, SearchDocument.title,
+            SearchDocument.body, func.ts_rank(vector, tsquery).label("rank"),
+        ).where(vector.op("@@")(tsquery), SearchDocument.user_id == user_id)
+    if entity_types:
+        ranked = ranked.where(SearchDocument.entity_type.in_(entity_types))
+
+    ranked = ranked.subquery()
+    page = select(ranked)
+    if after is not None:
+        rank, row_id = after
+        page = page.where(or_(ranked.c.rank < rank, and_(ranked.c.rank == rank, ranked.c.id < row_id)))
+    page = page.order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit).subquery()
+
+    # Snippets are costly, so they are only made for the rows of this page
+    if dialect == "sqlite":
+        snippet = func.snippet(fts_name, -1, SNIPPET_START, SNIPPET_STOP, "…", 16)
+        query = select(page.c.id, page.c.entity_type, page.c.entity_id, page.c.title, snippet.label("snippet"),
+                       page.c.rank).select_from(page.join(fts, fts.c.rowid == page.c.id)).where(match)
+    else:
+        snippet = func.ts_headline(
+            literal_column("'simple'"), page.c.title + "\n" + page.c.body, tsquery,
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=24, MinWords=8",
+        )
+        query = select(page.c.id, page.c.entity_type, page.c.entity_id, page.c.title, snippet.label("snippet"),
+                       page.c.rank)
+    return query.order_by(page.c.rank.desc(), page.c.id.desc())
+
+def _source_query(model):
+    query = select(model.__table__)
+    if model is DocumentAttachment:
+        query = select(model.__table__, TaxDeduction.user_id).join(TaxDeduction)
+    return query
+
+def rebuild_index(db: Session, user_id: str = None, batch_size: int = 1000) -> int:
+    """Re-index every searchable entity, for one user or everyone."""
+    connection = db.connection()
+    clear = delete(SearchDocument)
+    if user_id:
+        clear = clear.where(SearchDocument.user_id == user_id)
+    connection.execute(clear)
+
+    indexed = 0
+    for model in SOURCES:
+        query = _source_query(model)
+        if user_id:
+            query = query.where((TaxDeduction.user_id if model is DocumentAttachment else model.user_id) == user_id)
+        result = connection.execute(query.execution_options(yield_per=batch_size))
+        for rows in result.mappings().partitions():
+            index_rows(connection, model, [dict(row) for row in rows])
+            indexed += len(rows)
+    db.commit()
+    return indexed
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Search index maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Only re-index this user's data")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Indexed {rebuild_index(db, args.user)} documents")
+    finally:
+        db.close()
@@ -0,0 +1,231 @@
+"""Per-user change feed for delta sync of offline clients.
+
+Every insert, update and delete of a synced entity (expenses, incomes,
+investments, tax deductions with their attachments, insurance policies and
+assets) replaces that entity's ChangeLogEntry with a new one carrying the
+next `seq`, in the same transaction. A flush listener handles ORM writes;
+Core writes (bulk expense inserts, the scheduler's due-date claims) call
+`record_changes` themselves. The log therefore holds one row per entity,
+the latest change, and deletes leave a tombstone.
+
+A client keeps the token of its last sync and asks for entries after its
+seq: only rows changed since, and the ids of rows deleted since, come
+back. Without a token it gets every live row, which is also how a client
+whose token has outlived the tombstone retention starts over.
+
+On PostgreSQL, transactions that log changes first take a transaction-level
+advisory lock per affected user, so each user's sequence numbers are
+committed in order and a reader can never skip a seq of theirs that
+commits after it has read past it. Writers for different users do not
+wait for each other.
+
+A token also records when the client's view was current (`as_of`): the
+start of a full sync, carried through all of its pages, or the time a
+delta sync caught up. Tombstones are pruned by age, so a token older than
+the retention is refused.
+
+Use `python -m app.services.sync backfill` to log rows written before the
+feed existed, and `prune` to drop tombstones older than the retention.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status  # pyright: ignore[reportMissingImports]
+from sqlalchemy import delete, event, exists, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.asset import Asset
+from app.models.expense import Expense
+from app.models.income import Income
+from app.models.insurance import InsurancePolicy
+from app.models.investment import Investment
+from app.models.sync import ChangeLogEntry
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+
+# Model -> entity type in the feed
+SYNCED = {
+    Expense: "expense",
+    Income: "income",
+    Investment: "investment",
+    TaxDeduction: "tax_deduction",
+    InsurancePolicy: "insurance_policy",
+    Asset: "asset",
+}
+MODELS = {entity_type: model for model, entity_type in SYNCED.items()}
+
+# Implied by the feed (user_id) or too large to sync (legacy base64 payloads)
+OMITTED_COLUMNS = ("user_id", "file_data")
+
+# First key of the per-user advisory locks that order change log writers on PostgreSQL
+CHANGE_LOG_LOCK = 0x73796e63
+
+Change = Tuple[str, str, str, bool]  # (user_id, entity_type, entity_id, deleted)
+
+def record_changes(connection, changes: Iterable[Change]) -> None:
+    """Make each change the latest log entry of its entity."""
+    latest: Dict[Tuple[str, str], Change] = {}
+    for change in changes:
+        latest[(change[1], change[2])] = change
+    if not latest:
+        return
+
+    if connection.dialect.name == "postgresql":
+        # Locks are taken in a fixed order so writers touching several users cannot deadlock
+        for user_id in sorted({change[0] for change in latest.values()}):
+            connection.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK, func.hashtext(user_id))))
+    by_type: Dict[str, List[str]] = {}
+    for entity_type, entity_id in latest:
+        by_type.setdefault(entity_type, []).append(entity_id)
+    for entity_type, entity_ids in by_type.items():
+        connection.execute(delete(ChangeLogEntry).where(
+            ChangeLogEntry.entity_type == entity_type, ChangeLogEntry.entity_id.in_(entity_ids)
+        ))
+    connection.execute(insert(ChangeLogEntry), [
+        {"user_id": user_id, "entity_type": entity_type, "entity_id": entity_id, "deleted": deleted}
+        for user_id, entity_type, entity_id, deleted in latest.values()
+    ])
+
+def _deduction_owners(connection, deduction_ids) -> Dict[str, str]:
+    if not deduction_ids:
+        return {}
+    return dict(connection.execute(
+        select(TaxDeduction.id, TaxDeduction.user_id).where(TaxDeduction.id.in_(deduction_ids))
+    ).all())
+
+@event.listens_for(Session, "after_flush")
+def _track_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted still show the pre-flush state here
+    changes = [(obj.user_id, SYNCED[type(obj)], obj.id, False) for obj in session.new if type(obj) in SYNCED]
+    changes.extend(
+        (obj.user_id, SYNCED[type(obj)], obj.id, False) for obj in session.dirty
+        if type(obj) in SYNCED and session.is_modified(obj, include_collections=False)
+    )
+    changes.extend((obj.user_id, SYNCED[type(obj)], obj.id, True) for obj in session.deleted if type(obj) in SYNCED)
+
+    # Attachments are synced as part of their deduction
+    logged = {entity_id for _, entity_type, entity_id, _ in changes if entity_type == "tax_deduction"}
+    deduction_ids = {
+        obj.tax_deduction_id for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, DocumentAttachment) and obj.tax_deduction_id not in logged
+    }
+    if not changes and not deduction_ids:
+        return
+
+    connection = session.connection()
+    # Deductions deleted in this flush are gone from the owner lookup, so only live ones are logged
+    changes.extend(
+        (user_id, "tax_deduction", deduction_id, False)
+        for deduction_id, user_id in _deduction_owners(connection, deduction_ids).items()
+    )
+    record_changes(connection, changes)
+
+def encode_token(seq: int, as_of: datetime) -> str:
+    """Sync token for entries after `seq`; `as_of` is when the client's view was current."""
+    return encode_cursor(as_of, str(seq))
+
+def decode_token(token: str) -> Tuple[int, datetime]:
+    """The seq and as_of of a sync token; 410 if tombstones the client still needs may have been pruned."""
+    as_of, seq = decode_cursor(token)
+    if not seq.isdigit():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    if as_of < datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without `since`"
+        )
+    return int(seq), as_of
+
+def _columns(model):
+    return [column for column in model.__table__.columns if column.key not in OMITTED_COLUMNS]
+
+def _compact(row) -> Dict[str, Any]:
+    # Rows are complete, so a missing field means null
+    return {key: value for key, value in row.items() if value is not None}
+
+async def _load_rows(db: AsyncSession, user_id: str, entity_type: str, entity_ids: List[str]) -> List[Dict[str, Any]]:
+    model = MODELS[entity_type]
+    result = await db.execute(
+        select(*_columns(model)).where(model.id.in_(entity_ids), model.user_id == user_id)
+    )
+    rows = [_compact(row) for row in result.mappings()]
+    if model is TaxDeduction and rows:
+        attachments: Dict[str, List[Dict[str, Any]]] = {}
+        result = await db.execute(
+            select(*_columns(DocumentAttachment)).where(DocumentAttachment.tax_deduction_id.in_(entity_ids))
+        )
+        for attachment in result.mappings():
+            attachments.setdefault(attachment["tax_deduction_id"], []).append(_compact(attachment))
+        for row in rows:
+            row["attachments"] = attachments.get(row["id"], [])
+    return rows
+
+async def change_batch(db: AsyncSession, user_id: str, since: Optional[str], limit: int) -> Dict[str, Any]:
+    """The next `limit` changes of a user's data after a sync token (or every live row without one)."""
+    started_at = datetime.now(timezone.utc)
+    after, as_of = decode_token(since) if since else (0, started_at)
+    query = select(ChangeLogEntry).where(ChangeLogEntry.user_id == user_id, ChangeLogEntry.seq > after)
+    if not since:
+        query = query.where(ChangeLogEntry.deleted.is_(False))
+    entries = (await db.execute(query.order_by(ChangeLogEntry.seq).limit(limit))).scalars().all()
+
+    upserts: Dict[str, List[str]] = {}
+    deleted: Dict[str, List[str]] = {}
+    for entry in entries:
+        (deleted if entry.deleted else upserts).setdefault(entry.entity_type, []).append(entry.entity_id)
+    changes = {}
+    for entity_type, entity_ids in upserts.items():
+        changes[entity_type] = await _load_rows(db, user_id, entity_type, entity_ids)
+
+    has_more = len(entries) == limit
+    # Until the client has caught up, its view is as old as when this sync (full or delta) began;
+    # the changed_at of the rows read says nothing about that
+    token = encode_token(entries[-1].seq if entries else after, as_of if has_more else started_at)
+    return {"changes": changes, "deleted": deleted, "token": token, "has_more": has_more}
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """Log every synced row that has no log entry yet, e.g. rows written before the feed existed."""
+    logged = 0
+    for model, entity_type in SYNCED.items():
+        missing = select(model.user_id, literal(entity_type), model.id, literal(False)).where(~exists().where(
+            ChangeLogEntry.entity_type == entity_type, ChangeLogEntry.entity_id == model.id
+        ))
+        while True:
+            rows = db.execute(missing.limit(batch_size)).all()
+            if not rows:
+                break
+            record_changes(db.connection(), rows)
+            db.commit()
+            logged += len(rows)
+    return logged
+
+def prune_tombstones(db: Session, retention: Optional[timedelta] = None) -> int:
+    """Delete tombstones older than the retention; tokens that old are refused with 410."""
+    retention = retention or timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.execute(delete(ChangeLogEntry).where(
+        ChangeLogEntry.deleted.is_(True), ChangeLogEntry.changed_at < datetime.now(timezone.utc) - retention
+    ))
+    db.commit()
+    return result.rowcount
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Sync change log maintenance")
+    parser.add_argument("command", choices=["backfill", "prune"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            print(f"Logged {backfill(db)} rows")
+        else:
+            print(f"Pruned {prune_tombstones(db)} tombstones")
+    finally:
+        db.close()
@@ -0,0 +1,250 @@
+"""Streaming document uploads with incremental validation and off-loop thumbnailing.
+
+The `file` part of a multipart/form-data body is parsed as it arrives and
+piped straight into the blob store: the store's `put` runs on a worker
+thread and pulls one chunk at a time from the event loop, so neither the
+request body nor the file is ever held in memory. The file type is taken
+from its leading magic bytes (the declared Content-Type is ignored) and
+checked against ALLOWED_FILE_TYPES, and the size against MAX_FILE_SIZE,
+while the bytes stream in; a rejected upload leaves nothing behind. Every
+ZIP starts with the same bytes, so a ZIP only counts as a .docx if its
+entry names (stored uncompressed) include word/document.xml, which is
+only known once the whole file has been read.
+
+Images then get a thumbnail and a larger preview, rendered by Pillow on a
+process pool and stored as blobs of their own (Blob.thumbnail_sha256 and
+Blob.preview_sha256), so document lists can show them instead of the
+originals.
+"""
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request, status  # pyright: ignore[reportMissingImports]
+from multipart.multipart import MultipartParser, parse_options_header  # pyright: ignore[reportMissingImports]
+
+from app.core.config import settings
+from app.services.blob_store import get_blob_store
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# Entry name every .docx has; xlsx, jar and other ZIPs do not
+DOCX_ENTRY = b"word/document.xml"
+
+# Leading bytes of every allowed file type
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),  # OLE2 compound file
+    (b"PK\x03\x04", DOCX_TYPE),  # ZIP container; see DOCX_ENTRY
+]
+SNIFF_BYTES = max(len(signature) for signature, _ in SIGNATURES)
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif")
+
+# Allowance for boundaries and part headers when checking Content-Length up front
+MULTIPART_OVERHEAD = 16 * 1024
+
+def sniff(head: bytes) -> Optional[str]:
+    """The file type its first bytes identify, or None."""
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+class MultipartUpload:
+    """Pull-based reader of the `file` part of a streamed multipart/form-data request."""
+
+    def __init__(self, request: Request, max_size: int = settings.MAX_FILE_SIZE,
+                 allowed_types: List[str] = settings.ALLOWED_FILE_TYPES, field: str = "file"):
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Upload the file as multipart/form-data"
+            )
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > max_size + MULTIPART_OVERHEAD:
+            raise self._too_large(max_size)
+
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.field = field
+        self.file_name: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+
+        self._docx_entry_seen = False
+        self._tail = b""  # End of the previous chunk, for an entry name split across chunks
+        self._body = request.stream().__aiter__()
+        self._pending: List[bytes] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._in_file = False
+        self._file_done = False
+        self._parser = MultipartParser(options[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._add_header(field=data[start:end]),
+            "on_header_value": lambda data, start, end: self._add_header(value=data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    @staticmethod
+    def _too_large(max_size: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File is larger than {max_size} bytes"
+        )
+
+    def _unsupported(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported file type; allowed: {', '.join(self.allowed_types)}"
+        )
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _add_header(self, field: bytes = b"", value: bytes = b"") -> None:
+        self._header_field += field
+        self._header_value += value
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.file_name is None and options.get(b"name") == self.field.encode() and b"filename" in options:
+            self._in_file = True
+            self.file_name = options[b"filename"].decode("utf-8", errors="replace") or "upload"
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        # Other form fields are skipped
+        if self._in_file:
+            self._pending.append(bytes(data[start:end]))
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def read_chunk(self) -> Optional[bytes]:
+        """The next validated bytes of the file, or None once it has been read completely."""
+        # Hold back the first bytes until there are enough to recognise the type
+        needed = 1 if self.content_type else SNIFF_BYTES
+        while sum(len(data) for data in self._pending) < needed and not self._file_done:
+            try:
+                chunk = await self._body.__anext__()
+            except StopAsyncIteration:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Missing or truncated '{self.field}' file part"
+                )
+            self._parser.write(chunk)
+
+        data = b"".join(self._pending)
+        self._pending.clear()
+        if not data:
+            if self.size == 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The file is empty")
+            if self.content_type == DOCX_TYPE and not self._docx_entry_seen:
+                raise self._unsupported()
+            return None
+
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise self._too_large(self.max_size)
+        if self.content_type is None:
+            self.content_type = sniff(data)
+            if self.content_type not in self.allowed_types:
+                raise self._unsupported()
+        if self.content_type == DOCX_TYPE and not self._docx_entry_seen:
+            window = self._tail + data
+            self._docx_entry_seen = DOCX_ENTRY in window
+            self._tail = window[-(len(DOCX_ENTRY) - 1):]
+        return data
+
+    def chunks(self):
+        """Iterate the file from a worker thread, pulling each chunk from the event loop."""
+        while True:
+            data = anyio.from_thread.run(self.read_chunk)
+            if data is None:
+                return
+            yield data
+
+def _to_rgb(image):
+    from PIL import Image  # pyright: ignore[reportMissingImports]
+
+    if image.mode in ("RGB", "L"):
+        return image
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+def render_images(digest: str, sizes: Dict[str, int], max_pixels: int) -> Dict[str, Tuple[str, int]]:
+    """Store downscaled JPEG copies of an image blob; runs in a worker process.
+
+    Returns {name: (digest, size)} for each entry of `sizes` (name -> longest side).
+    """
+    from PIL import Image, ImageOps  # pyright: ignore[reportMissingImports]
+
+    Image.MAX_IMAGE_PIXELS = max_pixels  # Pillow refuses images over twice this size
+    store = get_blob_store()
+    source = io.BytesIO(b"".join(store.open(digest)))
+    rendered = {}
+    with Image.open(source) as image:
+        if image.width * image.height > max_pixels:
+            return rendered
+        largest = max(sizes.values())
+        image.draft("RGB", (largest, largest))  # JPEG decodes straight at a reduced scale
+        image = _to_rgb(ImageOps.exif_transpose(image))
+        # Largest first, so each smaller copy is resized from the previous one
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            image.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=80, optimize=True, progressive=True)
+            stored = store.put([output.getvalue()])
+            rendered[name] = (stored.digest, stored.size)
+    return rendered
+
+class ThumbnailRenderer:
+    """Renders image thumbnails on a lazily started process pool."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the API process runs threads that must not be copied mid-lock
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def render(self, digest: str) -> Dict[str, Tuple[str, int]]:
+        """Thumbnail and preview of an image blob; empty if the image cannot be decoded."""
+        sizes = {"thumbnail": settings.THUMBNAIL_SIZE, "preview": settings.PREVIEW_SIZE}
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), render_images, digest, sizes, settings.THUMBNAIL_MAX_PIXELS
+            )
+        except Exception as e:
+            print(f"Thumbnail rendering failed for {digest}: {e}")
+            return {}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+thumbnail_renderer = ThumbnailRenderer(settings.THUMBNAIL_WORKERS)
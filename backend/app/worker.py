@@ -0,0 +1,42 @@
+"""Standalone worker for the recurring expense and premium scheduler.
+
+    python -m app.worker            # poll every SCHEDULER_INTERVAL_SECONDS
+    python -m app.worker --once     # post everything due now and exit
+    python -m app.worker --exports  # also run export jobs (see app.services.exports)
+
+Any number of workers (and API processes with SCHEDULER_ENABLED) can run
+side by side; claims keep them from posting the same item twice, or
+running the same export twice.
+"""
+import argparse
+import asyncio
+
+import app.models  # noqa: F401
+from app.database import AsyncSessionLocal, async_engine
+from app.services import income_summary  # noqa: F401  (registers the Income flush listener)
+from app.services import scheduler
+from app.services.exports import export_runner
+
+async def main(once: bool, exports: bool) -> None:
+    try:
+        if once:
+            totals = await scheduler.run_once(AsyncSessionLocal)
+            print(f"Posted {totals['expenses']} recurring expenses and {totals['premiums']} premiums")
+            if exports:
+                print(f"Ran {await export_runner.run_pending(AsyncSessionLocal)} export jobs")
+        elif exports:
+            await asyncio.gather(
+                scheduler.run_forever(AsyncSessionLocal), export_runner.run_forever(AsyncSessionLocal)
+            )
+        else:
+            await scheduler.run_forever(AsyncSessionLocal)
+    finally:
+        export_runner.shutdown()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recurring expense and premium scheduler")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    parser.add_argument("--exports", action="store_true", help="Also run pending export jobs")
+    args = parser.parse_args()
+    asyncio.run(main(args.once, args.exports))
@@ -0,0 +1,36 @@
+"""Compare two benchmark result files, e.g. before and after a commit.
+
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import argparse
+import json
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['commit']} -> {candidate['commit']}")
+    print(f"{'request':24} {'throughput':>18} {'p50':>18} {'p95':>18} {'p99':>18}")
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:24} (new)")
+            continue
+        columns = [_change(old["throughput_rps"], new["throughput_rps"])]
+        columns += [_change(old["latency_ms"][p], new["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        print(f"{name:24} " + " ".join(f"{column:>18}" for column in columns))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Drive the API in-process at a fixed concurrency and record latency percentiles.
+
+Requests go through httpx's ASGI transport straight into the app, so the
+numbers cover routing, validation, serialization and the database, but not
+the network or a server like uvicorn. Client and app share one event loop,
+which also means concurrency here is cooperative: it exposes contention on
+the connection pool, the password hashing pool and the database, not
+multi-core scaling.
+
+Each scenario runs `--requests` iterations spread over `--concurrency`
+workers, rotating through the seeded users. Results (p50/p95/p99 latency,
+throughput, errors per request type) are printed and written as JSON to
+`--output`, named after the commit, for `python -m benchmarks.compare`.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.run --concurrency 16 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+from benchmarks.seed import PASSWORD, user_email
+
+class Recorder:
+    """Latency and status of every request, keyed by request name."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+class User:
+    def __init__(self, email: str):
+        self.email = email
+        self.headers: Dict[str, str] = {}
+        self.sync_token: Optional[str] = None
+
+Scenario = Callable[[httpx.AsyncClient, Recorder, User, int], Awaitable[None]]
+
+async def login(client, recorder, user, i):
+    await recorder.request(client, "login", "POST", "/api/auth/login",
+                           json={"email": user.email, "password": PASSWORD})
+
+async def me(client, recorder, user, i):
+    await recorder.request(client, "me", "GET", "/api/auth/me", headers=user.headers)
+
+async def tax_deductions_list(client, recorder, user, i):
+    await recorder.request(client, "tax_deductions_list", "GET", "/api/tax-deductions/",
+                           params={"limit": 100}, headers=user.headers)
+
+async def tax_deductions_crud(client, recorder, user, i):
+    created = await recorder.request(client, "tax_deductions_create", "POST", "/api/tax-deductions/", json={
+        "year": 2024, "deduction_type": "80C", "amount": 150_000 + i, "description": f"Benchmark {i}",
+    }, headers=user.headers)
+    if created.status_code != 200:
+        return
+    url = f"/api/tax-deductions/{created.json()['id']}"
+    await recorder.request(client, "tax_deductions_get", "GET", url, headers=user.headers)
+    await recorder.request(client, "tax_deductions_update", "PUT", url, json={"amount": 200_000 + i},
+                           headers=user.headers)
+    await recorder.request(client, "tax_deductions_delete", "DELETE", url, headers=user.headers)
+
+async def income_list(client, recorder, user, i):
+    await recorder.request(client, "income_list", "GET", "/api/income/", headers=user.headers)
+
+async def income_summary(client, recorder, user, i):
+    await recorder.request(client, "income_summary", "GET", "/api/income/summary", headers=user.headers)
+
+async def reports(client, recorder, user, i):
+    await recorder.request(client, "reports", "GET", "/api/reports/",
+                           params=[("domain", "expense"), ("group_by", "month"), ("group_by", "category")], headers=user.headers)
+
+async def portfolio_valuation(client, recorder, user, i):
+    await recorder.request(client, "portfolio_valuation", "GET", "/api/investments/valuation", headers=user.headers)
+
+async def search(client, recorder, user, i):
+    await recorder.request(client, "search", "GET", "/api/search/", params={"q": "groc"}, headers=user.headers)
+
+async def sync_full(client, recorder, user, i):
+    await recorder.request(client, "sync_full", "GET", "/api/sync/", params={"limit": 1000}, headers=user.headers)
+
+async def sync_delta(client, recorder, user, i):
+    # A returning client: caught up once (unrecorded), then only asks for what changed since
+    if user.sync_token is None:
+        params = {"limit": 1000}
+        while True:
+            batch = (await client.get("/api/sync/", params=params, headers=user.headers)).json()
+            params["since"] = batch["token"]
+            if not batch["has_more"]:
+                break
+        user.sync_token = batch["token"]
+    await recorder.request(client, "sync_delta", "GET", "/api/sync/", params={"since": user.sync_token},
+                           headers=user.headers)
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "me": me,
+    "tax_deductions_list": tax_deductions_list,
+    "tax_deductions_crud": tax_deductions_crud,
+    "income_list": income_list,
+    "income_summary": income_summary,
+    "reports": reports,
+    "portfolio_valuation": portfolio_valuation,
+    "search": search,
+    "sync_full": sync_full,
+    "sync_delta": sync_delta,
+}
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, users: List[User],
+                       requests: int, concurrency: int) -> Dict:
+    recorder = Recorder()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            await scenario(client, recorder, users[i % len(users)], i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name, latencies in recorder.latencies.items():
+        ms = np.array(latencies) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        results[name] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[name],
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "latency_ms": {
+                "p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+                "mean": round(float(ms.mean()), 3), "max": round(float(ms.max()), 3),
+            },
+        }
+    return results
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def main_async(args) -> Dict:
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            users = [User(user_email(i)) for i in range(args.users)]
+            for user in users:
+                response = await client.post("/api/auth/login", json={"email": user.email, "password": PASSWORD})
+                if response.status_code != 200:
+                    raise SystemExit(f"Login failed for {user.email}; run `python -m benchmarks.seed` first")
+                user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            results = {}
+            for name in args.scenario or list(SCENARIOS):
+                # Warm caches and connections so the first requests do not skew the tail
+                await run_scenario(client, SCENARIOS[name], users, min(args.warmup, args.requests), args.concurrency)
+                scenario_results = await run_scenario(client, SCENARIOS[name], users, args.requests, args.concurrency)
+                results.update(scenario_results)
+                for request_name, stats in scenario_results.items():
+                    latency = stats["latency_ms"]
+                    print(f"{request_name:24} {stats['throughput_rps']:9.1f} req/s  p50 {latency['p50']:8.2f} ms  "
+                          f"p95 {latency['p95']:8.2f} ms  p99 {latency['p99']:8.2f} ms  errors {stats['errors']}")
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process API load test")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--users", type=int, default=2, help="Seeded users to rotate through")
+    parser.add_argument("--requests", type=int, default=200, help="Iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded iterations before each scenario")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": settings.DATABASE_URL.split("://", 1)[0],
+        "config": {
+            "users": args.users, "requests": args.requests, "concurrency": args.concurrency,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS, "response_cache": settings.RESPONSE_CACHE_BACKEND,
+        },
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{commit}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Seed benchmark users with realistic data volumes.
+
+Rows go in with Core bulk inserts (no ORM events), then the income
+summaries, report rollups and search index are rebuilt for each user and the sync
+change log is backfilled. Data is generated
+from a fixed random seed, so every run seeds the same rows.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --users 2 --expenses 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.models.expense import Expense
+from app.models.income import Income, IncomeSource, IncomeSourceType
+from app.models.insurance import InsurancePolicy, InsurancePolicyType, PremiumFrequency
+from app.models.investment import (
+    Investment, InvestmentAsset, InvestmentAssetType, InvestmentTransaction, InvestmentType, RiskLevel,
+)
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.models.user import User
+from app.services.income_summary import rebuild_summaries
+from app.services.reports import rebuild_rollups
+from app.services.search import rebuild_index
+from app.services.sync import backfill
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 5000
+EXPENSE_CATEGORIES = [
+    "Food", "Groceries", "Rent", "Utilities", "Transport", "Fuel", "Shopping",
+    "Entertainment", "Health", "Education", "Travel", "Insurance", "Subscriptions",
+]
+DEDUCTION_TYPES = ["80C", "80D", "80E", "80G", "24b", "HRA"]
+HISTORY_DAYS = 5 * 365
+
+def user_id(index: int) -> str:
+    return f"bench-user-{index}"
+
+def user_email(index: int) -> str:
+    return f"bench-user-{index}@example.com"
+
+def _insert(connection, model, rows: List[Dict]) -> None:
+    for offset in range(0, len(rows), BATCH_SIZE):
+        connection.execute(insert(model), rows[offset:offset + BATCH_SIZE])
+
+def _day(rng: random.Random, end: datetime) -> datetime:
+    return end - timedelta(days=rng.randrange(HISTORY_DAYS), seconds=rng.randrange(86400))
+
+def seed_user(connection, index: int, hashed_password: str, counts: Dict[str, int], rng: random.Random) -> None:
+    uid = user_id(index)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    connection.execute(insert(User).values(id=uid, email=user_email(index), hashed_password=hashed_password))
+
+    _insert(connection, Expense, [{
+        "id": f"{uid}-expense-{i}", "user_id": uid, "amount": rng.randrange(50, 500_000),
+        "description": f"Expense {i}", "category": rng.choice(EXPENSE_CATEGORIES), "date": _day(rng, now),
+        "is_recurring": False,
+    } for i in range(counts["expenses"])])
+
+    deductions, attachments = [], []
+    for i in range(counts["tax_deductions"]):
+        created_at = now - timedelta(minutes=i)
+        deductions.append({
+            "id": f"{uid}-deduction-{i}", "user_id": uid, "year": created_at.year - rng.randrange(3),
+            "deduction_type": rng.choice(DEDUCTION_TYPES), "amount": rng.randrange(1000, 15_000_000),
+            "description": f"Deduction {i}", "created_at": created_at,
+        })
+        attachments.extend({
+            "id": f"{uid}-attachment-{i}-{j}", "tax_deduction_id": f"{uid}-deduction-{i}",
+            "file_name": f"receipt-{i}-{j}.pdf", "file_type": "application/pdf",
+            "file_size": rng.randrange(10_000, 2_000_000), "document_type": "receipt",
+        } for j in range(rng.randrange(3)))
+    _insert(connection, TaxDeduction, deductions)
+    _insert(connection, DocumentAttachment, attachments)
+
+    assets = [{
+        "id": f"{uid}-asset-{i}", "user_id": uid, "name": f"Fund {i}", "type": InvestmentAssetType.MUTUAL_FUND,
+        "current_price": rng.randrange(1000, 50_000), "risk_level": RiskLevel.MODERATE,
+        "scheme_code": str(100000 + i),
+    } for i in range(counts["assets"])]
+    investments = [{
+        "id": f"{uid}-investment-{i}", "user_id": uid, "asset_id": assets[i % len(assets)]["id"],
+        "investment_type": InvestmentType.SIP, "amount": 500_000, "units": 100.0, "purchase_price": 5000,
+        "purchase_date": now - timedelta(days=HISTORY_DAYS),
+    } for i in range(counts["investments"])]
+    transactions = []
+    for i in range(counts["investment_transactions"]):
+        units = round(rng.uniform(1, 50), 3)
+        price = rng.randrange(1000, 50_000)
+        transactions.append({
+            "id": f"{uid}-transaction-{i}", "user_id": uid, "investment_id": investments[i % len(investments)]["id"],
+            "transaction_type": "sell" if rng.random() < 0.1 else "buy", "amount": round(units * price),
+            "units": units, "price_per_unit": price, "date": _day(rng, now),
+        })
+    _insert(connection, InvestmentAsset, assets)
+    _insert(connection, Investment, investments)
+    _insert(connection, InvestmentTransaction, transactions)
+
+    sources = [
+        {"id": f"{uid}-source-{i}", "user_id": uid, "name": name, "type": kind, "is_active": True}
+        for i, (name, kind) in enumerate([("Salary", IncomeSourceType.SALARY), ("Rent", IncomeSourceType.RENTAL)])
+    ]
+    incomes = []
+    for i in range(counts["income_months"]):
+        year, month = divmod(now.year * 12 + now.month - 1 - i, 12)
+        month_start = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+        for source in sources:
+            gross = rng.randrange(5_000_000, 20_000_000)
+            incomes.append({
+                "id": f"{uid}-income-{i}-{source['id']}", "user_id": uid, "income_source_id": source["id"],
+                "amount": gross, "gross_amount": gross, "net_amount": round(gross * 0.8),
+                "date": month_start, "month": month_start.month, "year": month_start.year,
+            })
+    _insert(connection, IncomeSource, sources)
+    _insert(connection, Income, incomes)
+
+    _insert(connection, InsurancePolicy, [{
+        "id": f"{uid}-policy-{i}", "user_id": uid, "policy_number": f"POL{index:03d}{i:04d}",
+        "policy_type": rng.choice(list(InsurancePolicyType)), "insurance_company": "Benchmark Insurance",
+        "premium_amount": rng.randrange(500_000, 10_000_000), "premium_frequency": PremiumFrequency.YEARLY,
+        "start_date": now - timedelta(days=HISTORY_DAYS), "next_premium_date": now + timedelta(days=rng.randrange(365)),
+        "is_active": True,
+    } for i in range(counts["policies"])])
+
+def seed(users: int, counts: Dict[str, int], random_seed: int = 42) -> List[str]:
+    """Create the benchmark users that do not exist yet; returns the ids created."""
+    Base.metadata.create_all(engine)
+    hashed_password = get_password_hash(PASSWORD)
+    created = []
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(select(User.id).where(User.id.in_([user_id(i) for i in range(users)]))))
+        for index in range(users):
+            if user_id(index) in existing:
+                continue
+            started = time.perf_counter()
+            seed_user(db.connection(), index, hashed_password, counts, random.Random(random_seed + index))
+            db.commit()
+            rebuild_summaries(db, user_id(index))
+            rebuild_rollups(db, user_id(index))
+            rebuild_index(db, user_id(index))
+            created.append(user_id(index))
+            print(f"Seeded {user_id(index)} in {time.perf_counter() - started:.1f}s")
+        if created:
+            backfill(db)
+    finally:
+        db.close()
+    return created
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed benchmark users")
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--expenses", type=int, default=50_000)
+    parser.add_argument("--investment-transactions", type=int, default=5_000)
+    parser.add_argument("--tax-deductions", type=int, default=1_000)
+    parser.add_argument("--income-months", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts = {
+        "expenses": args.expenses,
+        "investment_transactions": args.investment_transactions,
+        "tax_deductions": args.tax_deductions,
+        "income_months": args.income_months,
+        "assets": 20,
+        "investments": 50,
+        "policies": 10,
+    }
+    print(f"Seeding {args.users} users into {settings.DATABASE_URL}")
+    seed(args.users, counts, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Cold-start benchmark: import, startup and first-request latency per startup mode.
+
+Every sample is a fresh interpreter, so module caches are cold the way they
+are on a new serverless instance (the OS file cache is not). Modes:
+
+    eager  STARTUP_MODE=create_all, routers imported with app.main
+    lazy   STARTUP_MODE=migrations, LAZY_ROUTERS=true
+
+Without DATABASE_URL a scratch SQLite database is migrated to head first.
+
+    python -m benchmarks.startup --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.run import _git_commit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "eager": {"STARTUP_MODE": "create_all", "LAZY_ROUTERS": "false"},
+    "lazy": {"STARTUP_MODE": "migrations", "LAZY_ROUTERS": "true"},
+}
+
+# Runs in each child interpreter and prints its timings as JSON
+CHILD = r"""
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+import httpx
+from app.core.security import create_access_token
+
+async def main():
+    result = {"import_s": imported - started}
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "startup-benchmark"})}
+    began = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["startup_s"] = time.perf_counter() - began
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            for key in ("first_request_s", "second_request_s"):
+                began = time.perf_counter()
+                response = await client.get("/api/tax-deductions/", headers=headers)
+                result[key] = time.perf_counter() - began
+                result["status"] = response.status_code
+    print(json.dumps(result))
+
+asyncio.run(main())
+"""
+
+def sample(env) -> dict:
+    began = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - began
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per mode")
+    parser.add_argument("--mode", action="append", choices=list(MODES))
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results"))
+    args = parser.parse_args()
+
+    env = dict(os.environ, SCHEME_INDEX_REFRESH_SECONDS=os.environ.get("SCHEME_INDEX_REFRESH_SECONDS", "0"))
+    if "DATABASE_URL" not in os.environ:
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='startup-'), 'startup.db')}"
+        subprocess.run(["alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+    results = {}
+    for mode in args.mode or list(MODES):
+        samples = [sample({**env, **MODES[mode]}) for _ in range(args.repeat)]
+        results[mode] = {
+            key: round(statistics.median(s[key] for s in samples) * 1000, 1)
+            for key in ("process_s", "import_s", "startup_s", "first_request_s", "second_request_s")
+        }
+        results[mode]["status"] = samples[-1]["status"]
+        timings = results[mode]
+        print(f"{mode:6} process {timings['process_s']:7.1f} ms  import {timings['import_s']:7.1f} ms  "
+              f"startup {timings['startup_s']:6.1f} ms  first request {timings['first_request_s']:6.1f} ms  "
+              f"second {timings['second_request_s']:5.1f} ms")
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "database": env["DATABASE_URL"].split("://", 1)[0],
+        "repeat": args.repeat,
+        "median_ms": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{commit}-startup.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Shared fixtures: a throwaway SQLite database, blob store and NAV store for the test session.
+
+The settings are read when app.core.config is first imported, so the
+environment is set up here before anything from the app is imported.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+
+_workdir = tempfile.mkdtemp(prefix="budgetapp-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    "RESPONSE_CACHE_BACKEND": "none",
+    "SCHEME_INDEX_REFRESH_SECONDS": "0",
+    "SCHEME_SNAPSHOT_PATH": os.path.join(_workdir, "schemes.json"),
+    "NAV_STORE_DIR": os.path.join(_workdir, "nav"),
+    "NAV_FEED_BACKEND": "fixture",
+    "NAV_FIXTURE_DIR": os.path.join(_workdir, "nav_fixtures"),
+    "BLOB_STORE_DIR": os.path.join(_workdir, "blobs"),
+    "EXPORT_WORKER_ENABLED": "false",
+    "SCHEDULER_ENABLED": "false",
+})
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def client():
+    # Not entered as a context manager, so the lifespan's background loops never start
+    return TestClient(app, raise_server_exceptions=False)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def user_id(db) -> str:
+    """A new user, so tests sharing the session database never see each other's rows."""
+    user = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+@pytest.fixture
+def auth_headers(user_id) -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": user_id})}
@@ -0,0 +1,92 @@
+import base64
+import binascii
+import hashlib
+import os
+import uuid
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.models.user import User
+from app.services.blob_store import get_blob_store, iter_base64_chunks, migrate_legacy_documents
+
+PDF = b"%PDF-1.4\n" + os.urandom(5000)
+
+def _decode(data: str, chunk_size: int = 30) -> bytes:
+    return b"".join(iter_base64_chunks(data, chunk_size))
+
+@pytest.mark.parametrize("separator", ["\n", "\r\n", "\t", " "])
+def test_wrapped_base64_decodes_whole(separator):
+    encoded = base64.b64encode(PDF).decode()
+    wrapped = separator.join(encoded[i:i + 57] for i in range(0, len(encoded), 57))
+    assert _decode(wrapped) == PDF
+    assert _decode("data:application/pdf;base64," + wrapped) == PDF
+
+@pytest.mark.parametrize("corrupt", [
+    lambda encoded: encoded[:100] + "!" + encoded[100:],  # Not in the alphabet
+    lambda encoded: encoded[:-1],  # Truncated
+])
+def test_invalid_base64_is_refused(corrupt):
+    with pytest.raises(binascii.Error):
+        _decode(corrupt(base64.b64encode(PDF).decode()))
+
+def _attachment(**fields) -> dict:
+    return {"file_name": "receipt.pdf", "file_type": "application/pdf", "file_size": 0, "document_type": "receipt",
+            **fields}
+
+def _create_deduction(client, headers, **attachment):
+    return client.post("/api/tax-deductions/", headers=headers, json={
+        "year": 2024, "deduction_type": "80C", "amount": 1000, "attachments": [_attachment(**attachment)],
+    })
+
+def test_invalid_base64_upload_is_a_bad_request(client, auth_headers):
+    encoded = base64.b64encode(PDF).decode()
+    response = _create_deduction(client, auth_headers, file_data=encoded[:100] + "\x00" + encoded[100:])
+    assert response.status_code == 400
+
+    response = _create_deduction(client, auth_headers, file_data=encoded)
+    assert response.status_code == 200
+    assert response.json()["attachments"][0]["content_hash"] == hashlib.sha256(PDF).hexdigest()
+
+@pytest.fixture
+def other_headers(db) -> dict:
+    other = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+    return {"Authorization": "Bearer " + create_access_token({"sub": other.id})}
+
+def test_content_hashes_belong_to_their_uploader(client, auth_headers, other_headers):
+    data = b"%PDF-1.4\n" + os.urandom(2000)
+    upload = client.post("/api/documents/upload", headers=auth_headers,
+                         files={"file": ("receipt.pdf", data, "application/pdf")})
+    digest = upload.json()["content_hash"]
+
+    # Someone else knowing the hash cannot attach it, and gets the same answer as for an unknown hash
+    stolen = _create_deduction(client, other_headers, content_hash=digest)
+    unknown = _create_deduction(client, other_headers, content_hash=hashlib.sha256(b"nothing").hexdigest())
+    assert stolen.status_code == unknown.status_code == 400
+
+    created = _create_deduction(client, auth_headers, content_hash=digest)
+    assert created.status_code == 200
+    url = f"/api/documents/tax-deduction/{created.json()['attachments'][0]['id']}/download"
+    assert client.get(url, headers=auth_headers).content == data
+    assert client.get(url, headers=other_headers).status_code == 404
+
+def test_legacy_migration_skips_invalid_payloads(db, user_id):
+    valid, invalid = str(uuid.uuid4()), str(uuid.uuid4())
+    deduction = TaxDeduction(id=str(uuid.uuid4()), user_id=user_id, year=2024, deduction_type="80C", amount=1000)
+    deduction.attachments = [
+        DocumentAttachment(id=valid, file_name="a.pdf", file_type="application/pdf", file_size=0,
+                           document_type="receipt", file_data=base64.b64encode(PDF).decode()),
+        DocumentAttachment(id=invalid, file_name="b.pdf", file_type="application/pdf", file_size=0,
+                           document_type="receipt", file_data="not base64!"),
+    ]
+    db.add(deduction)
+    db.commit()
+
+    assert migrate_legacy_documents(db) >= 1
+    migrated, skipped = db.get(DocumentAttachment, valid), db.get(DocumentAttachment, invalid)
+    assert b"".join(get_blob_store().open(migrated.content_hash)) == PDF
+    assert migrated.file_data is None
+    assert skipped.content_hash is None and skipped.file_data == "not base64!"
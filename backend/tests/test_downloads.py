@@ -0,0 +1,80 @@
+import base64
+import os
+import uuid
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.services.blob_store import get_blob_store, register_blob_sync
+
+CONTENT = b"%PDF-1.4\n" + os.urandom(10_000)
+
+def _attach(db, user_id: str, **document) -> str:
+    deduction = TaxDeduction(id=str(uuid.uuid4()), user_id=user_id, year=2024, deduction_type="80C", amount=1000)
+    attachment = DocumentAttachment(
+        id=str(uuid.uuid4()), file_name="receipt.pdf", file_type="application/pdf", file_size=len(CONTENT),
+        document_type="receipt", **document,
+    )
+    deduction.attachments = [attachment]
+    db.add(deduction)
+    db.commit()
+    return f"/api/documents/tax-deduction/{attachment.id}/download"
+
+@pytest.fixture
+def url(db, user_id) -> str:
+    stored = get_blob_store().put([CONTENT])
+    register_blob_sync(db, stored, "application/pdf", user_id)
+    return _attach(db, user_id, content_hash=stored.digest)
+
+def test_full_download(client, auth_headers, url):
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["content-disposition"] == 'attachment; filename="receipt.pdf"'
+
+def test_head_sends_headers_only(client, auth_headers, url):
+    response = client.head(url, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(CONTENT))
+
+@pytest.mark.parametrize("header,start,end", [
+    ("bytes=100-", 100, len(CONTENT)),
+    ("bytes=0-9", 0, 10),
+    ("bytes=-50", len(CONTENT) - 50, len(CONTENT)),
+    ("bytes=9990-99999", 9990, len(CONTENT)),
+])
+def test_range_requests(client, auth_headers, url, header, start, end):
+    response = client.get(url, headers={**auth_headers, "Range": header})
+    assert response.status_code == 206
+    assert response.content == CONTENT[start:end]
+    assert response.headers["content-range"] == f"bytes {start}-{end - 1}/{len(CONTENT)}"
+
+def test_unsatisfiable_range(client, auth_headers, url):
+    response = client.get(url, headers={**auth_headers, "Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+def test_conditional_requests(client, auth_headers, url):
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    # A stale If-Range validator gets the whole file instead of a range of the wrong version
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": etag})
+    assert response.status_code == 206
+
+def test_other_users_cannot_download(client, url):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(uuid.uuid4())})}
+    assert client.get(url, headers=headers).status_code == 404
+
+def test_legacy_base64_download(client, db, auth_headers, user_id):
+    url = _attach(db, user_id, file_data=base64.b64encode(CONTENT).decode())
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[:100]
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.expense import Expense
+from app.models.report import ReportRollup
+from app.models.search import SearchDocument
+from app.models.sync import ChangeLogEntry
+from app.services import expense_import
+
+def _ndjson(n: int, **fields) -> bytes:
+    return b"".join(
+        json.dumps({"amount": 100, "description": f"Item {i}", "category": "Food", "date": "2024-01-15",
+                    **fields}).encode() + b"\n"
+        for i in range(n)
+    )
+
+def _chunks(body: bytes, size: int = 7000):
+    # Chunk boundaries fall inside lines, as they do on the wire
+    for offset in range(0, len(body), size):
+        yield body[offset:offset + size]
+
+def _import(client, headers, body: bytes, content_type: str = "application/x-ndjson"):
+    return client.post("/api/expenses/bulk", headers={**headers, "Content-Type": content_type},
+                       content=_chunks(body))
+
+def _count(db, column, *where) -> int:
+    return db.scalar(select(func.count(column)).where(*where))
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of the batches handed to insert_expenses."""
+    sizes = []
+    insert_expenses = expense_import.insert_expenses
+
+    async def spy(db, rows):
+        sizes.append(len(rows))
+        await insert_expenses(db, rows)
+
+    monkeypatch.setattr(expense_import, "insert_expenses", spy)
+    return sizes
+
+def test_rows_are_inserted_in_batches(client, auth_headers, db, user_id, batches):
+    body = _ndjson(1000) + b'{"amount": "lots", "description": "Bad", "category": "Food", "date": "2024-01-15"}\n'
+    body += b"not json\n" + _ndjson(1500)
+    response = _import(client, auth_headers, body)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (2500, 2)
+    assert [error["line"] for error in result["errors"]] == [1001, 1002]
+    assert batches == [1000, 1000, 500]
+    assert _count(db, Expense.id, Expense.user_id == user_id) == 2500
+
+def test_csv_with_quoted_multiline_fields(client, auth_headers, db, user_id):
+    body = (
+        b"\xef\xbb\xbfamount,description,category,date,notes\r\n"
+        b'2500,Groceries,Food,2024-01-15,"first line\r\nsecond line"\r\n'
+        b"1200,Bus pass,Transport,2024-02-01,\r\n"
+    )
+    response = _import(client, auth_headers, body, "text/csv")
+    assert response.json() == {"inserted": 2, "failed": 0, "errors": [], "errors_truncated": False}
+    notes = db.scalar(select(Expense.notes).where(Expense.user_id == user_id, Expense.description == "Groceries"))
+    assert notes == "first line\nsecond line"
+
+def test_failed_batch_rolls_back_the_whole_import(client, auth_headers, db, user_id, monkeypatch):
+    insert_expenses = expense_import.insert_expenses
+    calls = []
+
+    async def failing(db, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        await insert_expenses(db, rows)
+
+    monkeypatch.setattr(expense_import, "insert_expenses", failing)
+    response = _import(client, auth_headers, _ndjson(2500))
+    assert response.status_code == 500
+    assert calls == [1000, 1000]
+    # The first batch and everything derived from it went with the transaction
+    assert _count(db, Expense.id, Expense.user_id == user_id) == 0
+    assert _count(db, ReportRollup.id, ReportRollup.user_id == user_id) == 0
+    assert _count(db, SearchDocument.id, SearchDocument.user_id == user_id) == 0
+    assert _count(db, ChangeLogEntry.seq, ChangeLogEntry.user_id == user_id) == 0
+
+def test_bulk_rows_update_reports_search_and_sync(client, auth_headers, db, user_id):
+    body = _ndjson(3, category="Travel", date="2024-03-10") + _ndjson(2, description="Zanzibar ferry",
+                                                                          date="2024-04-02")
+    assert _import(client, auth_headers, body).json()["inserted"] == 5
+
+    cells = db.execute(
+        select(ReportRollup.year, ReportRollup.month, ReportRollup.category, ReportRollup.total, ReportRollup.count)
+        .where(ReportRollup.user_id == user_id, ReportRollup.domain == "expense")
+        .order_by(ReportRollup.month)
+    ).all()
+    assert [tuple(cell) for cell in cells] == [(2024, 3, "Travel", 300, 3), (2024, 4, "Food", 200, 2)]
+
+    ids = set(db.scalars(select(Expense.id).where(Expense.user_id == user_id)))
+    indexed = db.scalars(select(SearchDocument.entity_id).where(
+        SearchDocument.user_id == user_id, SearchDocument.entity_type == "expense"
+    ))
+    assert set(indexed) == ids
+    hits = client.get("/api/search/", headers=auth_headers, params={"q": "zanzi"}).json()
+    assert len(hits) == 2
+
+    logged = db.scalars(select(ChangeLogEntry.entity_id).where(ChangeLogEntry.user_id == user_id))
+    assert set(logged) == ids
+    synced = client.get("/api/sync/", headers=auth_headers).json()["changes"]["expense"]
+    assert {row["id"] for row in synced} == ids
@@ -0,0 +1,110 @@
+import io
+import json
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa  # pyright: ignore[reportMissingImports]
+import pyarrow.ipc  # pyright: ignore[reportMissingImports]  # noqa: F401
+import pyarrow.parquet  # pyright: ignore[reportMissingImports]  # noqa: F401
+import pytest
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.export import ExportJob
+from app.models.user import User
+from app.routers import exports as exports_router
+from app.services.blob_store import get_blob_store
+from app.services.exports import EXPORT_TABLES, build_archive, claim_job, run_next_job
+
+def _job(db, user_id: str, fmt: str = "parquet", **fields) -> ExportJob:
+    job = ExportJob(id=str(uuid.uuid4()), user_id=user_id, format=fmt, **fields)
+    db.add(job)
+    db.commit()
+    return job
+
+def test_exports_need_pyarrow(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(exports_router, "pyarrow_available", lambda: False)
+    response = client.post("/api/exports/", headers=auth_headers, json={"format": "parquet"})
+    assert response.status_code == 503
+
+def test_one_export_at_a_time(client, auth_headers):
+    first = client.post("/api/exports/", headers=auth_headers, json={"format": "arrow", "year": 2024})
+    assert first.status_code == 202, first.text
+    assert first.json()["status"] == "pending"
+    second = client.post("/api/exports/", headers=auth_headers, json={"format": "parquet"})
+    assert second.status_code == 409
+
+def test_unfinished_export_cannot_be_downloaded(client, auth_headers):
+    job_id = client.post("/api/exports/", headers=auth_headers, json={"format": "parquet"}).json()["id"]
+    assert client.get(f"/api/exports/{job_id}", headers=auth_headers).json()["status"] == "pending"
+    assert client.get(f"/api/exports/{job_id}/download", headers=auth_headers).status_code == 409
+
+def test_other_users_export_is_not_found(client, auth_headers, db):
+    other = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+    job = _job(db, other.id)
+    assert client.get(f"/api/exports/{job.id}", headers=auth_headers).status_code == 404
+    assert client.get(f"/api/exports/{job.id}/download", headers=auth_headers).status_code == 404
+
+def test_jobs_with_a_stale_heartbeat_are_claimed_again(db, user_id):
+    now = datetime.now(timezone.utc)
+    timeout = timedelta(minutes=settings.EXPORT_JOB_TIMEOUT_MINUTES)
+    # Started long ago, but its worker is still checking in
+    alive = _job(db, user_id, status="running", started_at=now - 3 * timeout, heartbeat_at=now)
+    stale = _job(db, user_id, status="running", started_at=now - 2 * timeout, heartbeat_at=now - 2 * timeout)
+
+    claimed = set()
+    while (job := claim_job(db)) is not None:
+        claimed.add(job.id)
+    assert stale.id in claimed
+    assert alive.id not in claimed
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_archive_reads_back(db, user_id, fmt):
+    db.add_all([
+        Expense(id=str(uuid.uuid4()), user_id=user_id, amount=100 * month, description="Item", category="Food",
+                date=datetime(year, month, 1, tzinfo=timezone.utc))
+        for year in (2023, 2024) for month in (1, 2, 3)
+    ])
+    job = _job(db, user_id, fmt, year=2024, status="running")
+    build_archive(db, job)
+    db.commit()
+
+    data = b"".join(get_blob_store().open(job.content_hash))
+    assert len(data) == job.size
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert set(manifest["tables"]) == set(EXPORT_TABLES)
+        assert manifest["tables"]["expenses"] == 3
+        assert json.loads(job.row_counts) == manifest["tables"]
+        expenses = archive.read(f"expenses.{fmt}")
+    if fmt == "parquet":
+        table = pa.parquet.read_table(io.BytesIO(expenses))
+    else:
+        table = pa.ipc.open_file(pa.BufferReader(expenses)).read_all()
+    assert "user_id" not in table.column_names
+    assert sorted(table.column("amount").to_pylist()) == [100, 200, 300]
+    assert {day.year for day in table.column("date").to_pylist()} == {2024}
+    assert job.heartbeat_at is not None
+
+def test_queued_export_runs_and_downloads(client, auth_headers, db, user_id):
+    db.add(Expense(id=str(uuid.uuid4()), user_id=user_id, amount=2500, description="Groceries", category="Food",
+                   date=datetime(2024, 5, 1, tzinfo=timezone.utc)))
+    db.commit()
+    job_id = client.post("/api/exports/", headers=auth_headers, json={"format": "arrow"}).json()["id"]
+
+    # Other tests leave pending jobs behind, so run until this one is done
+    while client.get(f"/api/exports/{job_id}", headers=auth_headers).json()["status"] != "done":
+        assert run_next_job() is not None
+
+    job = client.get(f"/api/exports/{job_id}", headers=auth_headers).json()
+    response = client.get(f"/api/exports/{job_id}/download", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert json.loads(archive.read("manifest.json"))["tables"]["expenses"] == 1
+        expenses = pa.ipc.open_file(pa.BufferReader(archive.read("expenses.arrow"))).read_all()
+    assert expenses.column("amount").to_pylist() == [2500]
+    assert job["row_counts"]["expenses"] == 1
@@ -0,0 +1,70 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.models.income import Income, IncomeSource, IncomeSourceType, MonthlyIncomeSummary
+from app.services.income_summary import apply_deltas, rebuild_summaries
+
+def _source(db, user_id: str) -> str:
+    source = IncomeSource(id=str(uuid.uuid4()), user_id=user_id, name="Employer", type=IncomeSourceType.SALARY)
+    db.add(source)
+    db.commit()
+    return source.id
+
+def _income(user_id: str, source_id: str, month: int, amount: int, **fields) -> Income:
+    return Income(id=str(uuid.uuid4()), user_id=user_id, income_source_id=source_id, amount=amount,
+                  date=datetime(2024, month, 1, tzinfo=timezone.utc), year=2024, month=month, **fields)
+
+def _summaries(db, user_id: str):
+    db.expire_all()
+    rows = db.scalars(select(MonthlyIncomeSummary).where(MonthlyIncomeSummary.user_id == user_id)).all()
+    return {
+        (row.year, row.month): (row.total_gross_income, row.total_net_income, row.total_deductions,
+                                json.loads(row.income_sources))
+        for row in rows
+    }
+
+def test_summaries_follow_income_writes_and_match_a_rebuild(db, user_id):
+    salary, freelance = _source(db, user_id), _source(db, user_id)
+    january = _income(user_id, salary, 1, 100_000, gross_amount=120_000, net_amount=100_000)
+    february = _income(user_id, salary, 2, 100_000)
+    side_job = _income(user_id, freelance, 2, 30_000)
+    db.add_all([january, february, side_job])
+    db.commit()
+    assert _summaries(db, user_id) == {
+        (2024, 1): (120_000, 100_000, 20_000, {salary: {"gross": 120_000, "net": 100_000, "count": 1}}),
+        (2024, 2): (130_000, 130_000, 0, {
+            salary: {"gross": 100_000, "net": 100_000, "count": 1},
+            freelance: {"gross": 30_000, "net": 30_000, "count": 1},
+        }),
+    }
+
+    # Moving an income to another month and source takes it out of the old cell
+    side_job = db.get(Income, side_job.id)
+    side_job.month, side_job.income_source_id, side_job.amount = 3, salary, 45_000
+    db.commit()
+    db.delete(db.get(Income, january.id))
+    db.commit()
+    expected = {
+        (2024, 2): (100_000, 100_000, 0, {salary: {"gross": 100_000, "net": 100_000, "count": 1}}),
+        (2024, 3): (45_000, 45_000, 0, {salary: {"gross": 45_000, "net": 45_000, "count": 1}}),
+    }
+    assert _summaries(db, user_id) == expected
+
+    assert rebuild_summaries(db, user_id) == 2
+    assert _summaries(db, user_id) == expected
+
+def test_deltas_fold_into_one_row_per_month(db, user_id):
+    source = _source(db, user_id)
+    delta = {(user_id, 2024, 6): {source: {"gross": 500, "net": 400, "count": 1}}}
+    # Two first incomes of a month applied one after the other: the second finds the first's row
+    apply_deltas(db.connection(), delta)
+    apply_deltas(db.connection(), delta)
+    db.commit()
+    assert _summaries(db, user_id) == {(2024, 6): (1000, 800, 200, {source: {"gross": 1000, "net": 800, "count": 2}})}
+
+    apply_deltas(db.connection(), {(user_id, 2024, 6): {source: {"gross": -1000, "net": -800, "count": -2}}})
+    db.commit()
+    assert _summaries(db, user_id) == {}
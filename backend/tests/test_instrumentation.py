@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.instrumentation import RequestStats, attach_query_timing, current_request
+
+def test_failed_statements_do_not_skew_later_timings():
+    engine = create_engine("sqlite://")
+    attach_query_timing(engine, "test")
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info == {}
+    finally:
+        current_request.reset(token)
+        engine.dispose()
+
+    assert stats.queries == 1
+    assert 0 <= stats.query_seconds < 1
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from app.services.nav_store import NavStore
+
+START = date(2024, 1, 1)
+
+def _points(days: int, offset: int = 0):
+    return [(START + timedelta(days=offset + i), 100_000 + offset + i) for i in range(days)]
+
+def test_concurrent_appends_write_each_day_once(tmp_path):
+    store = NavStore(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        written = list(pool.map(lambda _: store.append("100", _points(50)), range(8)))
+
+    series = store.read("100")
+    assert sum(written) == 50
+    assert series.days.tolist() == sorted(set(series.days.tolist()))
+    assert len(series) == 50
+
+def test_evicted_mappings_are_closed(tmp_path):
+    store = NavStore(str(tmp_path), max_open=2)
+    for code in ("1", "2", "3"):
+        store.append(code, _points(5))
+    store.read("1")
+    mappings = store._cache["1"][2]
+    store.read("2")
+    store.read("1")
+    store.read("3")
+
+    # "2" was least recently read, so it went first
+    assert list(store._cache) == ["1", "3"]
+    store.read("2")
+    assert list(store._cache) == ["3", "2"]
+    assert all(mapping.closed for mapping in mappings)
+
+def test_reader_keeps_evicted_series_usable(tmp_path):
+    store = NavStore(str(tmp_path), max_open=1)
+    store.append("1", _points(5))
+    store.append("2", _points(5))
+    held = store.read("1").range(START + timedelta(days=1), START + timedelta(days=2))
+    store.read("2")
+
+    assert "1" not in store._cache
+    assert held.navs.tolist() == [100_001, 100_002]
+
+def test_append_after_read_extends_the_mapping(tmp_path):
+    store = NavStore(str(tmp_path))
+    store.append("100", _points(3))
+    before = store.read("100")
+    store.append("100", _points(3, offset=3))
+
+    assert len(before) == 3
+    assert len(store.read("100")) == 6
@@ -0,0 +1,33 @@
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from app.services.portfolio import CashFlows, value_portfolio
+
+def _flows(*rows) -> CashFlows:
+    """One investment priced at 150 cents a unit, with (date, kind, amount, units) flows."""
+    return CashFlows(
+        investment_ids=["inv"],
+        asset_names=["Index Fund"],
+        prices=np.array([150.0]),
+        group=np.zeros(len(rows), dtype=np.int64),
+        day=np.array([day.toordinal() for day, _, _, _ in rows], dtype=np.int64),
+        amount=np.array([amount for _, _, amount, _ in rows], dtype=np.float64),
+        units=np.array([units for _, _, _, units in rows], dtype=np.float64),
+        kind=np.array([kind for _, kind, _, _ in rows], dtype=np.int8),
+    )
+
+def test_flows_after_as_of_are_ignored():
+    flows = _flows(
+        (date(2023, 1, 1), 1, 10000, 100),
+        (date(2025, 1, 1), 1, 20000, 100),
+        (date(2025, 6, 1), -1, 15000, 50),
+    )
+    result = value_portfolio(flows, datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    holding = result["investments"][0]
+    assert holding["units"] == 100
+    assert holding["invested"] == 10000
+    assert holding["current_value"] == 15000
+    assert holding["realized_gain"] == 0
+    assert result["xirr"] is not None and abs(result["xirr"] - 0.5) < 0.01
@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.projections import MAX_CURVE_POINTS, project
+
+def test_rate_at_or_below_minus_100_percent_is_rejected(client, auth_headers):
+    response = client.post("/api/investments/projections", headers=auth_headers, json={
+        "monthly_amount": 1000, "annual_rates": [-1200], "tenures_years": [1],
+    })
+    assert response.status_code == 422
+
+    with pytest.raises(ValueError, match="Annual rates"):
+        project("sip", 1000, [-100], [1], [0])
+
+def test_curve_points_are_capped(client, auth_headers):
+    rates = [float(r) for r in range(1, 101)]
+    tenures = list(range(1, 51))
+    assert 100 * sum(tenures) * 12 > MAX_CURVE_POINTS
+
+    response = client.post("/api/investments/projections", headers=auth_headers, json={
+        "monthly_amount": 1000, "annual_rates": rates, "tenures_years": tenures,
+    })
+    assert response.status_code == 400
+    assert "curve points" in response.json()["detail"]
+
+    response = client.post("/api/investments/projections", headers=auth_headers, json={
+        "monthly_amount": 1000, "annual_rates": rates, "tenures_years": tenures, "include_curves": False,
+    })
+    assert response.status_code == 200
+    assert response.json()["count"] == 5000
+
+@pytest.mark.parametrize("fields", [
+    {"annual_rates": [100], "tenures_years": [10000]},
+    {"annual_rates": [10], "tenures_years": [0]},
+    {"annual_rates": [10], "tenures_years": [10], "step_ups": [-300]},
+    {"annual_rates": [10], "tenures_years": [10], "step_ups": [1e6]},
+])
+def test_tenures_and_step_ups_out_of_range_are_rejected(client, auth_headers, fields):
+    response = client.post("/api/investments/projections", headers=auth_headers, json={"monthly_amount": 1000, **fields})
+    assert response.status_code == 422
+
+    with pytest.raises(ValueError):
+        project("sip", 1000, fields["annual_rates"], fields["tenures_years"], fields.get("step_ups", [0]))
+
+def test_amounts_that_overflow_are_a_bad_request(client, auth_headers):
+    request = {"monthly_amount": 10 ** 12, "annual_rates": [100], "tenures_years": [100], "step_ups": [100]}
+    response = client.post("/api/investments/projections", headers=auth_headers, json=request)
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
+
+    response = client.post("/api/investments/projections", headers=auth_headers, json={
+        **request, "monte_carlo": {"paths": 10, "seed": 1}, "annual_rates": [10],
+    })
+    assert response.status_code == 400
+
+    # Without curves any finite amount is returned, but round() cannot take infinity
+    response = client.post("/api/investments/projections", headers=auth_headers, json={
+        **request, "monthly_amount": 10 ** 300, "include_curves": False,
+    })
+    assert response.status_code == 400
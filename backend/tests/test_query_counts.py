@@ -0,0 +1,131 @@
+"""N+1 regression test for every GET endpoint.
+
+Seeds two users, one with a single row of everything and one with many rows
+(tax deductions with several attachments, incomes, expenses, investments,
+policies, export jobs), then calls every authenticated GET route as each user
+and counts the SQL statements it runs. A route whose count grows with the
+number of rows is loading something per row and fails, as does a 500 (e.g. a
+relationship hitting a raiseload).
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.main import app
+from app.database import SessionLocal
+from app.core.query_counter import count_queries
+from app.core.security import create_access_token
+from app.models.expense import Expense
+from app.models.export import ExportJob
+from app.models.income import Income, IncomeSource, IncomeSourceType
+from app.models.insurance import InsurancePolicy, InsurancePolicyType, PremiumFrequency
+from app.models.investment import (
+    Investment, InvestmentAsset, InvestmentAssetType, InvestmentTransaction, InvestmentType, RiskLevel,
+)
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.models.user import User
+
+SMALL, LARGE = 1, 25
+ATTACHMENTS_PER_DEDUCTION = 3
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Query strings for routes with required parameters
+QUERIES = {"/api/investments/schemes/search": {"q": "growth"}, "/api/search/": {"q": "groceries"}}
+
+def _id() -> str:
+    return str(uuid.uuid4())
+
+def seed(db, user_id: str, n: int) -> dict:
+    """Give a user n rows of every kind; returns the values for path parameters."""
+    db.add(User(id=user_id, email=f"{user_id}@example.com", hashed_password="x"))
+    source = IncomeSource(id=_id(), user_id=user_id, name="Salary", type=IncomeSourceType.SALARY)
+    asset = InvestmentAsset(
+        id=_id(), user_id=user_id, name="Index Fund", type=InvestmentAssetType.MUTUAL_FUND,
+        current_price=12000, risk_level=RiskLevel.MODERATE, scheme_code="100",
+    )
+    db.add_all([source, asset])
+
+    deductions = []
+    for i in range(n):
+        day = START + timedelta(days=i)
+        deduction = TaxDeduction(
+            id=_id(), user_id=user_id, year=2024, deduction_type="80C", amount=1000 + i, created_at=day,
+        )
+        deduction.attachments = [
+            DocumentAttachment(
+                id=_id(), file_name=f"receipt-{j}.pdf", file_type="application/pdf", file_size=4,
+                document_type="receipt", file_data="JVBERg==",
+            )
+            for j in range(ATTACHMENTS_PER_DEDUCTION)
+        ]
+        deductions.append(deduction)
+        investment = Investment(
+            id=_id(), user_id=user_id, asset_id=asset.id, investment_type=InvestmentType.SIP,
+            amount=10000, units=100, purchase_price=10000, purchase_date=day,
+        )
+        db.add_all([
+            deduction,
+            investment,
+            InvestmentTransaction(
+                id=_id(), user_id=user_id, investment_id=investment.id, transaction_type="buy",
+                amount=10000, units=100, price_per_unit=100, date=day,
+            ),
+            Income(
+                id=_id(), user_id=user_id, income_source_id=source.id, amount=500000,
+                date=day, month=day.month, year=day.year,
+            ),
+            Expense(id=_id(), user_id=user_id, amount=2500, description="Groceries", category="Food", date=day),
+            InsurancePolicy(
+                id=_id(), user_id=user_id, policy_number=f"P{i}", policy_type=InsurancePolicyType.HEALTH,
+                insurance_company="Insurer", premium_amount=15000, premium_frequency=PremiumFrequency.YEARLY,
+                start_date=day, next_premium_date=day + timedelta(days=365),
+            ),
+            ExportJob(id=_id(), user_id=user_id, format="parquet", status="failed", error="x", created_at=day),
+        ])
+    db.commit()
+    return {
+        "deduction_id": deductions[0].id, "scheme_code": "100",
+        "kind": "tax-deduction", "document_id": deductions[0].attachments[0].id,
+        "job_id": db.scalars(select(ExportJob.id).where(ExportJob.user_id == user_id)).first(),
+    }
+
+def get_routes():
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path.startswith("/api/"):
+            yield route
+
+def measure(client: TestClient, user_id: str, params: dict) -> dict:
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": user_id})}
+    counts = {}
+    for route in get_routes():
+        path = route.path.format(**params)
+        with count_queries() as queries:
+            response = client.get(path, params=QUERIES.get(route.path), headers=headers)
+        counts[route.path] = (queries.count, response.status_code)
+    return counts
+
+@pytest.fixture(scope="module")
+def counts(client):
+    """{path: ((small count, small status), (large count, large status))} over every GET route."""
+    small_user, large_user = f"small-{_id()}", f"large-{_id()}"
+    db = SessionLocal()
+    try:
+        small_params = seed(db, small_user, SMALL)
+        large_params = seed(db, large_user, LARGE)
+    finally:
+        db.close()
+    small = measure(client, small_user, small_params)
+    large = measure(client, large_user, large_params)
+    return {path: (small[path], large[path]) for path in small}
+
+@pytest.mark.parametrize("path", [route.path for route in get_routes()])
+def test_query_count_does_not_grow_with_rows(counts, path):
+    (small_count, small_status), (large_count, large_status) = counts[path]
+    assert 500 not in (small_status, large_status), f"GET {path} failed"
+    assert large_count <= small_count, (
+        f"GET {path}: {small_count} -> {large_count} queries for {SMALL} -> {LARGE} rows"
+    )
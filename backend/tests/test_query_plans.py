@@ -0,0 +1,152 @@
+"""Query-plan regression tests for the hot per-user queries.
+
+Each hot query must keep using its index. The schema is built in an
+in-memory SQLite database; SQLite's planner picks indexes independently of
+table size, so the plans are deterministic without seeding data.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select, text, tuple_
+
+from app.database import Base
+import app.models  # noqa: F401
+from app.models.expense import Expense
+from app.models.export import ExportJob
+from app.models.income import Income, MonthlyIncomeSummary
+from app.models.insurance import InsurancePolicy
+from app.models.investment import InvestmentTransaction
+from app.models.report import ReportRollup
+from app.models.sync import ChangeLogEntry
+from app.models.tax_deduction import TaxDeduction, DocumentAttachment
+from app.services.exports import table_query
+from app.services.search import search_statement
+
+NOW = datetime(2024, 1, 1)
+
+# (name, statement, index the plan must use)
+HOT_QUERIES = [
+    (
+        "tax deductions keyset page",
+        select(TaxDeduction).where(
+            TaxDeduction.user_id == "u",
+            tuple_(TaxDeduction.created_at, TaxDeduction.id) < tuple_(NOW, "x"),
+        ).order_by(TaxDeduction.created_at.desc(), TaxDeduction.id.desc()).limit(100),
+        "ix_tax_deductions_user_created",
+    ),
+    (
+        "attachments selectin load",
+        select(DocumentAttachment).where(DocumentAttachment.tax_deduction_id.in_(["a", "b"])),
+        "ix_document_attachments_tax_deduction_id",
+    ),
+    (
+        "expenses by date range",
+        select(Expense).where(Expense.user_id == "u", Expense.date >= NOW).order_by(Expense.date),
+        "ix_expenses_user_date",
+    ),
+    (
+        "expenses due",
+        select(Expense).where(Expense.user_id == "u", Expense.next_due_date <= NOW),
+        "ix_expenses_user_next_due_date",
+    ),
+    (
+        "incomes by month",
+        select(Income).where(Income.user_id == "u", Income.year == 2024, Income.month == 1),
+        "ix_incomes_user_year_month",
+    ),
+    (
+        "income summaries by year",
+        select(MonthlyIncomeSummary).where(MonthlyIncomeSummary.user_id == "u", MonthlyIncomeSummary.year == 2024),
+        "uq_monthly_income_summary_user_month",
+    ),
+    (
+        "investment transactions by date",
+        select(InvestmentTransaction).where(InvestmentTransaction.user_id == "u").order_by(InvestmentTransaction.date),
+        "ix_investment_transactions_user_date",
+    ),
+    (
+        "premiums due",
+        select(InsurancePolicy).where(InsurancePolicy.user_id == "u", InsurancePolicy.next_premium_date <= NOW),
+        "ix_insurance_policies_user_next_premium_date",
+    ),
+    (
+        "scheduler: due recurring expenses",
+        select(Expense.id).where(Expense.next_due_date <= NOW, Expense.is_recurring.is_(True))
+        .order_by(Expense.next_due_date).limit(500),
+        "ix_expenses_next_due_date",
+    ),
+    (
+        "scheduler: due premiums",
+        select(InsurancePolicy.id).where(InsurancePolicy.next_premium_date <= NOW, InsurancePolicy.is_active.isnot(False))
+        .order_by(InsurancePolicy.next_premium_date).limit(500),
+        "ix_insurance_policies_next_premium_date",
+    ),
+    (
+        "report slice",
+        select(ReportRollup.month, ReportRollup.category, func.sum(ReportRollup.total)).where(
+            ReportRollup.user_id == "u", ReportRollup.domain == "expense", ReportRollup.year == 2024,
+        ).group_by(ReportRollup.month, ReportRollup.category),
+        "uq_report_rollups_cell",
+    ),
+    (
+        "search page",
+        search_statement("sqlite", "u", ["rent"], limit=20),
+        "VIRTUAL TABLE INDEX",
+    ),
+    (
+        "sync batch",
+        select(ChangeLogEntry).where(ChangeLogEntry.user_id == "u", ChangeLogEntry.seq > 100)
+        .order_by(ChangeLogEntry.seq).limit(500),
+        "ix_change_log_user_seq",
+    ),
+    (
+        "change log replace",
+        select(ChangeLogEntry.seq).where(
+            ChangeLogEntry.entity_type == "expense", ChangeLogEntry.entity_id.in_(["a", "b"])
+        ),
+        "uq_change_log_entity",
+    ),
+    (
+        "export expenses of a year",
+        table_query("expenses", "u", 2024),
+        "ix_expenses_user_date",
+    ),
+    (
+        "export job claim",
+        select(ExportJob.id).where(ExportJob.status == "pending").order_by(ExportJob.created_at).limit(10),
+        "ix_export_jobs_status_created",
+    ),
+    (
+        "export job list",
+        select(ExportJob).where(ExportJob.user_id == "u").order_by(ExportJob.created_at.desc()).limit(20),
+        "ix_export_jobs_user_created",
+    ),
+]
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def index_aliases(plan_engine):
+    """Named unique constraints mapped to SQLite's autoindex names."""
+    aliases = {}
+    with plan_engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            for constraint in table.constraints:
+                if constraint.name and constraint.name.startswith("uq_"):
+                    for row in conn.execute(text(f"PRAGMA index_list('{table.name}')")):
+                        if row.origin == "u":
+                            aliases[constraint.name] = row.name
+    return aliases
+
+@pytest.mark.parametrize("name,statement,expected", HOT_QUERIES, ids=[name for name, _, _ in HOT_QUERIES])
+def test_hot_query_uses_index(plan_engine, index_aliases, name, statement, expected):
+    sql = str(statement.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+    with plan_engine.connect() as conn:
+        plan = [row.detail for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    index = index_aliases.get(expected, expected)
+    assert any(index in detail for detail in plan), f"{name} no longer uses {expected}: {' | '.join(plan)}"
@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.insurance import InsurancePolicy, InsurancePolicyType, PremiumFrequency, PremiumPayment
+from app.models.report import ReportRollup
+from app.services import scheduler
+from app.services.reports import rebuild_rollups
+
+def _cells(db, user_id: str) -> dict:
+    db.expire_all()
+    rows = db.execute(
+        select(ReportRollup.domain, ReportRollup.year, ReportRollup.month, ReportRollup.category,
+               ReportRollup.total, ReportRollup.count).where(ReportRollup.user_id == user_id)
+    ).all()
+    return {(domain, year, month, category): (total, count) for domain, year, month, category, total, count in rows}
+
+def test_expense_writes_move_their_cells(db, user_id):
+    expense = Expense(id=str(uuid.uuid4()), user_id=user_id, amount=2500, description="Groceries",
+                      category="Food", date=datetime(2024, 1, 31, 23, 0, tzinfo=timezone.utc))
+    db.add(expense)
+    db.commit()
+    assert _cells(db, user_id) == {("expense", 2024, 1, "Food"): (2500, 1)}
+
+    expense = db.get(Expense, expense.id)
+    expense.amount = 4000
+    expense.category = "Dining"
+    expense.date = datetime(2024, 2, 1, 4, 0, tzinfo=timezone.utc)
+    db.commit()
+    assert _cells(db, user_id) == {("expense", 2024, 2, "Dining"): (4000, 1)}
+
+    db.delete(expense)
+    db.commit()
+    assert _cells(db, user_id) == {}
+
+def test_paid_premiums_stay_in_the_month_they_fell_due(db, user_id):
+    policy = InsurancePolicy(
+        id=str(uuid.uuid4()), user_id=user_id, policy_number="P1", policy_type=InsurancePolicyType.HEALTH,
+        insurance_company="Insurer", premium_amount=1500, premium_frequency=PremiumFrequency.MONTHLY,
+        start_date=datetime(2024, 1, 15, tzinfo=timezone.utc),
+        next_premium_date=datetime(2024, 1, 15, tzinfo=timezone.utc),
+    )
+    db.add(policy)
+    db.commit()
+    # Nothing is paid yet, so nothing counts
+    assert _cells(db, user_id) == {}
+
+    asyncio.run(scheduler.run_once(AsyncSessionLocal, now=datetime(2024, 3, 20, tzinfo=timezone.utc)))
+
+    payments = db.scalars(select(PremiumPayment).where(PremiumPayment.user_id == user_id)).all()
+    assert sorted(payment.due_date.month for payment in payments) == [1, 2, 3]
+    cells = _cells(db, user_id)
+    for month in (1, 2, 3):
+        assert cells[("insurance", 2024, month, "Health Insurance")] == (1500, 1)
+        assert cells[("expense", 2024, month, scheduler.PREMIUM_CATEGORY)] == (1500, 1)
+    assert ("insurance", 2024, 4, "Health Insurance") not in cells
+
+def test_rebuild_matches_incremental_cells(db, user_id):
+    db.add_all([
+        Expense(id=str(uuid.uuid4()), user_id=user_id, amount=100 * i, description="Item", category="Food",
+                date=datetime(2024, i, 1, tzinfo=timezone.utc))
+        for i in range(1, 13)
+    ])
+    db.commit()
+    incremental = _cells(db, user_id)
+
+    rebuild_rollups(db, user_id)
+    assert _cells(db, user_id) == incremental
@@ -0,0 +1,114 @@
+import uuid
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend, response_cache
+from app.core.security import create_access_token
+from app.models.user import User
+
+def _fakeredis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisCacheBackend(client=fakeredis.FakeAsyncRedis())
+
+@pytest.fixture(params=["memory", "fakeredis"])
+def cache(request, monkeypatch):
+    backend = MemoryCacheBackend(1000, 1024 * 1024) if request.param == "memory" else _fakeredis()
+    monkeypatch.setattr(response_cache, "backend", backend)
+    return response_cache
+
+def _get(client, headers, url, etag=None):
+    return client.get(url, headers={**headers, "If-None-Match": etag} if etag else headers)
+
+def _assert_cached(client, headers, url):
+    """The URL is served from the cache and revalidates to 304; returns its ETag."""
+    hits = response_cache.hits
+    response = _get(client, headers, url)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+    assert _get(client, headers, url, etag).status_code == 304
+    assert response_cache.hits > hits
+    return etag
+
+def test_revalidation(client, auth_headers, cache):
+    url = "/api/tax-deductions/"
+    first = _get(client, auth_headers, url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    revalidated = _get(client, auth_headers, url, etag)
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert _get(client, auth_headers, url, '"stale", W/' + etag).status_code == 304
+    assert _get(client, auth_headers, url, '"stale"').status_code == 200
+
+def test_cache_is_per_user_and_query(client, auth_headers, cache, db):
+    other = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+    other_headers = {"Authorization": "Bearer " + create_access_token({"sub": other.id})}
+
+    created = client.post("/api/tax-deductions/", headers=auth_headers, json={
+        "year": 2024, "deduction_type": "80C", "amount": 1000,
+    })
+    assert created.status_code == 200
+    etag = _assert_cached(client, auth_headers, "/api/tax-deductions/")
+    assert _get(client, other_headers, "/api/tax-deductions/").json() == []
+    assert _get(client, other_headers, "/api/tax-deductions/", etag).status_code == 200
+    assert _get(client, auth_headers, "/api/tax-deductions/?limit=1", etag).status_code == 304  # Same body
+    assert _get(client, auth_headers, "/api/tax-deductions/?limit=1").json()[0]["id"] == created.json()["id"]
+
+def test_tax_deduction_writes_invalidate(client, auth_headers, cache):
+    url = "/api/tax-deductions/"
+    etag = _assert_cached(client, auth_headers, url)
+
+    created = client.post(url, headers=auth_headers, json={"year": 2024, "deduction_type": "80C", "amount": 1000})
+    deduction_id = created.json()["id"]
+    response = _get(client, auth_headers, url, etag)
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == [deduction_id]
+
+    item_url = f"{url}{deduction_id}"
+    list_etag = _assert_cached(client, auth_headers, url)
+    item_etag = _assert_cached(client, auth_headers, item_url)
+    assert client.put(item_url, headers=auth_headers, json={"amount": 2500}).status_code == 200
+    assert _get(client, auth_headers, url, list_etag).json()[0]["amount"] == 2500
+    assert _get(client, auth_headers, item_url, item_etag).json()["amount"] == 2500
+
+    list_etag = _assert_cached(client, auth_headers, url)
+    assert client.delete(item_url, headers=auth_headers).status_code == 200
+    assert _get(client, auth_headers, url, list_etag).json() == []
+    assert _get(client, auth_headers, item_url).status_code == 404
+
+def test_income_writes_invalidate_income_and_reports(client, auth_headers, cache):
+    source = client.post("/api/income/sources", headers=auth_headers, json={"name": "Employer", "type": "Salary"})
+    assert source.status_code == 200
+    url, summary_url = "/api/income/", "/api/income/summary?year=2024"
+    etag = _assert_cached(client, auth_headers, url)
+    summary_etag = _assert_cached(client, auth_headers, summary_url)
+    reports_etag = _assert_cached(client, auth_headers, "/api/reports/?year=2024")
+
+    created = client.post(url, headers=auth_headers, json={
+        "income_source_id": source.json()["id"], "amount": 500000, "date": "2024-03-01T00:00:00Z",
+    })
+    assert created.status_code == 200
+    income_id = created.json()["id"]
+    assert [i["id"] for i in _get(client, auth_headers, url, etag).json()] == [income_id]
+    assert _get(client, auth_headers, summary_url, summary_etag).json()[0]["total_gross_income"] == 500000
+    assert _get(client, auth_headers, "/api/reports/?year=2024", reports_etag).status_code == 200
+
+    etag = _assert_cached(client, auth_headers, url)
+    assert client.put(f"{url}{income_id}", headers=auth_headers, json={"amount": 600000}).status_code == 200
+    assert _get(client, auth_headers, url, etag).json()[0]["amount"] == 600000
+
+    etag = _assert_cached(client, auth_headers, url)
+    assert client.delete(f"{url}{income_id}", headers=auth_headers).status_code == 200
+    assert _get(client, auth_headers, url, etag).json() == []
+
+def test_memory_backend_is_refused_on_vercel(monkeypatch):
+    monkeypatch.setattr(cache_module.settings, "RESPONSE_CACHE_BACKEND", "memory")
+    assert isinstance(cache_module._create_backend(), MemoryCacheBackend)
+    monkeypatch.setenv("VERCEL", "1")
+    assert cache_module._create_backend() is None
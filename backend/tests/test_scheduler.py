@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.insurance import InsurancePolicy, InsurancePolicyType, PremiumFrequency, PremiumPayment
+from app.models.report import ReportRollup
+from app.models.search import SearchDocument
+from app.models.sync import ChangeLogEntry
+from app.services.scheduler import due_dates, run_once
+
+NOW = datetime(2024, 4, 15, tzinfo=timezone.utc)
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+def _naive(value: datetime) -> datetime:
+    # SQLite hands datetimes back without a time zone
+    return value.replace(tzinfo=None)
+
+def _template(db, user_id: str, **fields) -> Expense:
+    template = Expense(id=str(uuid.uuid4()), user_id=user_id, amount=150_000, description="Rent", category="Housing",
+                       is_recurring=True, **fields)
+    db.add(template)
+    db.commit()
+    return template
+
+def _posted(db, user_id: str):
+    db.expire_all()
+    return db.scalars(select(Expense).where(Expense.user_id == user_id, Expense.is_recurring.is_(False))
+                      .order_by(Expense.date)).all()
+
+def _cells(db, user_id: str, domain: str):
+    return [tuple(cell) for cell in db.execute(
+        select(ReportRollup.month, ReportRollup.category, ReportRollup.total, ReportRollup.count)
+        .where(ReportRollup.user_id == user_id, ReportRollup.domain == domain).order_by(ReportRollup.month)
+    )]
+
+def test_month_end_schedule_keeps_its_day():
+    occurrences, following = due_dates(_utc(2024, 1, 31), "monthly", NOW)
+    assert occurrences == [_utc(2024, 1, 31), _utc(2024, 2, 29), _utc(2024, 3, 31)]
+    assert following == _utc(2024, 4, 30)
+
+    occurrences, following = due_dates(_utc(2024, 1, 1), "weekly", NOW, end=_utc(2024, 1, 20))
+    assert occurrences == [_utc(2024, 1, 1), _utc(2024, 1, 8), _utc(2024, 1, 15)]
+    assert following is None
+
+def test_missed_occurrences_are_posted_once(db, user_id):
+    template = _template(db, user_id, date=_utc(2024, 1, 31), recurrence_interval="monthly",
+                         next_due_date=_utc(2024, 1, 31))
+    asyncio.run(run_once(AsyncSessionLocal, NOW))
+    asyncio.run(run_once(AsyncSessionLocal, NOW))
+
+    posted = _posted(db, user_id)
+    assert [expense.date for expense in posted] == [_naive(_utc(2024, 1, 31)), _naive(_utc(2024, 2, 29)),
+                                                    _naive(_utc(2024, 3, 31))]
+    assert db.get(Expense, template.id).next_due_date == _naive(_utc(2024, 4, 30))
+    # The template itself was created through the ORM and counts in January as well
+    assert _cells(db, user_id, "expense") == [(1, "Housing", 300_000, 2), (2, "Housing", 150_000, 1),
+                                              (3, "Housing", 150_000, 1)]
+
+    ids = {expense.id for expense in posted}
+    assert set(db.scalars(select(SearchDocument.entity_id).where(
+        SearchDocument.user_id == user_id, SearchDocument.entity_id.in_(ids)
+    ))) == ids
+    logged = set(db.scalars(select(ChangeLogEntry.entity_id).where(ChangeLogEntry.user_id == user_id)))
+    assert ids | {template.id} <= logged
+
+def test_concurrent_runs_claim_each_due_date_once(db, user_id):
+    _template(db, user_id, date=_utc(2024, 3, 1), recurrence_interval="weekly", next_due_date=_utc(2024, 3, 1),
+              end_date=_utc(2024, 3, 31))
+
+    async def race():
+        return await asyncio.gather(run_once(AsyncSessionLocal, NOW), run_once(AsyncSessionLocal, NOW))
+
+    asyncio.run(race())
+    assert len(_posted(db, user_id)) == 5  # Mar 1, 8, 15, 22, 29
+
+def test_unknown_interval_stops_the_schedule(db, user_id):
+    template = _template(db, user_id, date=_utc(2024, 1, 1), recurrence_interval="every so often",
+                         next_due_date=_utc(2024, 1, 1))
+    asyncio.run(run_once(AsyncSessionLocal, NOW))
+    assert _posted(db, user_id) == []
+    assert db.get(Expense, template.id).next_due_date is None
+
+def test_premiums_post_payments_and_expenses(db, user_id):
+    policy = InsurancePolicy(
+        id=str(uuid.uuid4()), user_id=user_id, policy_number="H-1", policy_type=InsurancePolicyType.HEALTH,
+        insurance_company="Insurer", premium_amount=20_000, premium_frequency=PremiumFrequency.MONTHLY,
+        start_date=_utc(2024, 1, 10), next_premium_date=_utc(2024, 1, 10),
+    )
+    db.add(policy)
+    db.commit()
+    asyncio.run(run_once(AsyncSessionLocal, NOW))
+    asyncio.run(run_once(AsyncSessionLocal, NOW))
+
+    payments = db.scalars(select(PremiumPayment.due_date).where(PremiumPayment.policy_id == policy.id)
+                          .order_by(PremiumPayment.due_date)).all()
+    assert payments == [_naive(_utc(2024, month, 10)) for month in (1, 2, 3, 4)]
+    posted = _posted(db, user_id)
+    assert {(expense.category, expense.description) for expense in posted} == {("Insurance", "Insurer premium (H-1)")}
+    assert len(posted) == 4
+    assert db.get(InsurancePolicy, policy.id).next_premium_date == _naive(_utc(2024, 5, 10))
+
+    category = InsurancePolicyType.HEALTH.value
+    assert _cells(db, user_id, "insurance") == [(month, category, 20_000, 1) for month in (1, 2, 3, 4)]
+    assert _cells(db, user_id, "expense") == [(month, "Insurance", 20_000, 1) for month in (1, 2, 3, 4)]
+    assert policy.id in set(db.scalars(select(ChangeLogEntry.entity_id).where(ChangeLogEntry.user_id == user_id)))
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.core.config import settings
+from app.services import scheme_index
+
+def test_refresh_disabled_never_downloads(monkeypatch):
+    async def fetch_schemes():
+        raise AssertionError("the scheme list must not be downloaded")
+
+    monkeypatch.setattr(settings, "SCHEME_INDEX_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(scheme_index, "fetch_schemes", fetch_schemes)
+    monkeypatch.setattr(scheme_index, "current", None)
+
+    asyncio.run(asyncio.wait_for(scheme_index.run_refresh_loop(), timeout=5))
+    assert scheme_index.current is None
+
+SCHEMES = [
+    ("101", "Parag Parikh Flexi Cap Fund - Direct Plan - Growth"),
+    ("102", "Flexible Capital Growth Fund"),
+    ("103", "Fleksi Kap Savings Fund"),
+    ("104", "Axis Liquid Fund - Regular Plan"),
+]
+
+def _codes(index: scheme_index.SchemeIndex, query: str):
+    return [hit["scheme_code"] for hit in index.search(query)]
+
+def test_whole_words_outrank_prefixes_and_prefixes_outrank_trigram_matches():
+    index = scheme_index.SchemeIndex(SCHEMES)
+    # Exact words, word prefixes only, shared trigrams only; the liquid fund shares too little
+    assert _codes(index, "flexi cap") == ["101", "102", "103"]
+    scores = [hit["score"] for hit in index.search("flexi cap")]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] > scores[1] > scores[2]
+
+def test_typos_and_punctuation_still_match():
+    index = scheme_index.SchemeIndex(SCHEMES)
+    assert _codes(index, "parag-parikh flexy")[0] == "101"
+    assert _codes(index, "AXIS LIQUID") == ["104"]
+    assert _codes(index, "zzzz") == []
+    assert _codes(index, "  --  ") == []
+
+def test_search_endpoint_uses_the_live_index(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(scheme_index, "current", None)
+    assert client.get("/api/investments/schemes/search", headers=auth_headers,
+                      params={"q": "flexi"}).status_code == 503
+
+    monkeypatch.setattr(scheme_index, "current", scheme_index.SchemeIndex(SCHEMES))
+    response = client.get("/api/investments/schemes/search", headers=auth_headers, params={"q": "flexi cap"})
+    assert response.status_code == 200
+    hit = response.json()[0]
+    assert (hit["scheme_code"], hit["scheme_name"]) == ("101", SCHEMES[0][1])
@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models.expense import Expense
+from app.models.tax_deduction import DocumentAttachment, TaxDeduction
+from app.models.user import User
+
+def _expense(user_id: str, description: str, **fields) -> Expense:
+    fields = {"category": "Travel", **fields}
+    return Expense(id=str(uuid.uuid4()), user_id=user_id, amount=1000, description=description,
+                   date=datetime(2024, 1, 1, tzinfo=timezone.utc), **fields)
+
+def _search(client, headers, q: str, **params):
+    response = client.get("/api/search/", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response
+
+def _ids(client, headers, q: str, **params):
+    return [hit["entity_id"] for hit in _search(client, headers, q, **params).json()]
+
+def test_pages_follow_the_rank_cursor(client, auth_headers, db, user_id):
+    expenses = [_expense(user_id, f"Monsoon trip {i}", notes="monsoon " * (i % 3)) for i in range(30)]
+    db.add_all(expenses)
+    db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = _search(client, auth_headers, "monsoon", limit=10, **({"cursor": cursor} if cursor else {}))
+        hits = response.json()
+        ranks = [hit["rank"] for hit in hits]
+        assert ranks == sorted(ranks, reverse=True)
+        seen.extend(hit["entity_id"] for hit in hits)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        pages += 1
+    assert pages == 3  # A full last page still hands out a cursor, which leads to an empty page
+    assert len(seen) == len(set(seen)) == 30
+    assert set(seen) == {expense.id for expense in expenses}
+
+def test_invalid_cursor_is_a_bad_request(client, auth_headers):
+    response = client.get("/api/search/", headers=auth_headers, params={"q": "x", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("q", ['"', 'NEAR(', '*', 'a"b', "- OR AND", "^col:", "()"])
+def test_fts_syntax_in_queries_is_plain_text(client, auth_headers, q):
+    _search(client, auth_headers, q)
+
+def test_words_match_as_prefixes_and_all_must_match(client, auth_headers, db, user_id):
+    db.add_all([_expense(user_id, "Groceries at Fresh Market"), _expense(user_id, "Fresh flowers")])
+    db.commit()
+    assert len(_ids(client, auth_headers, "fre")) == 2
+    assert len(_ids(client, auth_headers, "fresh groc")) == 1
+    assert _ids(client, auth_headers, "fresh zucchini") == []
+
+    hit = _search(client, auth_headers, "groc").json()[0]
+    assert hit["entity_type"] == "expense"
+    assert "<mark>Groceries</mark>" in hit["snippet"]
+
+def test_title_matches_outrank_body_matches(client, auth_headers, db, user_id):
+    in_body = _expense(user_id, "Weekend rental", notes="kayak and paddles")
+    in_title = _expense(user_id, "Kayak", notes="weekend rental")
+    db.add_all([in_body, in_title])
+    db.commit()
+    assert _ids(client, auth_headers, "kayak") == [in_title.id, in_body.id]
+
+def test_updates_and_deletes_reach_the_index(client, auth_headers, db, user_id):
+    expense = _expense(user_id, "Taxi to airport")
+    db.add(expense)
+    db.commit()
+    assert _ids(client, auth_headers, "taxi") == [expense.id]
+
+    expense.description = "Shuttle to airport"
+    db.commit()
+    assert _ids(client, auth_headers, "taxi") == []
+    assert _ids(client, auth_headers, "shuttle") == [expense.id]
+
+    db.delete(expense)
+    db.commit()
+    assert _ids(client, auth_headers, "shuttle") == []
+    assert _ids(client, auth_headers, "airport") == []
+
+def test_results_are_per_user_and_filter_by_type(client, auth_headers, db, user_id):
+    other = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(other)
+    db.add(_expense(other.id, "Quokka tour"))
+    deduction = TaxDeduction(id=str(uuid.uuid4()), user_id=user_id, year=2024, deduction_type="80C", amount=1000)
+    deduction.attachments = [DocumentAttachment(
+        id=str(uuid.uuid4()), file_name="quokka_2024-25.pdf", file_type="application/pdf", file_size=1,
+        document_type="receipt",
+    )]
+    db.add_all([deduction, _expense(user_id, "Quokka photo book")])
+    db.commit()
+
+    hits = _search(client, auth_headers, "quokka").json()
+    assert sorted(hit["entity_type"] for hit in hits) == ["expense", "tax_document"]
+    assert [hit["entity_type"] for hit in _search(client, auth_headers, "quokka", type="tax_document").json()] == [
+        "tax_document"
+    ]
+    # File names are split into words
+    assert len(_ids(client, auth_headers, "quokka 2024 25")) == 1
+
+    other_headers = {"Authorization": "Bearer " + create_access_token({"sub": other.id})}
+    assert [hit["title"] for hit in _search(client, other_headers, "quokka").json()] == ["Quokka tour"]
+
+    response = client.get("/api/search/", headers=auth_headers, params={"q": "quokka", "type": "nonsense"})
+    assert response.status_code == 400
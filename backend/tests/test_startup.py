@@ -0,0 +1,12 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+
+def test_migrations_mode_refuses_to_start_behind_head(monkeypatch):
+    # The test database is built with create_all, so it has no alembic_version
+    monkeypatch.setattr(settings, "STARTUP_MODE", "migrations")
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        with TestClient(app):
+            pass
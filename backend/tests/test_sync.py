@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.sync import ChangeLogEntry
+from app.services.sync import decode_token, encode_token
+
+def _expenses(db, user_id: str, n: int):
+    expenses = [
+        Expense(id=str(uuid.uuid4()), user_id=user_id, amount=100 + i, description=f"Item {i}", category="Food",
+                date=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        for i in range(n)
+    ]
+    db.add_all(expenses)
+    db.commit()
+    return expenses
+
+def _sync(client, headers, since=None, limit=500):
+    params = {"limit": limit}
+    if since:
+        params["since"] = since
+    response = client.get("/api/sync/", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _sync_all(client, headers, since=None, limit=500):
+    ids, deleted = set(), set()
+    while True:
+        batch = _sync(client, headers, since, limit)
+        ids.update(row["id"] for row in batch["changes"].get("expense", []))
+        deleted.update(batch["deleted"].get("expense", []))
+        since = batch["token"]
+        if not batch["has_more"]:
+            return ids, deleted, since
+
+def test_full_sync_over_rows_older_than_the_retention(client, db, auth_headers, user_id):
+    expenses = _expenses(db, user_id, 5)
+    old = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 30)
+    db.execute(update(ChangeLogEntry).where(ChangeLogEntry.user_id == user_id).values(changed_at=old))
+    db.commit()
+
+    # Every page after the first is requested with the previous page's token
+    ids, _, _ = _sync_all(client, auth_headers, limit=2)
+    assert ids == {expense.id for expense in expenses}
+
+def test_paged_tokens_keep_the_sync_start(client, db, auth_headers, user_id):
+    _expenses(db, user_id, 3)
+    started_at = datetime.now(timezone.utc) - timedelta(days=10)
+    batch = _sync(client, auth_headers, since=encode_token(0, started_at), limit=1)
+
+    assert batch["has_more"] is True
+    assert decode_token(batch["token"])[1] == started_at
+
+def test_delta_sync_returns_changes_and_deletions(client, db, auth_headers, user_id):
+    kept, changed, removed = _expenses(db, user_id, 3)
+    _, _, token = _sync_all(client, auth_headers)
+
+    changed = db.get(Expense, changed.id)
+    changed.amount = 999
+    db.delete(db.get(Expense, removed.id))
+    db.commit()
+
+    ids, deleted, token = _sync_all(client, auth_headers, since=token)
+    assert ids == {changed.id}
+    assert deleted == {removed.id}
+    assert _sync_all(client, auth_headers, since=token)[:2] == (set(), set())
+
+def test_expired_token_is_gone(client, auth_headers):
+    expired = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    response = client.get("/api/sync/", headers=auth_headers, params={"since": encode_token(0, expired)})
+    assert response.status_code == 410
@@ -0,0 +1,102 @@
+import hashlib
+import io
+import os
+import uuid
+import zipfile
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.blob import Blob, BlobOwner
+from app.services.blob_store import get_blob_store
+
+PDF = b"%PDF-1.4\n" + os.urandom(64 * 1024) + b"\n%%EOF"
+
+def _upload(client, headers, data: bytes, name: str = "receipt.pdf", content_type: str = "application/pdf"):
+    return client.post("/api/documents/upload", headers=headers, files={"file": (name, data, content_type)})
+
+def test_upload_stores_the_file_once_per_content(client, db, auth_headers, user_id):
+    response = _upload(client, auth_headers, PDF)
+    assert response.status_code == 200
+    body = response.json()
+    digest = hashlib.sha256(PDF).hexdigest()
+    assert body["content_hash"] == digest
+    assert body["file_type"] == "application/pdf"
+    assert body["file_size"] == len(PDF)
+    assert b"".join(get_blob_store().open(digest)) == PDF
+
+    assert _upload(client, auth_headers, PDF, name="again.pdf").json()["content_hash"] == digest
+    assert db.scalars(select(Blob.size).where(Blob.sha256 == digest)).all() == [len(PDF)]
+    assert db.scalars(select(BlobOwner.user_id).where(BlobOwner.sha256 == digest)).all() == [user_id]
+
+def test_type_comes_from_the_content(client, auth_headers):
+    # Declared as a PDF, but the bytes are plain text
+    response = _upload(client, auth_headers, b"just some text, not a document")
+    assert response.status_code == 415
+
+def test_empty_and_missing_files_are_rejected(client, auth_headers):
+    assert _upload(client, auth_headers, b"").status_code == 400
+    response = client.post("/api/documents/upload", headers=auth_headers, data={"note": "no file"},
+                           files={"other": ("x.pdf", PDF, "application/pdf")})
+    assert response.status_code == 400
+
+def test_oversized_upload_is_rejected_without_storing_it(client, auth_headers):
+    data = b"%PDF-1.4\n" + b"\0" * settings.MAX_FILE_SIZE
+    response = _upload(client, auth_headers, data)
+    assert response.status_code == 413
+    assert not os.path.exists(get_blob_store().local_path(hashlib.sha256(data).hexdigest()))
+
+def _chunked_upload(client, headers, data: bytes, name: str = "receipt.pdf", size: int = 64 * 1024):
+    # A generator body goes out with Transfer-Encoding: chunked and no Content-Length
+    boundary = uuid.uuid4().hex
+
+    def body():
+        yield (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+               f"Content-Type: application/octet-stream\r\n\r\n").encode()
+        for offset in range(0, len(data), size):
+            yield data[offset:offset + size]
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    return client.post("/api/documents/upload", content=body(),
+                       headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+def test_oversized_chunked_upload_is_rejected_while_streaming(client, auth_headers):
+    data = b"%PDF-1.4\n" + os.urandom(settings.MAX_FILE_SIZE)
+    response = _chunked_upload(client, auth_headers, data)
+    assert response.status_code == 413
+    assert not os.path.exists(get_blob_store().local_path(hashlib.sha256(data).hexdigest()))
+
+    small = b"%PDF-1.4\n" + os.urandom(200 * 1024)
+    response = _chunked_upload(client, auth_headers, small)
+    assert response.status_code == 200
+    assert response.json()["file_size"] == len(small)
+
+def _zip(*names: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        for name in names:
+            archive.writestr(name, os.urandom(100 * 1024))  # Pushes the central directory past the first chunk
+    return buffer.getvalue()
+
+def test_only_word_documents_pass_as_docx(client, auth_headers):
+    docx = _zip("word/document.xml")
+    response = _chunked_upload(client, auth_headers, docx, name="letter.docx", size=1000)
+    assert response.status_code == 200
+    assert response.json()["file_type"] == settings.ALLOWED_FILE_TYPES[-1]
+
+    for other in (_zip("xl/workbook.xml"), _zip("META-INF/MANIFEST.MF")):
+        response = _upload(client, auth_headers, other, name="letter.docx")
+        assert response.status_code == 415
+        assert not os.path.exists(get_blob_store().local_path(hashlib.sha256(other).hexdigest()))
+
+def test_image_upload_gets_a_thumbnail(client, auth_headers):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), (200, 30, 30)).save(buffer, "PNG")
+
+    response = _upload(client, auth_headers, buffer.getvalue(), name="photo.png", content_type="image/png")
+    assert response.status_code == 200
+    assert response.json()["file_type"] == "image/png"
+    assert response.json()["has_thumbnail"] is True